@@ -0,0 +1,104 @@
+"""add boolean photos.featured alongside is_featured and feed indexes
+
+Revision ID: 0a3c5e7f9b21
+Revises: 6c4f0a9d2e58
+Create Date: 2026-10-19 18:20:44.117390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a3c5e7f9b21'
+down_revision = '6c4f0a9d2e58'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# 扩展阶段：新增布尔列 featured，旧字符串列 is_featured 保留，由触发器双向同步，
+# 滚动发布期间新旧版本的写入都不会丢失；旧列在 5b2e8d4f7a16 中删除（须在所有实例升级后执行）
+POSTGRES_TRIGGER = 'photos_sync_featured'
+POSTGRES_SYNC = """
+CREATE OR REPLACE FUNCTION photos_sync_featured() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.featured := NEW.featured OR lower(NEW.is_featured) IN ('true', '1');
+    ELSIF NEW.is_featured IS DISTINCT FROM OLD.is_featured THEN
+        NEW.featured := lower(NEW.is_featured) IN ('true', '1');
+    END IF;
+    NEW.is_featured := CASE WHEN NEW.featured THEN 'true' ELSE 'false' END;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER photos_sync_featured BEFORE INSERT OR UPDATE ON photos
+    FOR EACH ROW EXECUTE FUNCTION photos_sync_featured();
+"""
+
+# SQLite 的 BEFORE 触发器不能修改 NEW，改用 AFTER 触发器回写同一行（recursive_triggers 默认关闭）
+SQLITE_SYNC = [
+    """CREATE TRIGGER photos_sync_featured_insert AFTER INSERT ON photos BEGIN
+        UPDATE photos SET featured = (NEW.featured OR lower(NEW.is_featured) IN ('true', '1')),
+            is_featured = CASE WHEN NEW.featured OR lower(NEW.is_featured) IN ('true', '1') THEN 'true' ELSE 'false' END
+        WHERE rowid = NEW.rowid;
+    END""",
+    """CREATE TRIGGER photos_sync_featured_legacy AFTER UPDATE OF is_featured ON photos
+        WHEN NEW.is_featured IS NOT OLD.is_featured BEGIN
+        UPDATE photos SET featured = lower(NEW.is_featured) IN ('true', '1') WHERE rowid = NEW.rowid;
+    END""",
+    """CREATE TRIGGER photos_sync_featured_update AFTER UPDATE OF featured ON photos
+        WHEN NEW.featured IS NOT OLD.featured BEGIN
+        UPDATE photos SET is_featured = CASE WHEN NEW.featured THEN 'true' ELSE 'false' END WHERE rowid = NEW.rowid;
+    END""",
+]
+SQLITE_TRIGGERS = ['photos_sync_featured_insert', 'photos_sync_featured_legacy', 'photos_sync_featured_update']
+
+def _backfill(source_expr: str, target: str, value) -> None:
+    """分批回填并逐批提交，避免长事务和长时间行锁"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(sa.text(
+                f"UPDATE photos SET {target} = :value WHERE id IN ("
+                f"SELECT id FROM photos WHERE {source_expr} AND {target} <> :value LIMIT :batch)"
+            ), {"value": value, "batch": BACKFILL_BATCH_SIZE})
+            if not result.rowcount:
+                break
+
+def upgrade() -> None:
+    # 1. 新增布尔列（默认false，Postgres 11+ 上不重写表）
+    op.add_column('photos', sa.Column('featured', sa.Boolean(), nullable=False, server_default=sa.false()))
+    # 2. 先装触发器再回填：回填开始后旧版本写入的行也会同步到新列
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(POSTGRES_SYNC)
+    else:
+        for statement in SQLITE_SYNC:
+            op.execute(statement)
+    # 3. 只需回填精选图片
+    _backfill("lower(is_featured) IN ('true', '1')", 'featured', True)
+
+    # 4. feed 索引（Postgres 上并发创建，不阻塞写入）
+    op.drop_index(op.f('ix_photos_download_count'), table_name='photos')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_photos_popular', 'photos', ['download_count', 'created_at'], unique=False, postgresql_concurrently=True)
+        featured = sa.column('featured', sa.Boolean()).is_(True)
+        op.create_index(
+            'ix_photos_featured_created_at', 'photos', ['created_at'], unique=False,
+            postgresql_where=featured, sqlite_where=featured, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_photos_featured_created_at', table_name='photos')
+    op.drop_index('ix_photos_popular', table_name='photos')
+    op.create_index(op.f('ix_photos_download_count'), 'photos', ['download_count'], unique=False)
+
+    # 旧列一直由触发器同步，直接删除新列即可
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"DROP TRIGGER IF EXISTS {POSTGRES_TRIGGER} ON photos")
+        op.execute(f"DROP FUNCTION IF EXISTS {POSTGRES_TRIGGER}()")
+    else:
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_column('photos', 'featured')
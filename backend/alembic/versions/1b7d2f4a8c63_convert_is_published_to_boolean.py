@@ -0,0 +1,104 @@
+"""add boolean collections.published alongside is_published
+
+Revision ID: 1b7d2f4a8c63
+Revises: 0a3c5e7f9b21
+Create Date: 2026-10-19 19:02:16.553871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b7d2f4a8c63'
+down_revision = '0a3c5e7f9b21'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# 与 0a3c5e7f9b21 相同的扩展阶段：新增布尔列 published，旧列 is_published 由触发器双向同步，
+# 在 5b2e8d4f7a16 中删除
+POSTGRES_TRIGGER = 'collections_sync_published'
+POSTGRES_SYNC = """
+CREATE OR REPLACE FUNCTION collections_sync_published() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.published := NEW.published OR coalesce(lower(NEW.is_published) IN ('true', '1'), false);
+    ELSIF NEW.is_published IS DISTINCT FROM OLD.is_published THEN
+        NEW.published := coalesce(lower(NEW.is_published) IN ('true', '1'), false);
+    END IF;
+    NEW.is_published := CASE WHEN NEW.published THEN 'true' ELSE 'false' END;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER collections_sync_published BEFORE INSERT OR UPDATE ON collections
+    FOR EACH ROW EXECUTE FUNCTION collections_sync_published();
+"""
+
+SQLITE_SYNC = [
+    """CREATE TRIGGER collections_sync_published_insert AFTER INSERT ON collections BEGIN
+        UPDATE collections SET published = (NEW.published OR lower(NEW.is_published) IN ('true', '1')),
+            is_published = CASE WHEN NEW.published OR lower(NEW.is_published) IN ('true', '1') THEN 'true' ELSE 'false' END
+        WHERE rowid = NEW.rowid;
+    END""",
+    """CREATE TRIGGER collections_sync_published_legacy AFTER UPDATE OF is_published ON collections
+        WHEN NEW.is_published IS NOT OLD.is_published BEGIN
+        UPDATE collections SET published = lower(NEW.is_published) IN ('true', '1') WHERE rowid = NEW.rowid;
+    END""",
+    """CREATE TRIGGER collections_sync_published_update AFTER UPDATE OF published ON collections
+        WHEN NEW.published IS NOT OLD.published BEGIN
+        UPDATE collections SET is_published = CASE WHEN NEW.published THEN 'true' ELSE 'false' END WHERE rowid = NEW.rowid;
+    END""",
+]
+SQLITE_TRIGGERS = ['collections_sync_published_insert', 'collections_sync_published_legacy', 'collections_sync_published_update']
+
+def _backfill(source_expr: str, target: str, value) -> None:
+    """分批回填并逐批提交，避免长事务和长时间行锁"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(sa.text(
+                f"UPDATE collections SET {target} = :value WHERE id IN ("
+                f"SELECT id FROM collections WHERE {source_expr} AND {target} <> :value LIMIT :batch)"
+            ), {"value": value, "batch": BACKFILL_BATCH_SIZE})
+            if not result.rowcount:
+                break
+
+def upgrade() -> None:
+    op.add_column('collections', sa.Column('published', sa.Boolean(), nullable=False, server_default=sa.false()))
+    if op.get_bind().dialect.name == 'postgresql':
+        # 新版本只写 published，旧列需要默认值（只改系统目录）
+        op.alter_column('collections', 'is_published', server_default='false')
+        op.execute(POSTGRES_SYNC)
+    else:
+        # SQLite 的 NOT NULL 在 AFTER 触发器之前检查，只能重建表补默认值（合集表行数很少）
+        with op.batch_alter_table('collections') as batch_op:
+            batch_op.alter_column('is_published', existing_type=sa.String(length=5), server_default='false')
+        for statement in SQLITE_SYNC:
+            op.execute(statement)
+    # create_sample_collections.py 曾写入布尔值（SQLite 中存为 '1'）
+    _backfill("lower(is_published) IN ('true', '1')", 'published', True)
+
+    op.add_column('dashboard_stats', sa.Column('published_collections', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.get_context().autocommit_block():
+        published = sa.column('published', sa.Boolean()).is_(True)
+        op.create_index(
+            'ix_collections_published_created_at', 'collections', ['created_at'], unique=False,
+            postgresql_where=published, sqlite_where=published, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_collections_published_created_at', table_name='collections')
+    with op.batch_alter_table('dashboard_stats') as batch_op:
+        batch_op.drop_column('published_collections')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"DROP TRIGGER IF EXISTS {POSTGRES_TRIGGER} ON collections")
+        op.execute(f"DROP FUNCTION IF EXISTS {POSTGRES_TRIGGER}()")
+    else:
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_column('collections', 'published')
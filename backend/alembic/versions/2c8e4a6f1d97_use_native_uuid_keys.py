@@ -0,0 +1,113 @@
+"""use native uuid keys for photos and collections
+
+Revision ID: 2c8e4a6f1d97
+Revises: f2a6d09c7e15
+Create Date: 2026-10-19 19:41:08.284406
+
+"""
+import uuid
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8e4a6f1d97'
+down_revision = 'f2a6d09c7e15'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+# 维护步骤：Postgres 上 ALTER COLUMN ... TYPE uuid 在 ACCESS EXCLUSIVE 锁下重写 photos / collections / collection_photos，
+# SQLite 上重建这三张表；旧版本也无法读取新的键类型。须停止所有实例后单独执行 alembic upgrade 2c8e4a6f1d97，
+# 因此排在标志列的扩展/收缩迁移（0a3c5e7f9b21 ... 5b2e8d4f7a16）之前，不在滚动发布窗口内重建表
+
+# (表, 列)：主键与引用它们的外键列
+KEY_COLUMNS = [
+    ('photos', 'id'),
+    ('collections', 'id'),
+    ('collections', 'cover_photo_id'),
+    ('collection_photos', 'collection_id'),
+    ('collection_photos', 'photo_id'),
+]
+FK_TABLES = ['collections', 'collection_photos']
+
+# 主键上多余的二级索引
+DUPLICATE_INDEXES = [
+    ('photos', 'ix_photos_id'),
+    ('collections', 'ix_collections_id'),
+    ('tags', 'ix_tags_id'),
+    ('users', 'ix_users_id'),
+]
+
+def _convert_sqlite_values(table: str, column: str, convert) -> None:
+    """按 rowid 分批改写列值（SQLite 列类型不限制存储类型，可先改值再改声明类型）"""
+    bind = op.get_bind()
+    last_rowid = 0
+    while True:
+        rows = bind.execute(sa.text(
+            f"SELECT rowid, {column} FROM {table} WHERE rowid > :last AND {column} IS NOT NULL ORDER BY rowid LIMIT :batch"
+        ), {"last": last_rowid, "batch": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {column} = :value WHERE rowid = :rowid"),
+            [{"rowid": rowid, "value": convert(value)} for rowid, value in rows]
+        )
+        last_rowid = rows[-1][0]
+
+def _alter_types(type_, using: str) -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # 先移除外键，类型全部转换后再重建
+        inspector = sa.inspect(bind)
+        foreign_keys = [(table, fk) for table in FK_TABLES for fk in inspector.get_foreign_keys(table)]
+        for table, fk in foreign_keys:
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+        for table, column in KEY_COLUMNS:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {using.format(column=column)}")
+        for table, fk in foreign_keys:
+            op.create_foreign_key(fk['name'], table, fk['referred_table'], fk['constrained_columns'], fk['referred_columns'])
+    else:
+        for table in ('photos', 'collections', 'collection_photos'):
+            # 重建表会丢弃表上的触发器，重建后按原定义恢复
+            triggers = [row[0] for row in bind.execute(sa.text(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"
+            ), {"table": table})]
+            with op.batch_alter_table(table) as batch_op:
+                for key_table, column in KEY_COLUMNS:
+                    if key_table == table:
+                        batch_op.alter_column(column, type_=type_)
+            for statement in triggers:
+                op.execute(statement)
+
+def _existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    return {
+        (table, index['name'])
+        for table in {table for table, _ in DUPLICATE_INDEXES}
+        if inspector.has_table(table)
+        for index in inspector.get_indexes(table)
+    }
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    for table, name in DUPLICATE_INDEXES:
+        if (table, name) in existing:
+            op.drop_index(name, table_name=table)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        for table, column in KEY_COLUMNS:
+            _convert_sqlite_values(table, column, lambda value: uuid.UUID(value).bytes)
+    _alter_types(sa.LargeBinary(length=16), "uuid USING {column}::uuid")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        for table, column in KEY_COLUMNS:
+            _convert_sqlite_values(table, column, lambda value: str(uuid.UUID(bytes=bytes(value))))
+    _alter_types(sa.String(length=36), "varchar(36) USING {column}::text")
+
+    for table, name in DUPLICATE_INDEXES:
+        if sa.inspect(op.get_bind()).has_table(table):
+            op.create_index(name, table, ['id'], unique=False)
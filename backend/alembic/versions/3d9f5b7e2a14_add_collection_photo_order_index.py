@@ -0,0 +1,52 @@
+"""add ordered membership index and gap-based order_index
+
+Revision ID: 3d9f5b7e2a14
+Revises: 2c8e4a6f1d97
+Create Date: 2026-10-19 21:14:38.207415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9f5b7e2a14'
+down_revision = '2c8e4a6f1d97'
+branch_labels = None
+depends_on = None
+
+ORDER_GAP = 1024  # 与 app.crud.crud_collections.ORDER_GAP 保持一致
+
+def _renumber(gap: int) -> None:
+    """按现有顺序把每个合集的 order_index 重排为 gap 的整数倍"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        collection_ids = [row[0] for row in bind.execute(sa.text(
+            "SELECT DISTINCT collection_id FROM collection_photos"
+        ))]
+        for collection_id in collection_ids:
+            members = bind.execute(sa.text(
+                "SELECT photo_id FROM collection_photos WHERE collection_id = :collection_id "
+                "ORDER BY order_index, photo_id"
+            ), {"collection_id": collection_id}).all()
+            # autocommit 模式下每个合集单独提交，只短暂锁住该合集的成员行
+            bind.execute(sa.text(
+                "UPDATE collection_photos SET order_index = :order_index "
+                "WHERE collection_id = :collection_id AND photo_id = :photo_id"
+            ), [
+                {"order_index": (position + 1) * gap, "collection_id": collection_id, "photo_id": row[0]}
+                for position, row in enumerate(members)
+            ])
+
+def upgrade() -> None:
+    _renumber(ORDER_GAP)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_collection_photos_order', 'collection_photos', ['collection_id', 'order_index', 'photo_id'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_collection_photos_order', table_name='collection_photos')
+    _renumber(1)
@@ -0,0 +1,87 @@
+"""drop legacy string flag columns photos.is_featured and collections.is_published
+
+Revision ID: 5b2e8d4f7a16
+Revises: 1b7d2f4a8c63
+Create Date: 2026-10-20 10:05:12.640218
+
+"""
+from alembic import op
+from alembic.script import ScriptDirectory
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8d4f7a16'
+down_revision = '1b7d2f4a8c63'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# 收缩阶段：0a3c5e7f9b21 / 1b7d2f4a8c63 新增的布尔列已由应用读写，这里删除同步触发器和旧字符串列。
+# 新版本需要的其余结构变更都排在扩展阶段之前，本迁移是 head：
+# 先 alembic upgrade 1b7d2f4a8c63 并发布新版本，所有实例都运行新版本后再 alembic upgrade head
+# (表, 旧列, 新列, 扩展阶段的迁移)
+FLAG_COLUMNS = [
+    ('photos', 'is_featured', 'featured', '0a3c5e7f9b21'),
+    ('collections', 'is_published', 'published', '1b7d2f4a8c63'),
+]
+
+def _expand_migration(revision_id):
+    """扩展阶段迁移模块（复用其中的触发器定义）"""
+    return ScriptDirectory.from_config(op.get_context().config).get_revision(revision_id).module
+
+def _sync_triggers_installed(table, module):
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        return bool(bind.execute(sa.text(
+            "SELECT 1 FROM pg_trigger WHERE tgrelid = CAST(:table AS regclass) AND tgname = :name"
+        ), {"table": table, "name": module.POSTGRES_TRIGGER}).first())
+    # 触发器不在（被手动删除）时旧列可能已过期，不能再用来覆盖新列
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"
+    ), {"table": table}).first())
+
+def _backfill(table, source_expr: str, target: str, value) -> None:
+    """分批回填并逐批提交，避免长事务和长时间行锁"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(sa.text(
+                f"UPDATE {table} SET {target} = :value WHERE id IN ("
+                f"SELECT id FROM {table} WHERE {source_expr} AND {target} <> :value LIMIT :batch)"
+            ), {"value": value, "batch": BACKFILL_BATCH_SIZE})
+            if not result.rowcount:
+                break
+
+def _drop_sync_triggers(table, module) -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"DROP TRIGGER IF EXISTS {module.POSTGRES_TRIGGER} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {module.POSTGRES_TRIGGER}()")
+    else:
+        for name in module.SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def upgrade() -> None:
+    for table, legacy, column, expand_revision in FLAG_COLUMNS:
+        module = _expand_migration(expand_revision)
+        # 删除前再对账一次：触发器仍在时把旧列中与新列不一致的值（理论上没有）同步过去
+        if _sync_triggers_installed(table, module):
+            truthy = f"lower({legacy}) IN ('true', '1')"
+            _backfill(table, truthy, column, True)
+            _backfill(table, f"NOT {truthy}", column, False)
+        _drop_sync_triggers(table, module)
+        # Postgres 只改系统目录；SQLite 3.35+ 原生 DROP COLUMN，不重建表
+        op.drop_column(table, legacy)
+
+
+def downgrade() -> None:
+    for table, legacy, column, expand_revision in FLAG_COLUMNS:
+        op.add_column(table, sa.Column(legacy, sa.String(length=5), nullable=False, server_default='false'))
+        _backfill(table, column, legacy, 'true')
+        module = _expand_migration(expand_revision)
+        if op.get_bind().dialect.name == 'postgresql':
+            op.execute(module.POSTGRES_SYNC)
+        else:
+            for statement in module.SQLITE_SYNC:
+                op.execute(statement)
@@ -0,0 +1,25 @@
+"""add collections.cache_version
+
+Revision ID: 6c4f0a9d2e58
+Revises: 3d9f5b7e2a14
+Create Date: 2026-10-20 11:32:47.915306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c4f0a9d2e58'
+down_revision = '3d9f5b7e2a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 带常量默认值的新列：Postgres 11+ 与 SQLite 均不重写表
+    op.add_column('collections', sa.Column('cache_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('collections', 'cache_version')
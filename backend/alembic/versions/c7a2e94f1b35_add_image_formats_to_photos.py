@@ -0,0 +1,26 @@
+"""add image_formats to photos
+
+Revision ID: c7a2e94f1b35
+Revises: b41d7c9e2f10
+Create Date: 2026-10-19 11:03:27.540961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a2e94f1b35'
+down_revision = 'b41d7c9e2f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 已有图片只生成过WebP
+    op.add_column('photos', sa.Column('image_formats', sa.String(length=64), nullable=False, server_default='webp'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('image_formats')
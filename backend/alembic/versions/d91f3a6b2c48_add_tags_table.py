@@ -0,0 +1,35 @@
+"""add tags table
+
+Revision ID: d91f3a6b2c48
+Revises: c7a2e94f1b35
+Create Date: 2026-10-19 14:12:05.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91f3a6b2c48'
+down_revision = 'c7a2e94f1b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tag 模型此前没有迁移；已通过 create_all 建过 tags 表的库不要执行本迁移，
+    # 升级到 c7a2e94f1b35 后 alembic stamp d91f3a6b2c48 再继续升级（见 PRODUCTION_GUIDE.md）
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tags_id'), 'tags', ['id'], unique=False)
+    op.create_index(op.f('ix_tags_name'), 'tags', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tags_name'), table_name='tags')
+    op.drop_index(op.f('ix_tags_id'), table_name='tags')
+    op.drop_table('tags')
@@ -0,0 +1,54 @@
+"""add dashboard_stats and photo sort indexes
+
+Revision ID: e4b8c1d7a903
+Revises: d91f3a6b2c48
+Create Date: 2026-10-19 16:48:31.902145
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8c1d7a903'
+down_revision = 'd91f3a6b2c48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 统计快照会统计用户数；users 表此前没有迁移，缺失时补建（已通过 create_all 建表的库保留原表）
+    if not sa.inspect(op.get_bind()).has_table('users'):
+        op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=32), nullable=True),
+        sa.Column('password', sa.String(length=255), nullable=True),
+        sa.Column('role', sa.String(length=32), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+        op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('dashboard_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_photos', sa.Integer(), nullable=False),
+    sa.Column('total_downloads', sa.Integer(), nullable=False),
+    sa.Column('featured_photos', sa.Integer(), nullable=False),
+    sa.Column('total_users', sa.Integer(), nullable=False),
+    sa.Column('total_tags', sa.Integer(), nullable=False),
+    sa.Column('popular_photos', sa.Text(), nullable=False),
+    sa.Column('recent_photos', sa.Text(), nullable=False),
+    sa.Column('refresh_ms', sa.Float(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # 仪表盘 Top N 与列表默认排序
+    op.create_index(op.f('ix_photos_download_count'), 'photos', ['download_count'], unique=False)
+    op.create_index(op.f('ix_photos_created_at'), 'photos', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_photos_created_at'), table_name='photos')
+    op.drop_index(op.f('ix_photos_download_count'), table_name='photos')
+    op.drop_table('dashboard_stats')
+    # users 表不删除：无法区分是本迁移补建的还是此前 create_all 建的，降级对它是空操作，
+    # 表中可能已有账号数据；需要时手动 DROP TABLE users
@@ -0,0 +1,42 @@
+"""add stat_buckets and photos.trending_score
+
+Revision ID: f2a6d09c7e15
+Revises: e4b8c1d7a903
+Create Date: 2026-10-19 17:35:12.640218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6d09c7e15'
+down_revision = 'e4b8c1d7a903'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stat_buckets',
+    sa.Column('entity_type', sa.String(length=16), nullable=False),
+    sa.Column('entity_id', sa.String(length=36), nullable=False),
+    sa.Column('metric', sa.String(length=16), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('entity_type', 'metric', 'granularity', 'bucket_start', 'entity_id')
+    )
+    op.create_index('ix_stat_buckets_bucket_start', 'stat_buckets', ['bucket_start'], unique=False)
+    op.add_column('photos', sa.Column('trending_score', sa.Float(), nullable=False, server_default='0'))
+    op.create_index(op.f('ix_photos_trending_score'), 'photos', ['trending_score'], unique=False)
+    op.add_column('dashboard_stats', sa.Column('daily_activity', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('dashboard_stats') as batch_op:
+        batch_op.drop_column('daily_activity')
+    op.drop_index(op.f('ix_photos_trending_score'), table_name='photos')
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('trending_score')
+    op.drop_index('ix_stat_buckets_bucket_start', table_name='stat_buckets')
+    op.drop_table('stat_buckets')
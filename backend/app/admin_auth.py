@@ -1,15 +1,105 @@
 # backend/app/admin_auth.py
 
-import os
+import asyncio
+import hmac
+import ipaddress
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple, Union
 from passlib.context import CryptContext
 from sqladmin.authentication import AuthenticationBackend
 from starlette.requests import Request
-from starlette.responses import RedirectResponse
+from starlette.responses import PlainTextResponse, RedirectResponse
+from app.core.config import settings
 
 # 密码哈希上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt 校验耗时100ms以上，放到专用线程池执行，不阻塞事件循环（bcrypt 计算时释放GIL）
+_hash_executor = ThreadPoolExecutor(max_workers=settings.admin_hash_workers, thread_name_prefix="admin-bcrypt")
+# 同时进行中的校验数上限：超过时返回503，避免分散IP的请求在线程池里无限排队
+MAX_PENDING_VERIFICATIONS = settings.admin_hash_workers * 4
+
+class VerificationBusy(Exception):
+    """进行中的密码校验已达上限"""
+
+class AdminCredentials(NamedTuple):
+    username: str
+    password: str
+    is_hash: bool
+
+@lru_cache(maxsize=1)
+def admin_credentials() -> AdminCredentials:
+    """管理员凭证（启动后只解析一次）"""
+    password = settings.admin_password or ""
+    # 以 $2b$ 开头视为 bcrypt 哈希，否则兼容明文密码（开发环境）
+    return AdminCredentials(settings.admin_user, password, password.startswith('$2b$'))
+
+def parse_trusted_proxies(value: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """解析逗号分隔的代理IP/网段"""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+TRUSTED_PROXIES = parse_trusted_proxies(settings.admin_trusted_proxies)
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    """真实客户端IP：直连地址是受信任代理时，从 X-Forwarded-For 右侧跳过受信任代理取第一个地址
+    （左侧的值可由客户端伪造，只信任代理追加的部分）"""
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(host):
+        return host
+    forwarded = [item.strip() for item in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if item.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted_proxy(address):
+            return address
+    return forwarded[0] if forwarded else host
+
+class LoginRateLimiter:
+    """按客户端的令牌桶：每次登录尝试消耗一个令牌，按固定速率补充；桶数有硬上限，超出时淘汰最久未用的桶"""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # 客户端 -> (令牌数, 上次更新时间)，按最近使用排序
+
+    def acquire(self, client: str) -> float:
+        """消耗一个令牌，成功返回0，否则返回需要等待的秒数（O(1)）"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._store(client, (tokens, now))
+            return (1 - tokens) / self.rate
+        self._store(client, (tokens - 1, now))
+        return 0.0
+
+    def _store(self, client: str, bucket: Tuple[float, float]) -> None:
+        self._buckets[client] = bucket
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+def rate_limit_key(ip: str, username: str) -> str:
+    """限流键：只有管理员用户名单独成桶，其余用户名共用该IP的桶，同一IP最多占用两个桶
+    （用户名由客户端任意填写，不能直接作为键）"""
+    if hmac.compare_digest(username.encode(), settings.admin_user.encode()):
+        return f"{ip}|{username}"
+    return ip
+
+# 只在事件循环线程中访问，无需加锁
+login_rate_limiter = LoginRateLimiter(settings.admin_login_rate_per_minute, settings.admin_login_burst)
+
 class AdminAuth(AuthenticationBackend):
+    _pending_verifications = 0
+
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """验证明文密码与哈希密码"""
         return pwd_context.verify(plain_password, hashed_password)
@@ -18,26 +108,45 @@ class AdminAuth(AuthenticationBackend):
         """生成密码哈希"""
         return pwd_context.hash(password)
     
-    async def login(self, request: Request) -> bool:
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """在 bcrypt 线程池中验证密码，排队过多时抛出 VerificationBusy"""
+        if AdminAuth._pending_verifications >= MAX_PENDING_VERIFICATIONS:
+            raise VerificationBusy()
+        AdminAuth._pending_verifications += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_hash_executor, self.verify_password, plain_password, hashed_password)
+        finally:
+            AdminAuth._pending_verifications -= 1
+    
+    async def login(self, request: Request):
         form = await request.form()
         username, password = form.get("username"), form.get("password")
+        if not isinstance(username, str) or not isinstance(password, str):
+            return False
 
-        # 从环境变量获取管理员凭证，这是安全的做法
-        ADMIN_USER = os.environ.get("ADMIN_USER", "admin")
-        ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD")
+        # 按真实客户端IP限流：代理后所有请求的直连IP相同，不能只按直连IP
+        retry_after = login_rate_limiter.acquire(rate_limit_key(client_ip(request), username))
+        if retry_after:
+            return PlainTextResponse(
+                "Too many login attempts", status_code=429, headers={"Retry-After": str(int(retry_after) + 1)}
+            )
 
-        if not ADMIN_PASSWORD:
+        credentials = admin_credentials()
+        if not credentials.password:
             print("错误：ADMIN_PASSWORD 环境变量未设置！")
             return False
 
         # 密码验证：支持哈希密码和明文密码（向后兼容）
-        if username == ADMIN_USER:
-            # 如果密码看起来像哈希值（以$2b$开头），使用哈希验证
-            if ADMIN_PASSWORD.startswith('$2b$'):
-                password_valid = self.verify_password(password, ADMIN_PASSWORD)
+        if hmac.compare_digest(username.encode(), credentials.username.encode()):
+            if credentials.is_hash:
+                try:
+                    password_valid = await self.verify_password_async(password, credentials.password)
+                except VerificationBusy:
+                    # 与密码错误区分开：客户端应稍后重试
+                    return PlainTextResponse("Login temporarily unavailable", status_code=503, headers={"Retry-After": "1"})
             else:
-                # 兼容明文密码（开发环境）
-                password_valid = password == ADMIN_PASSWORD
+                password_valid = hmac.compare_digest(password.encode(), credentials.password.encode())
                 
             if password_valid:
                 request.session.update({"token": "admin_logged_in"})
@@ -56,4 +165,4 @@ class AdminAuth(AuthenticationBackend):
             # return RedirectResponse(request.url_for("admin:login"), status_code=302)
             return False
         
-        return token == "admin_logged_in"
\ No newline at end of file
+        return token == "admin_logged_in"
@@ -0,0 +1,159 @@
+# backend/app/admin_collections.py
+
+import time
+import uuid
+from typing import Callable, List, Optional
+from sqladmin import BaseView, expose
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response
+from app.core.templates import environment
+from app.crud import crud_collections
+from app.db.database import SessionLocal
+from app.db.types import parse_uuid
+from app.models.tables import Collection, Photo, collection_photos
+
+membership_template = environment.get_template("collection_membership.html")
+
+class MembershipError(ValueError):
+    """请求中的合集或图片标识无效"""
+
+def _resolve_photo_ids(db, payload: dict) -> List[uuid.UUID]:
+    """把请求中的 photo_ids（UUID）或 public_ids 解析为图片ID，保持顺序"""
+    if "public_ids" in payload:
+        if not isinstance(payload["public_ids"], list):
+            raise MembershipError("Provide photo_ids or public_ids as a list")
+        public_ids = [str(value) for value in payload["public_ids"]]
+        found = {}
+        for start in range(0, len(public_ids), 500):
+            chunk = public_ids[start:start + 500]
+            found.update(db.query(Photo.public_id, Photo.id).filter(Photo.public_id.in_(chunk)).all())
+        missing = [public_id for public_id in public_ids if public_id not in found]
+        if missing:
+            raise MembershipError(f"Unknown public_ids: {', '.join(missing[:20])}")
+        return [found[public_id] for public_id in public_ids]
+
+    raw_ids = payload.get("photo_ids")
+    if not isinstance(raw_ids, list):
+        raise MembershipError("Provide photo_ids or public_ids as a list")
+    photo_ids = [parse_uuid(str(value)) for value in raw_ids]
+    invalid = [str(value) for value, photo_id in zip(raw_ids, photo_ids) if photo_id is None]
+    if invalid:
+        raise MembershipError(f"Invalid photo_ids: {', '.join(invalid[:20])}")
+    missing = crud_collections.missing_photos(db, photo_ids)
+    if missing:
+        raise MembershipError(f"Unknown photo_ids: {', '.join(str(photo_id) for photo_id in missing[:20])}")
+    return photo_ids
+
+def _apply(collection_id: str, payload: dict, operation: Callable) -> dict:
+    """在一个事务中执行成员变更（同步数据库访问，在线程池中执行）"""
+    collection_uuid = parse_uuid(collection_id)
+    db = SessionLocal()
+    try:
+        if collection_uuid is None or db.get(Collection, collection_uuid) is None:
+            raise LookupError("Collection not found")
+        started = time.perf_counter()
+        result = operation(db, collection_uuid, payload)
+        db.commit()
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _add(db, collection_id, payload):
+    return {"added": crud_collections.add_photos(db, collection_id, _resolve_photo_ids(db, payload))}
+
+def _remove(db, collection_id, payload):
+    return {"removed": crud_collections.remove_photos(db, collection_id, _resolve_photo_ids(db, payload))}
+
+def _replace(db, collection_id, payload):
+    return crud_collections.set_photos(db, collection_id, _resolve_photo_ids(db, payload))
+
+def _move(db, collection_id, payload):
+    photo_id = parse_uuid(str(payload.get("photo_id")))
+    after = payload.get("after_photo_id")
+    after_photo_id = parse_uuid(str(after)) if after is not None else None
+    if photo_id is None or (after is not None and after_photo_id is None):
+        raise MembershipError("Invalid photo_id or after_photo_id")
+    return {"order_index": crud_collections.move_photo(db, collection_id, photo_id, after_photo_id)}
+
+def _members(collection_id: str) -> Optional[dict]:
+    collection_uuid = parse_uuid(collection_id)
+    if collection_uuid is None:
+        return None
+    db = SessionLocal()
+    try:
+        if db.get(Collection, collection_uuid) is None:
+            return None
+        rows = db.query(Photo.id, Photo.public_id, Photo.title).join(
+            collection_photos, Photo.id == collection_photos.c.photo_id
+        ).filter(
+            collection_photos.c.collection_id == collection_uuid
+        ).order_by(collection_photos.c.order_index, collection_photos.c.photo_id).all()
+        return {"items": [{"id": str(photo_id), "public_id": public_id, "title": title} for photo_id, public_id, title in rows]}
+    finally:
+        db.close()
+
+def _collection_options() -> list:
+    db = SessionLocal()
+    try:
+        return db.query(Collection.id, Collection.title, Collection.slug).order_by(Collection.created_at.desc()).all()
+    finally:
+        db.close()
+
+class CollectionMembershipView(BaseView):
+    name = "Collection Photos"
+    icon = "fa-solid fa-object-group"
+
+    # 第一个声明的路由作为菜单入口
+    @expose("/collection-membership", methods=["GET"], identity="collection-membership")
+    async def membership_page(self, request: Request) -> Response:
+        """合集成员批量管理页面"""
+        collections = await run_in_threadpool(_collection_options)
+        return HTMLResponse(membership_template.render(collections=collections, base_url=str(request.url).rstrip("/")))
+
+    @expose("/collection-membership/{collection_id}", methods=["GET"], identity="collection-membership-list")
+    async def list_members(self, request: Request) -> Response:
+        """按顺序返回合集成员"""
+        members = await run_in_threadpool(_members, request.path_params["collection_id"])
+        if members is None:
+            return JSONResponse({"detail": "Collection not found"}, status_code=404)
+        return JSONResponse(members)
+
+    @expose("/collection-membership/{collection_id}/add", methods=["POST"], identity="collection-membership-add")
+    async def add_members(self, request: Request) -> Response:
+        """批量追加图片（已在合集中的忽略）"""
+        return await self._change(request, _add)
+
+    @expose("/collection-membership/{collection_id}/remove", methods=["POST"], identity="collection-membership-remove")
+    async def remove_members(self, request: Request) -> Response:
+        """批量移出图片"""
+        return await self._change(request, _remove)
+
+    @expose("/collection-membership/{collection_id}", methods=["PUT"], identity="collection-membership-replace")
+    async def replace_members(self, request: Request) -> Response:
+        """把成员设置为给定的有序列表（差集增删，顺序变化的行重新编号）"""
+        return await self._change(request, _replace)
+
+    @expose("/collection-membership/{collection_id}/move", methods=["POST"], identity="collection-membership-move")
+    async def move_member(self, request: Request) -> Response:
+        """移动单张图片到 after_photo_id 之后（省略则移到最前）"""
+        return await self._change(request, _move)
+
+    async def _change(self, request: Request, operation: Callable) -> Response:
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse({"detail": "Invalid JSON body"}, status_code=400)
+        if not isinstance(payload, dict):
+            return JSONResponse({"detail": "Invalid JSON body"}, status_code=400)
+        try:
+            result = await run_in_threadpool(_apply, request.path_params["collection_id"], payload, operation)
+        except LookupError as error:
+            return JSONResponse({"detail": str(error)}, status_code=404)
+        except ValueError as error:
+            return JSONResponse({"detail": str(error)}, status_code=400)
+        return JSONResponse(result)
@@ -0,0 +1,30 @@
+# backend/app/admin_panel.py
+"""
+管理后台装配
+sqladmin、passlib 与各后台视图只在这里导入，由 main.py 在 ADMIN_ENABLED 为 true 时加载
+"""
+from fastapi import FastAPI
+from sqladmin import Admin
+from app.admin import UserAdmin, PhotoAdmin, TagAdmin, CollectionAdmin
+from app.admin_auth import AdminAuth
+from app.admin_collections import CollectionMembershipView
+from app.core.config import settings
+from app.dashboard import DashboardView
+from app.db.database import engine
+
+def mount_admin(app: FastAPI) -> Admin:
+    """初始化认证后端并注册所有后台视图"""
+    settings.require("admin_password", "admin_secret_key")
+    admin = Admin(
+        app,
+        engine,
+        title="Solarpunk Hub Admin",
+        authentication_backend=AdminAuth(secret_key=settings.admin_secret_key)
+    )
+    admin.add_view(DashboardView)
+    admin.add_view(UserAdmin)
+    admin.add_view(PhotoAdmin)
+    admin.add_view(TagAdmin)
+    admin.add_view(CollectionAdmin)
+    admin.add_view(CollectionMembershipView)
+    return admin
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import desc, func, update
 from typing import List, Optional
+from app.core.analytics import record_event
+from app.core.collection_cache import collection_cache
+from app.core.config import settings
+from app.crud.crud_collections import decode_cursor, get_collection_photo_page
 from app.db.database import get_db
+from app.db.types import parse_uuid
 from app.models.tables import Collection, Photo, collection_photos
 from pydantic import BaseModel
 import json
@@ -49,6 +54,7 @@ class CollectionDetailResponse(BaseModel):
     is_published: bool
     view_count: int
     photos: List[PhotoInCollection]
+    next_cursor: Optional[str] = None
     created_at: str
     updated_at: str
     
@@ -61,10 +67,12 @@ class CollectionListResponse(BaseModel):
     page: int
     pages: int
     
+# 缩略图URL前缀（启动时解析一次）
+THUMBNAIL_BASE_URL = f"{settings.cdn_base_url}/images/thumb/"
+
 def build_thumbnail_url(r2_object_key: str) -> str:
     """构建缩略图URL"""
-    from app.core.config import settings
-    return f"{settings.cdn_base_url}/images/thumb/{r2_object_key}"
+    return THUMBNAIL_BASE_URL + r2_object_key
 
 def format_photo_for_response(photo: Photo) -> PhotoInCollection:
     """格式化图片数据用于响应"""
@@ -74,14 +82,14 @@ def format_photo_for_response(photo: Photo) -> PhotoInCollection:
         tags = []
     
     return PhotoInCollection(
-        id=photo.id,
+        id=str(photo.id),
         public_id=photo.public_id,
         title=photo.title,
         tags=tags,
         thumbnail_url=build_thumbnail_url(photo.r2_object_key),
         aspect_ratio=photo.aspect_ratio,
         download_count=photo.download_count,
-        is_featured=photo.is_featured_bool
+        is_featured=photo.is_featured
     )
 
 @router.get("/collections", response_model=CollectionListResponse)
@@ -95,7 +103,7 @@ def get_collections(
     query = db.query(Collection)
     
     if published_only:
-        query = query.filter(Collection.is_published == 'true')
+        query = query.filter(Collection.is_published.is_(True))
     
     # 按创建时间倒序排列
     query = query.order_by(desc(Collection.created_at))
@@ -103,14 +111,20 @@ def get_collections(
     total = query.count()
     pages = (total + limit - 1) // limit
     
-    collections = query.offset((page - 1) * limit).limit(limit).all()
+    # 封面图片随合集一起加载，避免逐个懒加载
+    collections = query.options(joinedload(Collection.cover_photo)).offset((page - 1) * limit).limit(limit).all()
+    
+    # 一次查询获取本页所有合集的图片数量
+    photo_counts = dict(
+        db.query(collection_photos.c.collection_id, func.count())
+        .filter(collection_photos.c.collection_id.in_([c.id for c in collections]))
+        .group_by(collection_photos.c.collection_id)
+        .all()
+    ) if collections else {}
     
     items = []
     for collection in collections:
-        # 获取合集中的图片数量
-        photo_count = db.query(collection_photos).filter(
-            collection_photos.c.collection_id == collection.id
-        ).count()
+        photo_count = photo_counts.get(collection.id, 0)
         
         # 格式化封面图片
         cover_photo = None
@@ -118,13 +132,13 @@ def get_collections(
             cover_photo = format_photo_for_response(collection.cover_photo)
         
         items.append(CollectionResponse(
-            id=collection.id,
+            id=str(collection.id),
             title=collection.title,
             description=collection.description,
             slug=collection.slug,
-            cover_photo_id=collection.cover_photo_id,
+            cover_photo_id=str(collection.cover_photo_id) if collection.cover_photo_id else None,
             cover_photo=cover_photo,
-            is_published=collection.is_published_bool,
+            is_published=collection.is_published,
             view_count=collection.view_count,
             photo_count=photo_count,
             created_at=collection.created_at.isoformat(),
@@ -141,70 +155,117 @@ def get_collections(
 @router.get("/collections/{slug}", response_model=CollectionDetailResponse)
 def get_collection_by_slug(
     slug: str,
+    request: Request,
+    limit: int = Query(100, ge=1, le=200, description="首页图片数量，其余通过 /photos 接口按游标获取"),
     db: Session = Depends(get_db)
 ):
-    """根据slug获取合集详情"""
-    collection = db.query(Collection).filter(
+    """根据slug获取合集详情（包含第一页图片；响应体按slug缓存，浏览量单独拼接）"""
+    cached = collection_cache.get(slug, limit)
+    if cached is None:
+        cached = build_collection_detail(db, slug, limit)
+    
+    # 增加浏览量（原子更新并返回新值与缓存版本；未发布或已删除时失效缓存）
+    row = increment_view_count(db, cached.collection_id)
+    if row is not None and row.cache_version != cached.cache_version:
+        # 其他进程修改过合集或成员图片：丢弃旧缓存并重建
+        db.rollback()
+        collection_cache.invalidate(collection_ids=[cached.collection_id])
+        cached = build_collection_detail(db, slug, limit)
+        row = increment_view_count(db, cached.collection_id)
+    view_count = row.view_count if row is not None else None
+    if view_count is None:
+        db.rollback()
+        collection_cache.invalidate(collection_ids=[cached.collection_id])
+        raise HTTPException(status_code=404, detail="Collection not found")
+    record_event('collection', cached.collection_id, 'view')
+    db.commit()
+    
+    # 缓存中的前缀已预压缩，只压缩浏览量结尾；带 Content-Encoding 的响应压缩中间件不再处理
+    encoding, body = cached.render_encoded(view_count, request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+def increment_view_count(db: Session, collection_id):
+    """浏览量加一，返回 (view_count, cache_version)；合集未发布或不存在时返回None"""
+    return db.execute(
+        update(Collection.__table__)
+        .where(Collection.id == collection_id, Collection.is_published.is_(True))
+        .values(view_count=Collection.view_count + 1)
+        .returning(Collection.view_count, Collection.cache_version)
+    ).first()
+
+def build_collection_detail(db: Session, slug: str, limit: int):
+    """查询合集与第一页图片，序列化（不含 view_count）后写入缓存"""
+    generation = collection_cache.generation
+    collection = db.query(Collection).options(joinedload(Collection.cover_photo)).filter(
         Collection.slug == slug,
-        Collection.is_published == 'true'
+        Collection.is_published.is_(True)
     ).first()
     
     if not collection:
         raise HTTPException(status_code=404, detail="Collection not found")
     
-    # 增加浏览量
-    collection.view_count += 1
-    db.commit()
-    
-    # 获取合集中的图片（按order_index排序）
-    photos_query = db.query(Photo, collection_photos.c.order_index).join(
-        collection_photos, Photo.id == collection_photos.c.photo_id
-    ).filter(
-        collection_photos.c.collection_id == collection.id
-    ).order_by(asc(collection_photos.c.order_index))
-    
-    photos = [format_photo_for_response(photo) for photo, _ in photos_query.all()]
+    # 第一页图片（按order_index排序）
+    photos, next_cursor = get_collection_photo_page(db, collection.id, limit)
     
     # 格式化封面图片
     cover_photo = None
     if collection.cover_photo:
         cover_photo = format_photo_for_response(collection.cover_photo)
     
-    return CollectionDetailResponse(
-        id=collection.id,
+    body = CollectionDetailResponse(
+        id=str(collection.id),
         title=collection.title,
         description=collection.description,
         slug=collection.slug,
-        cover_photo_id=collection.cover_photo_id,
+        cover_photo_id=str(collection.cover_photo_id) if collection.cover_photo_id else None,
         cover_photo=cover_photo,
-        is_published=collection.is_published_bool,
-        view_count=collection.view_count,
-        photos=photos,
+        is_published=collection.is_published,
+        view_count=0,
+        photos=[format_photo_for_response(photo) for photo in photos],
+        next_cursor=next_cursor,
         created_at=collection.created_at.isoformat(),
         updated_at=collection.updated_at.isoformat()
-    )
+    ).model_dump_json(exclude={"view_count"}).encode()
+    
+    photo_ids = [photo.id for photo in photos]
+    if collection.cover_photo_id:
+        photo_ids.append(collection.cover_photo_id)
+    return collection_cache.store(slug, limit, generation, collection.id, collection.cache_version, photo_ids, body)
 
 @router.get("/collections/{collection_id}/photos", response_model=List[PhotoInCollection])
 def get_collection_photos(
     collection_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 中的游标"),
     db: Session = Depends(get_db)
 ):
-    """获取合集中的所有图片"""
+    """按游标分页获取合集中的图片（响应体仍为图片数组，下一页游标放在 Link / X-Next-Cursor 响应头中）"""
+    collection_uuid = parse_uuid(collection_id)
+    if collection_uuid is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     collection = db.query(Collection).filter(
-        Collection.id == collection_id,
-        Collection.is_published == 'true'
+        Collection.id == collection_uuid,
+        Collection.is_published.is_(True)
     ).first()
     
     if not collection:
         raise HTTPException(status_code=404, detail="Collection not found")
     
-    # 获取合集中的图片（按order_index排序）
-    photos_query = db.query(Photo).join(
-        collection_photos, Photo.id == collection_photos.c.photo_id
-    ).filter(
-        collection_photos.c.collection_id == collection_id
-    ).order_by(asc(collection_photos.c.order_index))
-    
-    photos = [format_photo_for_response(photo) for photo in photos_query.all()]
+    photos, next_cursor = get_collection_photo_page(db, collection_uuid, limit, after)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor, limit=limit)}>; rel="next"'
     
-    return photos
\ No newline at end of file
+    return [format_photo_for_response(photo) for photo in photos]
\ No newline at end of file
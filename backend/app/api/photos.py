@@ -1,56 +1,106 @@
-from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi import APIRouter, Query, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.db.database import get_db
 from app.crud.crud_photos import get_photos as crud_get_photos, get_photo_by_public_id
 from app.models.schemas import PhotoListResponse, PhotoResponse, PhotoDetail
 from app.core.config import settings
+from app.core import feeds, image_resizer
+from app.core.analytics import record_event
+from app.core.imaging import CANONICAL_FORMAT, FORMAT_SPECS, IMAGE_MEDIA_TYPES, rendition_key
 from app.models import Photo
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import json
+import math
 
 router = APIRouter()
 
-def build_thumbnail_url(r2_object_key: str) -> str:
+def parse_accept(accept: Optional[str]) -> Dict[str, float]:
+    """解析Accept头，返回 {媒体类型: q值}"""
+    result = {}
+    for part in (accept or "").split(','):
+        media_type, _, params = part.strip().partition(';')
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        result[media_type.strip().lower()] = q
+    return result
+
+def format_qualities(accept: Optional[str]) -> Tuple[Tuple[str, float], ...]:
+    """各图片格式在Accept头下的q值，按 FORMAT_SPECS 顺序（协商结果只取决于它，可作缓存键）
+    
+    AVIF/JXL 只在客户端明确声明时可用；WebP/JPEG 可以由通配符匹配。
+    """
+    accepted = parse_accept(accept)
+    wildcard_q = max(accepted.get("image/*", 0.0), accepted.get("*/*", 0.0)) if accepted else 1.0
+    
+    qualities = []
+    for fmt, spec in FORMAT_SPECS.items():
+        if spec["media_type"] in accepted:
+            qualities.append((fmt, accepted[spec["media_type"]]))
+        else:
+            qualities.append((fmt, wildcard_q if fmt in ("webp", "jpeg") else 0.0))
+    return tuple(qualities)
+
+def negotiate_image_format(accept: Optional[str], available: List[str]) -> str:
+    """根据Accept头从可用格式中选择图片格式，q值相同时按 FORMAT_SPECS 中的顺序优先"""
+    best, best_q = None, 0.0
+    for fmt, q in format_qualities(accept):
+        if fmt in available and q > best_q:
+            best, best_q = fmt, q
+    return best or CANONICAL_FORMAT
+
+def build_thumbnail_url(r2_object_key: str, fmt: str = CANONICAL_FORMAT) -> str:
     """根据R2对象键构建缩略图URL"""
-    # 将 images/original/xxx.webp 转换为 images/thumb/xxx.webp
-    thumb_key = r2_object_key.replace("images/original/", "images/thumb/")
-    return f"{settings.r2_public_url}/{thumb_key}"
+    # 将 images/original/xxx.webp 转换为 images/thumb/xxx.{fmt}
+    return f"{settings.r2_public_url}/{rendition_key(r2_object_key, 'thumb', fmt)}"
 
-def build_download_url(r2_object_key: str, size: str = "original") -> str:
-    """根据R2对象键构建下载URL，支持不同尺寸"""
-    if size == "small":
-        # 将 images/original/xxx.webp 转换为 images/small/xxx.webp
-        small_key = r2_object_key.replace("images/original/", "images/small/")
-        return f"{settings.r2_public_url}/{small_key}"
-    elif size == "large":
-        # 将 images/original/xxx.webp 转换为 images/large/xxx.webp
-        large_key = r2_object_key.replace("images/original/", "images/large/")
-        return f"{settings.r2_public_url}/{large_key}"
+def build_download_url(r2_object_key: str, size: str = "original", fmt: str = CANONICAL_FORMAT) -> str:
+    """根据R2对象键构建下载URL，支持不同尺寸（原图固定为WebP）"""
+    if size in ("small", "large"):
+        # 将 images/original/xxx.webp 转换为 images/{size}/xxx.{fmt}
+        return f"{settings.r2_public_url}/{rendition_key(r2_object_key, size, fmt)}"
     else:
         # 默认返回原图
         return f"{settings.r2_public_url}/{r2_object_key}"
 
 @router.get("/photos", response_model=PhotoListResponse)
 def get_photos(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1), 
     limit: int = Query(20, ge=1, le=100),
     q: Optional[str] = Query(None, description="搜索关键词"),
     search: Optional[str] = Query(None, description="搜索关键词（兼容性）"),
     tags: Optional[str] = Query(None, description="标签过滤，多个标签用逗号分隔"),
+    sort: str = Query("latest", pattern="^(latest|trending)$", description="排序：latest 最新 / trending 近期热门"),
     db: Session = Depends(get_db)
 ):
-    """获取图片列表，支持搜索和标签过滤"""
+    """获取图片列表，支持搜索、标签过滤和排序；缩略图格式按Accept头协商"""
     # 使用q参数，如果没有则使用search参数（向后兼容）
     search_query = q or search
     tag_list = tags.split(',') if tags else None
-    photos, total, pages = crud_get_photos(db, page=page, limit=limit, search=search_query, tags=tag_list)
+    photos, total, pages = crud_get_photos(db, page=page, limit=limit, search=search_query, tags=tag_list, sort=sort)
     
+    accept = request.headers.get("accept")
+    response.headers["Vary"] = "Accept"
     items = [
         PhotoResponse(
             public_id=photo.public_id,
             title=photo.title,
             tags=json.loads(photo.tags) if photo.tags else [],
-            thumbnail_url=build_thumbnail_url(photo.r2_object_key),
+            thumbnail_url=build_thumbnail_url(
+                photo.r2_object_key,
+                negotiate_image_format(accept, photo.image_format_list)
+            ),
             aspect_ratio=photo.aspect_ratio
         )
         for photo in photos
@@ -64,6 +114,63 @@ def get_photos(
         limit=limit
     )
 
+def render_feed_page(items, accept: Optional[str], page: int, limit: int) -> bytes:
+    total = len(items)
+    return PhotoListResponse(
+        items=[
+            PhotoResponse(
+                public_id=item["public_id"],
+                title=item["title"],
+                tags=item["tags"],
+                thumbnail_url=build_thumbnail_url(
+                    item["r2_object_key"],
+                    negotiate_image_format(accept, item["image_formats"])
+                ),
+                aspect_ratio=item["aspect_ratio"]
+            )
+            for item in items[(page - 1) * limit:page * limit]
+        ],
+        total=total,
+        page=page,
+        pages=math.ceil(total / limit),
+        limit=limit
+    ).model_dump_json().encode()
+
+async def feed_response(name: str, request: Request, page: int, limit: int) -> Response:
+    """从内存feed中取一页（序列化结果与压缩结果随feed缓存，刷新时整体丢弃）"""
+    feed = await feeds.get_feed(name)
+    accept = request.headers.get("accept")
+    cached = feed.cached_page(
+        (page, limit, format_qualities(accept)), lambda items: render_feed_page(items, accept, page, limit)
+    )
+    encoding, body = cached.encoded(request.headers.get("accept-encoding"))
+    headers = {
+        "Vary": "Accept, Accept-Encoding",
+        "Cache-Control": f"public, max-age={int(settings.feed_refresh_seconds)}",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+# 固定路径的feed需要在 /photos/{public_id} 之前声明
+@router.get("/photos/featured", response_model=PhotoListResponse)
+async def get_featured_photos(
+    request: Request,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """精选图片（按时间倒序）"""
+    return await feed_response("featured", request, page, limit)
+
+@router.get("/photos/popular", response_model=PhotoListResponse)
+async def get_popular_photos(
+    request: Request,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """热门图片（按累计下载量）"""
+    return await feed_response("popular", request, page, limit)
+
 @router.get("/photos/{public_id}", response_model=PhotoDetail)
 def get_photo_detail(public_id: str, db: Session = Depends(get_db)):
     """获取单张图片详情"""
@@ -71,6 +178,7 @@ def get_photo_detail(public_id: str, db: Session = Depends(get_db)):
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
     
+    record_event('photo', photo.id, 'view')
     return PhotoDetail(
         public_id=photo.public_id,
         title=photo.title,
@@ -80,7 +188,7 @@ def get_photo_detail(public_id: str, db: Session = Depends(get_db)):
     )
 
 @router.get("/photos/{public_id}/download/{size}")
-def get_download_url(public_id: str, size: str, db: Session = Depends(get_db)):
+def get_download_url(public_id: str, size: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """获取指定尺寸的下载URL"""
     if size not in ["small", "large", "original"]:
         raise HTTPException(status_code=400, detail="Invalid size. Must be 'small', 'large', or 'original'")
@@ -89,8 +197,46 @@ def get_download_url(public_id: str, size: str, db: Session = Depends(get_db)):
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
     
-    download_url = build_download_url(photo.r2_object_key, size)
-    return {"download_url": download_url, "size": size}
+    fmt = CANONICAL_FORMAT
+    if size != "original":
+        fmt = negotiate_image_format(request.headers.get("accept"), photo.image_format_list)
+    response.headers["Vary"] = "Accept"
+    download_url = build_download_url(photo.r2_object_key, size, fmt)
+    return {"download_url": download_url, "size": size, "format": fmt}
+
+@router.get("/photos/{public_id}/image")
+async def get_resized_image(
+    public_id: str,
+    request: Request,
+    w: int = Query(..., ge=image_resizer.MIN_WIDTH, le=image_resizer.MAX_WIDTH, description="目标宽度(px)"),
+    fmt: Optional[str] = Query(None, description="输出格式: avif / webp / jpeg 等，缺省时按Accept头协商"),
+    db: Session = Depends(get_db)
+):
+    """按需缩放图片（结果缓存在本地磁盘）"""
+    negotiated = fmt is None
+    if negotiated:
+        fmt = negotiate_image_format(request.headers.get("accept"), list(IMAGE_MEDIA_TYPES))
+    if fmt not in IMAGE_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {', '.join(IMAGE_MEDIA_TYPES)}")
+    
+    photo = await run_in_threadpool(get_photo_by_public_id, db, public_id)
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    
+    width = image_resizer.snap_width(w)
+    # 原图不可变，ETag 只取决于对象键、宽度和格式
+    etag = '"' + hashlib.sha1(image_resizer.cache_key(photo.r2_object_key, width, fmt).encode('utf-8')).hexdigest() + '"'
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": etag,
+    }
+    if negotiated:
+        headers["Vary"] = "Accept"
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    data = await image_resizer.get_resized_image(photo.r2_object_key, width, fmt)
+    return Response(content=data, media_type=IMAGE_MEDIA_TYPES[fmt], headers=headers)
 
 @router.post("/photos/{public_id}/download")
 def record_download(public_id: str, db: Session = Depends(get_db)):
@@ -102,5 +248,6 @@ def record_download(public_id: str, db: Session = Depends(get_db)):
     # 增加下载计数
     photo.download_count = (photo.download_count or 0) + 1
     db.commit()
+    record_event('photo', photo.id, 'download')
     
     return {"message": "Download recorded", "download_count": photo.download_count}
\ No newline at end of file
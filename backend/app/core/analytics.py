@@ -0,0 +1,90 @@
+# backend/app/core/analytics.py
+"""
+下载/浏览事件的缓冲写入
+接口只在内存中累加（按小时分桶），后台循环定期批量 upsert 到 stat_buckets，
+避免每次请求都写一行事件记录
+"""
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Tuple
+from sqlalchemy.orm import Session
+from app.models.tables import StatBucket
+
+logger = logging.getLogger("app.analytics")
+
+GRANULARITY_HOUR = 'hour'
+GRANULARITY_DAY = 'day'
+
+# (entity_type, entity_id, metric, bucket_start) -> 次数
+BucketKey = Tuple[str, str, str, datetime]
+
+def hour_bucket(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def day_bucket(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def upsert_buckets(db: Session, granularity: str, counts: Counter) -> None:
+    """累加写入分桶计数（同一桶已存在时相加）"""
+    if not counts:
+        return
+    if db.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(StatBucket)
+    statement = statement.on_conflict_do_update(
+        index_elements=['entity_type', 'metric', 'granularity', 'bucket_start', 'entity_id'],
+        set_={'count': StatBucket.count + statement.excluded.count}
+    )
+    db.execute(statement, [
+        {
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'metric': metric,
+            'granularity': granularity,
+            'bucket_start': bucket_start,
+            'count': count,
+        }
+        for (entity_type, entity_id, metric, bucket_start), count in counts.items()
+    ])
+
+class StatBuffer:
+    """进程内事件计数缓冲（线程安全）"""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, entity_type: str, entity_id: str, metric: str, amount: int = 1) -> None:
+        key = (entity_type, str(entity_id), metric, hour_bucket(datetime.now(timezone.utc)))
+        with self._lock:
+            self._counts[key] += amount
+
+    def drain(self) -> Counter:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def flush(self, db: Session) -> int:
+        """写入缓冲中的计数，返回写入的分桶数；失败时计数放回缓冲"""
+        counts = self.drain()
+        if not counts:
+            return 0
+        try:
+            upsert_buckets(db, GRANULARITY_HOUR, counts)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._counts.update(counts)
+            raise
+        return len(counts)
+
+stat_buffer = StatBuffer()
+
+def record_event(entity_type: str, entity_id: str, metric: str) -> None:
+    """记录一次下载/浏览事件"""
+    stat_buffer.record(entity_type, entity_id, metric)
@@ -0,0 +1,52 @@
+# backend/app/core/background.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from app.core import image_resizer
+from app.core.analytics import stat_buffer
+from app.core.config import settings
+from app.core.feeds import refresh_feeds
+from app.db.database import SessionLocal
+
+logger = logging.getLogger("app.background")
+
+def flush_stats() -> int:
+    db = SessionLocal()
+    try:
+        return stat_buffer.flush(db)
+    finally:
+        db.close()
+
+async def run_periodically(interval: float, func: Callable[[], object], name: str) -> None:
+    """在线程池中定期执行同步函数，单次失败只记录日志"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(func)
+        except Exception:
+            logger.exception("background task %s failed", name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动后台循环，退出前写入剩余数据并关闭缩放进程池"""
+    try:
+        # 首次请求前预热feed
+        await run_in_threadpool(refresh_feeds)
+    except Exception:
+        logger.exception("initial feed refresh failed")
+
+    loops = [
+        asyncio.create_task(run_periodically(settings.analytics_flush_seconds, flush_stats, "flush_stats")),
+        asyncio.create_task(run_periodically(settings.feed_refresh_seconds, refresh_feeds, "refresh_feeds")),
+    ]
+    try:
+        yield
+    finally:
+        for loop in loops:
+            loop.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+        await run_in_threadpool(flush_stats)
+        await run_in_threadpool(image_resizer.shutdown)
@@ -0,0 +1,41 @@
+# backend/app/core/cache.py
+import json
+import urllib.request
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+from app.core.config import settings
+
+# 进程内缓存失效回调：scope -> [callback(keys)]
+_invalidators: Dict[str, List[Callable[[Optional[List[str]]], None]]] = defaultdict(list)
+
+def register_invalidator(scope: str, callback: Callable[[Optional[List[str]]], None]) -> None:
+    """注册某类缓存的失效回调，keys为None表示清空整个scope"""
+    _invalidators[scope].append(callback)
+
+def invalidate(scope: str, keys: Optional[Iterable[str]] = None) -> None:
+    """使本进程内指定scope的缓存失效"""
+    key_list = list(keys) if keys is not None else None
+    for callback in _invalidators.get(scope, []):
+        callback(key_list)
+
+def purge_cdn_urls(urls: List[str]) -> bool:
+    """清理Cloudflare CDN缓存，未配置时直接跳过"""
+    if not urls or not settings.cloudflare_zone_id or not settings.cloudflare_api_token:
+        return False
+
+    # Cloudflare 单次最多清理30个URL
+    for start in range(0, len(urls), 30):
+        request = urllib.request.Request(
+            f"https://api.cloudflare.com/client/v4/zones/{settings.cloudflare_zone_id}/purge_cache",
+            data=json.dumps({"files": urls[start:start + 30]}).encode('utf-8'),
+            headers={
+                "Authorization": f"Bearer {settings.cloudflare_api_token}",
+                "Content-Type": "application/json",
+            },
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            result = json.loads(response.read())
+            if not result.get("success"):
+                raise RuntimeError(f"CDN purge failed: {result.get('errors')}")
+    return True
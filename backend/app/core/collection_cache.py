@@ -0,0 +1,212 @@
+# backend/app/core/collection_cache.py
+"""
+合集详情响应缓存
+按 (slug, limit) 缓存序列化后的 JSON 字节，view_count 作为最后一个键在返回时拼接，浏览量不受缓存影响。
+合集行、成员关系或成员图片经 ORM 修改时，在同一事务中递增受影响合集的 collections.cache_version，
+并在提交后精确失效本进程缓存；其他进程（API 实例、worker、脚本）命中时比对 cache_version 发现变更后重建。
+直接执行 SQL 的写入调用 mark_collections_changed。
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from app.core import cache
+from app.core.compression import PrimedGzip, negotiate_encoding
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.tables import Collection, Photo, collection_photos
+
+# 频繁变化或不出现在响应中的字段：只改这些字段时不失效（下载量等由TTL兜底，其余为 worker 写入的图片元数据）
+VOLATILE_FIELDS = {
+    Photo: {"download_count", "trending_score", "content_hash", "perceptual_hash", "palette", "image_formats"},
+    Collection: {"view_count", "updated_at", "cache_version"},
+}
+
+_PENDING_KEY = "collection_cache_pending"
+
+@dataclass(frozen=True)
+class CachedCollection:
+    collection_id: uuid.UUID
+    cache_version: int  # 构建时读到的 collections.cache_version
+    photo_ids: FrozenSet[uuid.UUID]  # 本页图片与封面
+    prefix: bytes  # 去掉结尾 "}" 并以 ',"view_count":' 结尾的响应体
+    stored_at: float
+    gzip_prefix: Optional[PrimedGzip]  # 前缀已压缩的gzip流，响应体小于压缩阈值时为None
+
+    def render(self, view_count: int) -> bytes:
+        return b"%s%d}" % (self.prefix, view_count)
+
+    def render_encoded(self, view_count: int, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+        """按 Accept-Encoding 返回 (编码或None, 响应体)；只有前缀预压缩的 gzip 可用"""
+        if self.gzip_prefix is not None and negotiate_encoding(accept_encoding, ("gzip",)):
+            return "gzip", self.gzip_prefix.render(b"%d}" % view_count)
+        return None, self.render(view_count)
+
+class CollectionDetailCache:
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[str, int], CachedCollection]" = OrderedDict()
+        self._by_collection: Dict[uuid.UUID, Set[Tuple[str, int]]] = {}
+        self._by_photo: Dict[uuid.UUID, Set[Tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+        # 每次失效递增；构建期间发生失效的结果不写入，避免把提交前读到的旧数据放回缓存
+        self.generation = 0
+
+    def get(self, slug: str, limit: int) -> Optional[CachedCollection]:
+        key = (slug, limit)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at > settings.collection_cache_ttl_seconds:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, slug: str, limit: int, generation: int, collection_id: uuid.UUID, cache_version: int,
+              photo_ids: Iterable[uuid.UUID], body: bytes) -> CachedCollection:
+        """body 为不含 view_count 的完整 JSON 对象"""
+        prefix = body[:-1] + b',"view_count":'
+        entry = CachedCollection(
+            collection_id=collection_id,
+            cache_version=cache_version,
+            photo_ids=frozenset(photo_ids),
+            prefix=prefix,
+            stored_at=time.monotonic(),
+            gzip_prefix=PrimedGzip(prefix) if len(prefix) >= settings.compression_min_bytes else None,
+        )
+        key = (slug, limit)
+        with self._lock:
+            if generation != self.generation:
+                return entry
+            self._remove(key)
+            self._entries[key] = entry
+            self._by_collection.setdefault(collection_id, set()).add(key)
+            for photo_id in entry.photo_ids:
+                self._by_photo.setdefault(photo_id, set()).add(key)
+            while len(self._entries) > settings.collection_cache_max_entries:
+                self._remove(next(iter(self._entries)))
+        return entry
+
+    def _remove(self, key: Tuple[str, int]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for index, ids in ((self._by_collection, (entry.collection_id,)), (self._by_photo, entry.photo_ids)):
+            for entity_id in ids:
+                keys = index.get(entity_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[entity_id]
+
+    def invalidate(self, collection_ids: Iterable[uuid.UUID] = (), photo_ids: Iterable[uuid.UUID] = ()) -> None:
+        with self._lock:
+            self.generation += 1
+            keys = set()
+            for collection_id in collection_ids:
+                keys |= self._by_collection.get(collection_id, set())
+            for photo_id in photo_ids:
+                keys |= self._by_photo.get(photo_id, set())
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._by_collection.clear()
+            self._by_photo.clear()
+
+collection_cache = CollectionDetailCache()
+
+def bump_cache_versions(connection, collection_ids: Optional[Iterable[uuid.UUID]] = (),
+                        photo_ids: Iterable[uuid.UUID] = ()) -> None:
+    """递增受影响合集（含以这些图片为成员或封面的合集）的 cache_version；collection_ids 为None表示全部合集"""
+    table = Collection.__table__
+    statement = update(table).values(cache_version=table.c.cache_version + 1)
+    if collection_ids is not None:
+        collection_ids, photo_ids = list(collection_ids), list(photo_ids)
+        conditions = []
+        if collection_ids:
+            conditions.append(table.c.id.in_(collection_ids))
+        if photo_ids:
+            conditions.append(table.c.id.in_(
+                select(collection_photos.c.collection_id).where(collection_photos.c.photo_id.in_(photo_ids))
+            ))
+            conditions.append(table.c.cover_photo_id.in_(photo_ids))
+        if not conditions:
+            return
+        statement = statement.where(or_(*conditions))
+    connection.execute(statement)
+
+def _invalidate_scope(keys: Optional[List[str]]) -> None:
+    """invalidate_cache 任务的回调（keys 为合集ID）：递增数据库中的版本，所有进程的缓存都会在下次命中时重建"""
+    collection_ids = [uuid.UUID(key) for key in keys] if keys is not None else None
+    db = SessionLocal()
+    try:
+        bump_cache_versions(db, collection_ids)
+        db.commit()
+    finally:
+        db.close()
+    if collection_ids is None:
+        collection_cache.clear()
+    else:
+        collection_cache.invalidate(collection_ids=collection_ids)
+
+cache.register_invalidator("collections", _invalidate_scope)
+
+def _pending(session: Session) -> Tuple[Set[uuid.UUID], Set[uuid.UUID]]:
+    return session.info.setdefault(_PENDING_KEY, (set(), set()))
+
+def mark_collections_changed(session: Session, collection_ids: Iterable[uuid.UUID]) -> None:
+    """记录直接通过SQL修改的合集：在当前事务中递增版本，提交后失效本进程缓存"""
+    collection_ids = list(collection_ids)
+    bump_cache_versions(session.connection(), collection_ids)
+    _pending(session)[0].update(collection_ids)
+
+def _changed_fields(obj) -> Set[str]:
+    state = inspect(obj)
+    return {attr.key for attr in state.attrs if attr.history.has_changes()}
+
+def _after_flush(session: Session, flush_context) -> None:
+    collection_ids, photo_ids = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, (Collection, Photo)) or obj.id is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if obj in session.dirty and _changed_fields(obj) <= VOLATILE_FIELDS[type(obj)]:
+            continue
+        if isinstance(obj, Collection):
+            collection_ids.add(obj.id)
+        else:
+            photo_ids.add(obj.id)
+            # 从图片一侧修改成员关系时，新加入/移出的合集同样失效
+            history = inspect(obj).attrs.collections.history
+            collection_ids.update(c.id for c in [*(history.added or ()), *(history.deleted or ())] if c.id is not None)
+    if collection_ids or photo_ids:
+        # 与本次修改在同一事务中递增版本，提交后其他进程才能看到
+        bump_cache_versions(session.connection(), collection_ids, photo_ids)
+        pending = _pending(session)
+        pending[0].update(collection_ids)
+        pending[1].update(photo_ids)
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and (pending[0] or pending[1]):
+        collection_cache.invalidate(collection_ids=pending[0], photo_ids=pending[1])
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+def install_session_hooks() -> None:
+    """为所有 Session（包括管理后台）注册失效钩子"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,191 @@
+# backend/app/core/compression.py
+"""
+响应压缩
+按 Accept-Encoding 协商 zstd / br / gzip（前两者需安装可选依赖），小于阈值的响应不压缩；
+已带 Content-Encoding 的响应（接口自行预压缩的缓存内容）原样透传
+"""
+import gzip
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+try:
+    # brotli 为可选依赖
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    # zstd 为可选依赖
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 服务端偏好顺序（q值相同时靠前的优先）
+AVAILABLE_ENCODINGS = tuple(
+    encoding for encoding, module in (("zstd", zstandard), ("br", brotli), ("gzip", gzip)) if module is not None
+)
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """解析Accept-Encoding头，返回 {编码: q值}"""
+    result = {}
+    for part in (accept_encoding or "").split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        result[coding.strip().lower()] = q
+    return result
+
+def negotiate_encoding(accept_encoding: Optional[str], supported: Iterable[str] = AVAILABLE_ENCODINGS) -> Optional[str]:
+    """从 supported 中选择客户端接受的最佳编码，都不接受时返回None（不压缩）"""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard_q = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = accepted.get(encoding, wildcard_q)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.compression_zstd_level).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=settings.compression_brotli_quality)
+    return gzip.compress(data, compresslevel=settings.compression_gzip_level, mtime=0)
+
+class StreamCompressor:
+    """流式响应的增量压缩"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """压缩一块数据并立即输出，保证客户端能及时收到已产生的内容"""
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class PrecompressedBody:
+    """可缓存的响应体：按编码惰性压缩一次，之后重复命中直接返回已压缩的字节"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+        """返回 (编码或None, 字节)"""
+        if len(self.body) < settings.compression_min_bytes:
+            return None, self.body
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            return None, self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            # 并发首次命中时可能重复压缩，结果相同，无需加锁
+            data = self._encoded[encoding] = compress(self.body, encoding)
+        return encoding, data
+
+class PrimedGzip:
+    """固定前缀已压缩好的 gzip 流：每次只压缩变化的结尾（如合集浏览量），不必重新压缩整个响应体"""
+
+    def __init__(self, prefix: bytes):
+        self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+        self._head = self._compressor.compress(prefix)
+
+    def render(self, tail: bytes) -> bytes:
+        # 复制压缩器状态（含未输出的数据与字典窗口），原对象保持在前缀结尾处供后续请求复用
+        compressor = self._compressor.copy()
+        return self._head + compressor.compress(tail) + compressor.flush()
+
+class CompressionMiddleware:
+    """压缩 API 响应（纯ASGI中间件，流式响应逐块压缩）"""
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or content_type.startswith("text/event-stream")
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    # 小响应压缩收益不抵开销
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = StreamCompressor(encoding)
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+                    return
+                data = compress(body, encoding)
+                headers["Content-Length"] = str(len(data))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data})
+                return
+            data = compressor.compress(body) if more_body else compressor.compress(body) + compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,107 @@
+# backend/app/core/disk_cache.py
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# 临时文件超过该时长仍未替换视为崩溃残留（其他进程正在写入的临时文件不能删除）
+STALE_TMP_SECONDS = 3600
+# 全量扫描目录校准总大小的最长间隔：目录由多个进程共享，各进程只知道自己写入了多少
+SCAN_INTERVAL_SECONDS = 60
+# 超出容量时淘汰到上限的该比例，避免此后每次写入都触发扫描
+EVICT_TARGET_RATIO = 0.9
+
+class DiskLRUCache:
+    """按总字节数限制容量的磁盘LRU缓存
+
+    目录可由多个进程（uvicorn workers）共享：是否命中以文件系统为准，使用顺序记录在文件访问时间上，
+    总大小由定期扫描目录得到（两次扫描之间加上本进程写入的字节数估算），超出上限时按访问时间淘汰。
+    两次扫描之间其他进程的写入不计入估算，总大小可能短暂超过上限。
+    """
+
+    def __init__(self, directory: str, max_bytes: int, scan_interval: float = SCAN_INTERVAL_SECONDS):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        self._scanned_bytes = 0
+        self._written_since_scan = 0
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._scan()
+
+    @property
+    def current_bytes(self) -> int:
+        """估算的缓存总大小"""
+        return self._scanned_bytes + self._written_since_scan
+
+    def _scan(self) -> None:
+        """扫描目录得到实际总大小，超出上限时淘汰访问时间最早的文件，并清理崩溃残留的临时文件（调用方需持有锁）"""
+        now = time.time()
+        files = []
+        total = 0
+        for path in self.directory.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # 扫描期间被其他进程淘汰或替换
+                continue
+            if path.suffix == '.tmp':
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            files.sort(key=lambda file: file[0])
+            # 至少保留最近使用的一个文件
+            for _, size, path in files[:-1]:
+                if total <= target:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+        self._scanned_bytes = total
+        self._written_since_scan = 0
+        self._scanned_at = time.monotonic()
+
+    def _path_for(self, name: str) -> Path:
+        return self.directory / name[:2] / name
+
+    @staticmethod
+    def _name_for(key: str) -> str:
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """命中时返回缓存内容并更新访问时间（包括其他进程写入的文件）"""
+        path = self._path_for(self._name_for(key))
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            # 记录访问时间，淘汰与重启后都按此判断使用顺序
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """写入缓存（先写临时文件再原子替换），必要时扫描目录淘汰最久未使用的条目"""
+        name = self._name_for(key)
+        path = self._path_for(name)
+        path.parent.mkdir(exist_ok=True)
+        # 临时文件名带进程号与线程号，多个进程同时写入同一条目互不干扰
+        tmp_path = path.with_name(f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._written_since_scan += len(data)
+            if self.current_bytes > self.max_bytes or time.monotonic() - self._scanned_at > self.scan_interval:
+                self._scan()
@@ -0,0 +1,107 @@
+# backend/app/core/feeds.py
+"""
+首页精选/热门feed
+排名结果保存在进程内存中，由后台循环定期刷新，请求只对不可变元组做切片
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Query, Session
+from starlette.concurrency import run_in_threadpool
+from app.core.compression import PrecompressedBody
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.tables import Photo
+
+logger = logging.getLogger("app.feeds")
+
+# 每个feed保留的条目数
+FEED_SIZE = 200
+# 每个feed缓存的已序列化分页数（按 页码、每页数量、图片格式偏好 区分）
+PAGE_CACHE_SIZE = 256
+
+def _feed_item(photo: Photo) -> Dict[str, Any]:
+    return {
+        "public_id": photo.public_id,
+        "title": photo.title,
+        "tags": json.loads(photo.tags) if photo.tags else [],
+        "r2_object_key": photo.r2_object_key,
+        "image_formats": photo.image_format_list,
+        "aspect_ratio": photo.aspect_ratio,
+    }
+
+class FeedSnapshot(NamedTuple):
+    """一次刷新的结果：条目与由这些条目渲染的分页缓存总是一起替换"""
+    items: Tuple[Dict[str, Any], ...]
+    pages: Dict[Hashable, PrecompressedBody]
+    refreshed_at: Optional[float]
+
+class RankedFeed:
+    """一个预先排好序的图片列表"""
+
+    def __init__(self, name: str, query: Callable[[Session], Query]):
+        self.name = name
+        self._query = query
+        self.state = FeedSnapshot((), {}, None)
+        self._refresh_lock = asyncio.Lock()
+
+    def refresh(self, db: Session) -> None:
+        items = tuple(_feed_item(photo) for photo in self._query(db).limit(FEED_SIZE))
+        # refresh 在线程池中执行：只做一次属性赋值，读者要么拿到完整的旧快照，要么拿到新快照，
+        # 不会把旧条目渲染的分页写进新快照的缓存
+        self.state = FeedSnapshot(items, {}, time.monotonic())
+
+    def cached_page(self, key: Hashable, render: Callable[[Tuple[Dict[str, Any], ...]], bytes]) -> PrecompressedBody:
+        """获取已序列化的分页，未命中时用同一快照的条目调用 render 生成"""
+        state = self.state
+        page = state.pages.get(key)
+        if page is None:
+            page = PrecompressedBody(render(state.items))
+            # 只在事件循环中修改分页缓存；刷新线程不会改动旧快照的字典
+            if len(state.pages) >= PAGE_CACHE_SIZE:
+                state.pages.pop(next(iter(state.pages)))
+            state.pages[key] = page
+        return page
+
+    def is_stale(self) -> bool:
+        # 后台循环正常时不会过期；超过两个周期未刷新则由请求触发
+        refreshed_at = self.state.refreshed_at
+        return refreshed_at is None or time.monotonic() - refreshed_at > 2 * settings.feed_refresh_seconds
+
+    async def ensure_fresh(self) -> None:
+        if not self.is_stale():
+            return
+        async with self._refresh_lock:
+            # 等锁期间可能已被其他请求刷新
+            if self.is_stale():
+                await run_in_threadpool(refresh_feed, self)
+
+FEEDS: Dict[str, RankedFeed] = {
+    "featured": RankedFeed(
+        "featured",
+        lambda db: db.query(Photo).filter(Photo.is_featured.is_(True)).order_by(Photo.created_at.desc())
+    ),
+    "popular": RankedFeed(
+        "popular",
+        lambda db: db.query(Photo).order_by(Photo.download_count.desc(), Photo.created_at.desc())
+    ),
+}
+
+def refresh_feed(feed: RankedFeed) -> None:
+    db = SessionLocal()
+    try:
+        feed.refresh(db)
+    finally:
+        db.close()
+
+def refresh_feeds() -> None:
+    """刷新全部feed"""
+    for feed in FEEDS.values():
+        refresh_feed(feed)
+
+async def get_feed(name: str) -> RankedFeed:
+    feed = FEEDS[name]
+    await feed.ensure_fresh()
+    return feed
@@ -0,0 +1,91 @@
+# backend/app/core/image_resizer.py
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from botocore.exceptions import ClientError
+from starlette.concurrency import run_in_threadpool
+from app.core import imaging, storage
+from app.core.config import settings
+from app.core.disk_cache import DiskLRUCache
+
+# 允许的宽度范围；宽度向上取整到步长，限制缓存条目数量
+MIN_WIDTH = 16
+MAX_WIDTH = 3840
+WIDTH_STEP = 32
+
+_pool: Optional[ProcessPoolExecutor] = None
+_cache: Optional[DiskLRUCache] = None
+# 相同图片的并发未命中请求只缩放一次
+_inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+def snap_width(width: int) -> int:
+    """将请求宽度向上取整到步长"""
+    width = max(MIN_WIDTH, min(width, MAX_WIDTH))
+    return min(MAX_WIDTH, -(-width // WIDTH_STEP) * WIDTH_STEP)
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.image_resize_workers)
+    return _pool
+
+def shutdown() -> None:
+    """关闭缩放进程池：取消排队中的任务，等待执行中的任务结束（应用退出时调用）"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+def get_cache() -> DiskLRUCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskLRUCache(settings.image_cache_dir, settings.image_cache_max_bytes)
+    return _cache
+
+def source_sizes(width: int) -> list:
+    """按优先级返回可作为缩放源的已存储尺寸：不小于目标宽度的最小版本优先，原图兜底"""
+    larger = sorted(
+        (w, size) for size, w in imaging.RENDITION_WIDTHS.items() if w >= width
+    )
+    return [size for _, size in larger] + ["original"]
+
+def fetch_source(r2_object_key: str, width: int) -> bytes:
+    """下载最接近目标宽度的已存储版本（尺寸版本可能尚未由worker生成）"""
+    for size in source_sizes(width):
+        try:
+            return storage.get_object_bytes(imaging.rendition_key(r2_object_key, size))
+        except ClientError as e:
+            if size == "original" or e.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                raise
+    raise LookupError(r2_object_key)
+
+def cache_key(r2_object_key: str, width: int, fmt: str) -> str:
+    return f"{r2_object_key}:{width}:{fmt}"
+
+async def _render(r2_object_key: str, width: int, fmt: str, key: str) -> bytes:
+    source = await run_in_threadpool(fetch_source, r2_object_key, width)
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(get_pool(), imaging.resize_encoded, source, width, fmt)
+    await run_in_threadpool(get_cache().put, key, data)
+    return data
+
+async def get_resized_image(r2_object_key: str, width: int, fmt: str) -> bytes:
+    """获取缩放后的图片字节：先查磁盘缓存，未命中时在进程池中缩放"""
+    key = cache_key(r2_object_key, width, fmt)
+    cached = await run_in_threadpool(get_cache().get, key)
+    if cached is not None:
+        return cached
+
+    future = _inflight.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.ensure_future(_render(r2_object_key, width, fmt, key))
+    _inflight[key] = future
+    try:
+        return await asyncio.shield(future)
+    finally:
+        if future.done():
+            _inflight.pop(key, None)
+        else:
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
@@ -0,0 +1,129 @@
+# backend/app/core/imaging.py
+from io import BytesIO
+from typing import List, Optional
+from PIL import Image, features
+from app.core.config import settings
+
+# 各尺寸版本的目标宽度（原图不缩放）
+RENDITION_WIDTHS = {
+    "thumb": 400,
+    "small": 640,
+    "large": 1920,
+}
+
+# 编码格式配置，顺序即内容协商时的优先级
+FORMAT_SPECS = {
+    "avif": {"pil_format": "AVIF", "media_type": "image/avif", "options": {"speed": 6}},
+    "jxl": {"pil_format": "JXL", "media_type": "image/jxl", "options": {"effort": 7}},
+    "webp": {"pil_format": "WEBP", "media_type": "image/webp", "options": {"method": 6}},
+    "jpeg": {"pil_format": "JPEG", "media_type": "image/jpeg", "options": {"optimize": True, "progressive": True}},
+}
+
+# 质量档位：{档位: {格式: (原图质量, 尺寸版本质量)}}
+# 相近主观画质下 AVIF/JXL 可以用更低的质量参数
+QUALITY_PROFILES = {
+    "high": {"avif": (75, 65), "jxl": (85, 78), "webp": (92, 88), "jpeg": (94, 90)},
+    "balanced": {"avif": (65, 55), "jxl": (80, 72), "webp": (90, 85), "jpeg": (90, 85)},
+    "small": {"avif": (55, 45), "jxl": (72, 62), "webp": (82, 75), "jpeg": (85, 78)},
+}
+
+# 原图对象键固定为WebP，其余格式只用于尺寸版本
+CANONICAL_FORMAT = "webp"
+
+try:
+    # JPEG XL 需要可选插件 pillow-jxl-plugin
+    import pillow_jxl  # noqa: F401
+except ImportError:
+    pass
+
+def _format_supported(fmt: str) -> bool:
+    if fmt == "avif":
+        return features.check("avif")
+    Image.init()
+    return FORMAT_SPECS[fmt]["pil_format"] in Image.SAVE
+
+# 当前Pillow可编码的格式
+SUPPORTED_FORMATS = [fmt for fmt in FORMAT_SPECS if _format_supported(fmt)]
+
+IMAGE_MEDIA_TYPES = {fmt: FORMAT_SPECS[fmt]["media_type"] for fmt in SUPPORTED_FORMATS}
+
+def enabled_formats() -> List[str]:
+    """配置启用且当前环境支持的格式（始终包含WebP）"""
+    configured = [fmt.strip() for fmt in settings.image_formats.split(',') if fmt.strip()]
+    formats = [fmt for fmt in FORMAT_SPECS if fmt in configured and fmt in SUPPORTED_FORMATS]
+    if CANONICAL_FORMAT not in formats:
+        formats.append(CANONICAL_FORMAT)
+    return formats
+
+def get_quality(fmt: str, kind: str = "rendition") -> int:
+    """按当前质量档位获取格式质量，kind 为 original 或 rendition"""
+    profile = QUALITY_PROFILES.get(settings.image_quality_profile, QUALITY_PROFILES["balanced"])
+    original_quality, rendition_quality = profile[fmt]
+    return original_quality if kind == "original" else rendition_quality
+
+def rendition_key(r2_object_key: str, size: str, fmt: str = CANONICAL_FORMAT) -> str:
+    """根据原图对象键得到指定尺寸与格式的对象键"""
+    if size == "original":
+        return r2_object_key
+    # 将 images/original/xxx.webp 转换为 images/{size}/xxx.{fmt}
+    key = r2_object_key.replace("images/original/", f"images/{size}/")
+    if fmt != CANONICAL_FORMAT:
+        key = f"{key.rsplit('.', 1)[0]}.{fmt}"
+    return key
+
+def load_image(data: bytes) -> Image.Image:
+    """从字节加载图片并转换为RGB模式"""
+    img = Image.open(BytesIO(data))
+    img.load()
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
+def resize_to_width(img: Image.Image, width: int) -> Image.Image:
+    """按宽度等比缩放（不放大）"""
+    if img.width <= width:
+        return img.copy()
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.Resampling.LANCZOS)
+
+def encode_image(img: Image.Image, fmt: str, quality: Optional[int] = None, kind: str = "rendition") -> bytes:
+    """按格式编码图片，未指定质量时使用当前质量档位"""
+    spec = FORMAT_SPECS[fmt]
+    buffer = BytesIO()
+    img.save(
+        buffer,
+        format=spec["pil_format"],
+        quality=quality if quality is not None else get_quality(fmt, kind),
+        **spec["options"]
+    )
+    return buffer.getvalue()
+
+def resize_encoded(data: bytes, width: int, fmt: str) -> bytes:
+    """解码、缩放并重新编码（在进程池中执行，参数与返回值均为可序列化的字节）"""
+    img = resize_to_width(load_image(data), width)
+    return encode_image(img, fmt)
+
+def compute_dhash(img: Image.Image, hash_size: int = 8) -> str:
+    """计算dHash感知哈希，返回16位十六进制字符串"""
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+def extract_palette(img: Image.Image, count: int = 5) -> List[str]:
+    """提取主色调，按像素占比从高到低返回十六进制颜色"""
+    small = img.copy()
+    small.thumbnail((128, 128))
+    quantized = small.quantize(colors=count, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette() or []
+    colors = sorted(quantized.getcolors() or [], reverse=True)
+    result = []
+    for _, index in colors[:count]:
+        r, g, b = palette[index * 3:index * 3 + 3]
+        result.append(f"#{r:02x}{g:02x}{b:02x}")
+    return result
@@ -0,0 +1,129 @@
+# backend/app/core/metrics.py
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus 默认的延迟分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+class RequestStats:
+    """单个请求内的数据库统计"""
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+# 当前请求的统计对象；同步路由在线程池中执行时会复制上下文，拿到的是同一个对象
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+class Histogram:
+    """带标签的累计直方图（Prometheus 语义）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # 标签值 -> [各桶计数..., 总和, 总数]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labelvalues, series in items:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return "\n".join(lines)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Number of SQL statements executed per request.",
+    ("method", "route"), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per request.",
+    ("method", "route"), LATENCY_BUCKETS
+)
+
+ALL_METRICS = (REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME)
+
+def render_prometheus() -> str:
+    """输出 Prometheus 文本格式"""
+    return "\n".join(metric.render() for metric in ALL_METRICS) + "\n"
+
+def install_query_hooks(engine: Engine) -> None:
+    """在引擎上注册SQL计时钩子，统计计入当前请求"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # 执行失败时不会触发 after_cursor_execute，丢弃对应的开始时间
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+def route_template(scope: dict) -> str:
+    """获取匹配到的路由模板（如 /api/v1/collections/{slug}），未匹配时返回 unmatched"""
+    # 新版 FastAPI 的 scope["route"] 不含 include_router 的前缀，优先取完整路径
+    effective = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(effective, "path", None) or getattr(scope.get("route"), "path", None)
+    if not path:
+        return "unmatched"
+    # 挂载的子应用（如 /admin）的路由路径是相对路径
+    root_path = scope.get("root_path", "")
+    if root_path and not path.startswith(root_path):
+        path = root_path.rstrip("/") + path
+    return path
+
+def record_request(method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+    """记录一次请求的指标"""
+    REQUEST_LATENCY.observe(duration, method, route, str(status))
+    REQUEST_QUERIES.observe(stats.queries, method, route)
+    REQUEST_DB_TIME.observe(stats.db_time, method, route)
+
+def server_timing_header(duration: float, stats: RequestStats) -> str:
+    """生成 Server-Timing 响应头"""
+    return (
+        f'app;dur={duration * 1000:.1f}, '
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+    )
@@ -0,0 +1,100 @@
+# backend/app/core/query_diagnostics.py
+"""
+SQL诊断模式（开发/预发环境，QUERY_DIAGNOSTICS=true 时启用）
+- 记录超过阈值的慢查询及其执行计划
+- 检测同一请求内重复执行的同构语句（典型的 N+1 查询）
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+current_statements: ContextVar[Optional[Counter]] = ContextVar("current_statements", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+
+def normalize_statement(statement: str) -> str:
+    """将语句归一化为结构签名：去掉字面量、合并IN列表与空白"""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _POSTCOMPILE.sub("(...)", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return normalized
+
+def explain(conn, statement: str, parameters) -> List[str]:
+    """获取执行计划（直接使用DBAPI游标，避免再次触发事件钩子）"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return []
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def install_diagnostic_hooks(engine: Engine) -> None:
+    """注册慢查询与重复语句统计钩子"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("diag_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["diag_start_time"].pop()) * 1000
+
+        statements = current_statements.get()
+        if statements is not None:
+            statements[normalize_statement(statement)] += 1
+
+        if elapsed_ms < settings.slow_query_ms:
+            return
+        plan = []
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            try:
+                plan = explain(conn, statement, parameters)
+            except Exception as e:
+                plan = [f"(EXPLAIN failed: {e})"]
+        logger.warning(
+            "slow query %.1fms: %s\n  params: %r\n  plan:\n    %s",
+            elapsed_ms, _WHITESPACE.sub(" ", statement), parameters, "\n    ".join(plan) or "(n/a)"
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("diag_start_time"):
+            conn.info["diag_start_time"].pop()
+
+def start_request():
+    """开始收集当前请求的语句，返回 (计数器, 上下文token)"""
+    statements = Counter()
+    return statements, current_statements.set(statements)
+
+def repeated_statements(statements: Counter, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+    """返回执行次数达到阈值的同构语句"""
+    threshold = threshold or settings.n_plus_one_threshold
+    return [(statement, count) for statement, count in statements.most_common() if count >= threshold]
+
+def finish_request(method: str, route: str, statements: Counter, token) -> None:
+    """结束收集，对疑似 N+1 的请求输出警告"""
+    current_statements.reset(token)
+    for statement, count in repeated_statements(statements):
+        logger.warning("possible N+1 in %s %s: %d× %s", method, route, count, statement)
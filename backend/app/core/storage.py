@@ -0,0 +1,30 @@
+# backend/app/core/storage.py
+from functools import lru_cache
+from app.core.config import settings
+
+@lru_cache(maxsize=1)
+def get_r2_client():
+    """获取R2客户端（进程内复用；boto3 导入较慢，首次访问存储时才加载）"""
+    import boto3
+    settings.require("r2_endpoint_url", "r2_access_key_id", "r2_secret_access_key", "r2_bucket_name")
+    return boto3.client(
+        's3',
+        endpoint_url=settings.r2_endpoint_url,
+        aws_access_key_id=settings.r2_access_key_id,
+        aws_secret_access_key=settings.r2_secret_access_key,
+        region_name='auto'
+    )
+
+def get_object_bytes(key: str) -> bytes:
+    """从R2下载对象内容"""
+    response = get_r2_client().get_object(Bucket=settings.r2_bucket_name, Key=key)
+    return response['Body'].read()
+
+def put_object_bytes(key: str, data: bytes, content_type: str) -> None:
+    """上传对象到R2"""
+    get_r2_client().put_object(
+        Bucket=settings.r2_bucket_name,
+        Key=key,
+        Body=data,
+        ContentType=content_type
+    )
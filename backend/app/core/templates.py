@@ -0,0 +1,21 @@
+# backend/app/core/templates.py
+from datetime import datetime
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+def format_time(value) -> str:
+    if not value:
+        return 'N/A'
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime('%Y-%m-%d %H:%M')
+
+# 管理后台自定义页面的模板环境：模板在导入时编译一次，之后每次请求只执行编译好的渲染函数
+environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+environment.filters["format_time"] = format_time
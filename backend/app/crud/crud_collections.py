@@ -0,0 +1,211 @@
+# backend/app/crud/crud_collections.py
+import uuid
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import and_, bindparam, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.collection_cache import mark_collections_changed
+from app.models.tables import Photo, collection_photos
+
+# 相邻成员 order_index 的初始间隔：移动一张图片只需取前后两者的中点，间隔耗尽时才整体重排
+ORDER_GAP = 1024
+
+def encode_cursor(order_index: int, photo_id: uuid.UUID) -> str:
+    """分页游标：本页最后一条的 (order_index, photo_id)"""
+    return f"{order_index}.{photo_id.hex}"
+
+def decode_cursor(cursor: str) -> Optional[Tuple[int, uuid.UUID]]:
+    """解析分页游标，格式错误时返回None"""
+    try:
+        order_index, photo_hex = cursor.split(".", 1)
+        return int(order_index), uuid.UUID(hex=photo_hex)
+    except (AttributeError, ValueError):
+        return None
+
+def get_collection_photo_page(
+    db: Session, collection_id: uuid.UUID, limit: int, after: Optional[Tuple[int, uuid.UUID]] = None
+) -> Tuple[List[Photo], Optional[str]]:
+    """按 (order_index, photo_id) 键集分页获取合集图片，返回 (photos, next_cursor)"""
+    query = db.query(Photo, collection_photos.c.order_index).join(
+        collection_photos, Photo.id == collection_photos.c.photo_id
+    ).filter(
+        collection_photos.c.collection_id == collection_id
+    )
+    if after is not None:
+        order_index, photo_id = after
+        # 展开成 OR 条件，SQLite 与 Postgres 都能沿 (collection_id, order_index, photo_id) 索引范围扫描
+        query = query.filter(or_(
+            collection_photos.c.order_index > order_index,
+            and_(collection_photos.c.order_index == order_index, collection_photos.c.photo_id > photo_id),
+        ))
+    rows = query.order_by(
+        collection_photos.c.order_index, collection_photos.c.photo_id
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_photo, last_index = rows[-1]
+        next_cursor = encode_cursor(last_index, last_photo.id)
+    return [photo for photo, _ in rows], next_cursor
+
+def _ordered_members(db: Session, collection_id: uuid.UUID) -> List[Tuple[uuid.UUID, int]]:
+    return db.execute(
+        select(collection_photos.c.photo_id, collection_photos.c.order_index)
+        .where(collection_photos.c.collection_id == collection_id)
+        .order_by(collection_photos.c.order_index, collection_photos.c.photo_id)
+    ).all()
+
+def renumber_collection(db: Session, collection_id: uuid.UUID) -> int:
+    """按当前顺序把合集成员重新编号为 ORDER_GAP 的整数倍，返回成员数（不提交）"""
+    members = _ordered_members(db, collection_id)
+    if members:
+        db.execute(
+            collection_photos.update()
+            .where(collection_photos.c.collection_id == collection_id)
+            .where(collection_photos.c.photo_id == bindparam('member_id'))
+            .values(order_index=bindparam('new_index')),
+            [{"member_id": photo_id, "new_index": (position + 1) * ORDER_GAP} for position, (photo_id, _) in enumerate(members)],
+        )
+        mark_collections_changed(db, [collection_id])
+    return len(members)
+
+def append_photos(db: Session, collection_id: uuid.UUID, photo_ids: Sequence[uuid.UUID]) -> None:
+    """把图片按顺序追加到合集末尾（不提交）"""
+    if not photo_ids:
+        return
+    last_index = db.execute(
+        select(func.max(collection_photos.c.order_index))
+        .where(collection_photos.c.collection_id == collection_id)
+    ).scalar() or 0
+    db.execute(collection_photos.insert(), [
+        {"collection_id": collection_id, "photo_id": photo_id, "order_index": last_index + (position + 1) * ORDER_GAP}
+        for position, photo_id in enumerate(photo_ids)
+    ])
+    mark_collections_changed(db, [collection_id])
+
+def _neighbour_indexes(db: Session, collection_id: uuid.UUID, photo_id: uuid.UUID, after_photo_id: Optional[uuid.UUID]):
+    """目标位置前后两个成员的 order_index（不含被移动的图片），不存在时为None"""
+    members = collection_photos.c
+    others = and_(members.collection_id == collection_id, members.photo_id != photo_id)
+    if after_photo_id is None:
+        previous = None
+        following = db.execute(
+            select(members.order_index).where(others)
+            .order_by(members.order_index, members.photo_id).limit(1)
+        ).scalar()
+        return previous, following
+
+    anchor = db.execute(
+        select(members.order_index).where(and_(others, members.photo_id == after_photo_id))
+    ).scalar()
+    if anchor is None:
+        raise ValueError("after_photo_id is not in the collection")
+    following = db.execute(
+        select(members.order_index).where(and_(others, or_(
+            members.order_index > anchor,
+            and_(members.order_index == anchor, members.photo_id > after_photo_id),
+        ))).order_by(members.order_index, members.photo_id).limit(1)
+    ).scalar()
+    return anchor, following
+
+def move_photo(db: Session, collection_id: uuid.UUID, photo_id: uuid.UUID, after_photo_id: Optional[uuid.UUID] = None) -> int:
+    """把图片移动到 after_photo_id 之后（None 表示移到最前），通常只更新一行；返回新的 order_index（不提交）"""
+    previous, following = _neighbour_indexes(db, collection_id, photo_id, after_photo_id)
+    if previous is not None and following is not None and following - previous < 2:
+        # 间隔耗尽：整体重排后重新计算
+        renumber_collection(db, collection_id)
+        previous, following = _neighbour_indexes(db, collection_id, photo_id, after_photo_id)
+
+    if previous is None and following is None:
+        new_index = ORDER_GAP
+    elif previous is None:
+        new_index = following - ORDER_GAP
+    elif following is None:
+        new_index = previous + ORDER_GAP
+    else:
+        new_index = (previous + following) // 2
+
+    result = db.execute(
+        collection_photos.update()
+        .where(collection_photos.c.collection_id == collection_id)
+        .where(collection_photos.c.photo_id == photo_id)
+        .values(order_index=new_index)
+    )
+    if result.rowcount == 0:
+        raise ValueError("photo_id is not in the collection")
+    mark_collections_changed(db, [collection_id])
+    return new_index
+
+# IN 列表分块，避免超出 SQLite 绑定参数上限
+_IN_CHUNK = 500
+
+def _chunks(values: Sequence, size: int = _IN_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _dedupe(photo_ids: Sequence[uuid.UUID]) -> List[uuid.UUID]:
+    return list(dict.fromkeys(photo_ids))
+
+def missing_photos(db: Session, photo_ids: Sequence[uuid.UUID]) -> List[uuid.UUID]:
+    """返回不存在的图片ID"""
+    found = set()
+    for chunk in _chunks(list(photo_ids)):
+        found.update(db.execute(select(Photo.id).where(Photo.id.in_(chunk))).scalars())
+    return [photo_id for photo_id in photo_ids if photo_id not in found]
+
+def add_photos(db: Session, collection_id: uuid.UUID, photo_ids: Sequence[uuid.UUID]) -> int:
+    """把尚不在合集中的图片按给定顺序追加到末尾，返回新增数量（不提交）"""
+    current = {photo_id for photo_id, _ in _ordered_members(db, collection_id)}
+    added = [photo_id for photo_id in _dedupe(photo_ids) if photo_id not in current]
+    append_photos(db, collection_id, added)
+    return len(added)
+
+def remove_photos(db: Session, collection_id: uuid.UUID, photo_ids: Sequence[uuid.UUID]) -> int:
+    """批量移出图片，返回删除数量（不提交）"""
+    removed = 0
+    for chunk in _chunks(_dedupe(photo_ids)):
+        removed += db.execute(
+            collection_photos.delete()
+            .where(collection_photos.c.collection_id == collection_id)
+            .where(collection_photos.c.photo_id.in_(chunk))
+        ).rowcount
+    if removed:
+        mark_collections_changed(db, [collection_id])
+    return removed
+
+def set_photos(db: Session, collection_id: uuid.UUID, photo_ids: Sequence[uuid.UUID]) -> dict:
+    """把合集成员设置为给定的有序列表：与现有成员做差集，只删除、插入和更新变化的行（不提交）"""
+    target = _dedupe(photo_ids)
+    current = dict(_ordered_members(db, collection_id))
+    retained = [photo_id for photo_id in target if photo_id in current]
+    first_added = next((position for position, photo_id in enumerate(target) if photo_id not in current), len(target))
+    in_order = all(current[a] < current[b] for a, b in zip(retained, retained[1:]))
+    if in_order and first_added >= len(retained):
+        # 保留成员顺序未变且新图片都在末尾：沿用现有编号，只追加
+        last_index = current[retained[-1]] if retained else 0
+        desired = {photo_id: current[photo_id] for photo_id in retained}
+        desired.update({photo_id: last_index + (position + 1) * ORDER_GAP for position, photo_id in enumerate(target[len(retained):])})
+    else:
+        desired = {photo_id: (position + 1) * ORDER_GAP for position, photo_id in enumerate(target)}
+
+    removed = [photo_id for photo_id in current if photo_id not in desired]
+    added = [photo_id for photo_id in target if photo_id not in current]
+    moved = [photo_id for photo_id in target if photo_id in current and current[photo_id] != desired[photo_id]]
+
+    remove_photos(db, collection_id, removed)
+    if added:
+        db.execute(collection_photos.insert(), [
+            {"collection_id": collection_id, "photo_id": photo_id, "order_index": desired[photo_id]}
+            for photo_id in added
+        ])
+    if moved:
+        db.execute(
+            collection_photos.update()
+            .where(collection_photos.c.collection_id == collection_id)
+            .where(collection_photos.c.photo_id == bindparam('member_id'))
+            .values(order_index=bindparam('new_index')),
+            [{"member_id": photo_id, "new_index": desired[photo_id]} for photo_id in moved],
+        )
+    if added or moved:
+        mark_collections_changed(db, [collection_id])
+    return {"added": len(added), "removed": len(removed), "reordered": len(moved), "photo_count": len(target)}
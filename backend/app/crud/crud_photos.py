@@ -14,15 +14,16 @@ def create_photo(db: Session, photo: PhotoCreate) -> Photo:
         title=photo.title,
         tags=json.dumps(photo.tags),
         r2_object_key=photo.r2_object_key,
-        aspect_ratio=photo.aspect_ratio
+        aspect_ratio=photo.aspect_ratio,
+        image_formats=",".join(photo.image_formats)
     )
     db.add(db_photo)
     db.commit()
     db.refresh(db_photo)
     return db_photo
 
-def get_photos(db: Session, page: int = 1, limit: int = 20, search: Optional[str] = None, tags: Optional[List[str]] = None) -> tuple[List[Photo], int, int]:
-    """获取图片列表，返回 (photos, total, pages)，支持搜索和标签过滤"""
+def get_photos(db: Session, page: int = 1, limit: int = 20, search: Optional[str] = None, tags: Optional[List[str]] = None, sort: str = "latest") -> tuple[List[Photo], int, int]:
+    """获取图片列表，返回 (photos, total, pages)，支持搜索、标签过滤和排序（latest / trending）"""
     offset = (page - 1) * limit
     
     # 构建查询
@@ -46,7 +47,12 @@ def get_photos(db: Session, page: int = 1, limit: int = 20, search: Optional[str
     total = query.count()
     
     # 获取分页数据
-    photos = query.order_by(desc(Photo.created_at)).offset(offset).limit(limit).all()
+    if sort == "trending":
+        # 热度由后台任务预先计算
+        query = query.order_by(desc(Photo.trending_score), desc(Photo.created_at))
+    else:
+        query = query.order_by(desc(Photo.created_at))
+    photos = query.offset(offset).limit(limit).all()
     
     # 计算总页数
     pages = math.ceil(total / limit)
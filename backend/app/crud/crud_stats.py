@@ -0,0 +1,165 @@
+# backend/app/crud/crud_stats.py
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import bindparam, case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.analytics import GRANULARITY_DAY, GRANULARITY_HOUR, day_bucket, upsert_buckets
+from app.core.config import settings
+from app.jobs.queue import utcnow
+from app.models.tables import Collection, DashboardStats, Photo, StatBucket, Tag, User
+
+SNAPSHOT_ID = 1
+TOP_PHOTOS = 5
+ACTIVITY_DAYS = 30
+
+def _photo_summary(photo: Photo) -> Dict[str, Any]:
+    """仪表盘列表所需的图片摘要"""
+    return {
+        "public_id": photo.public_id,
+        "title": photo.title,
+        "thumbnail_url": photo.thumbnail_url,
+        "download_count": photo.download_count or 0,
+        "created_at": photo.created_at.isoformat() if photo.created_at else None,
+    }
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite 读回的时间不带时区
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def refresh_dashboard_stats(db: Session) -> DashboardStats:
+    """重新计算仪表盘统计并写入快照"""
+    started = time.perf_counter()
+    # 三个图片聚合合并为一次扫描
+    total_photos, total_downloads, featured_photos = db.query(
+        func.count(Photo.id),
+        func.coalesce(func.sum(Photo.download_count), 0),
+        func.coalesce(func.sum(case((Photo.is_featured.is_(True), 1), else_=0)), 0)
+    ).one()
+    values = {
+        "total_photos": total_photos,
+        "total_downloads": total_downloads,
+        "featured_photos": featured_photos,
+        "total_users": db.query(func.count(User.id)).scalar(),
+        "total_tags": db.query(func.count(Tag.id)).scalar(),
+        # 走 is_published 部分索引
+        "published_collections": db.query(func.count(Collection.id)).filter(Collection.is_published.is_(True)).scalar(),
+        # 以下两个查询走 download_count / created_at 索引
+        "popular_photos": json.dumps([
+            _photo_summary(photo)
+            for photo in db.query(Photo).order_by(Photo.download_count.desc()).limit(TOP_PHOTOS)
+        ], ensure_ascii=False),
+        "recent_photos": json.dumps([
+            _photo_summary(photo)
+            for photo in db.query(Photo).order_by(Photo.created_at.desc()).limit(TOP_PHOTOS)
+        ], ensure_ascii=False),
+        "daily_activity": json.dumps(daily_activity(db)),
+        "refreshed_at": utcnow(),
+    }
+    values["refresh_ms"] = (time.perf_counter() - started) * 1000
+
+    snapshot = db.get(DashboardStats, SNAPSHOT_ID)
+    if snapshot is None:
+        snapshot = DashboardStats(id=SNAPSHOT_ID, **values)
+        db.add(snapshot)
+        try:
+            db.commit()
+        except IntegrityError:
+            # 另一个进程同时创建了快照
+            db.rollback()
+            snapshot = db.get(DashboardStats, SNAPSHOT_ID)
+    if snapshot is not None:
+        for key, value in values.items():
+            setattr(snapshot, key, value)
+        db.commit()
+    return snapshot
+
+def get_dashboard_stats(db: Session, max_age_seconds: Optional[int] = None) -> DashboardStats:
+    """读取统计快照；快照不存在或过旧（worker未运行）时当场刷新"""
+    max_age = max_age_seconds if max_age_seconds is not None else settings.dashboard_stats_max_age_seconds
+    snapshot = db.get(DashboardStats, SNAPSHOT_ID)
+    if snapshot is None or _as_utc(snapshot.refreshed_at) < utcnow() - timedelta(seconds=max_age):
+        snapshot = refresh_dashboard_stats(db)
+    return snapshot
+
+def snapshot_photos(raw: str) -> List[Dict[str, Any]]:
+    return json.loads(raw or "[]")
+
+def daily_activity(db: Session, days: int = ACTIVITY_DAYS) -> List[Dict[str, Any]]:
+    """近N天每日下载量与浏览量（小时桶与天桶合计）"""
+    start = day_bucket(utcnow()) - timedelta(days=days - 1)
+    series = {(start + timedelta(days=i)).date(): Counter() for i in range(days)}
+    rows = db.query(
+        StatBucket.metric, StatBucket.bucket_start, func.sum(StatBucket.count)
+    ).filter(
+        StatBucket.bucket_start >= start
+    ).group_by(StatBucket.metric, StatBucket.bucket_start)
+    for metric, bucket_start, count in rows:
+        day = bucket_start.date()
+        if day in series:
+            series[day][metric] += count
+    return [
+        {"date": day.isoformat(), "downloads": counts["download"], "views": counts["view"]}
+        for day, counts in series.items()
+    ]
+
+def compact_stat_buckets(db: Session, retention_days: Optional[int] = None) -> int:
+    """把超过保留期的小时桶合并为天桶，返回合并的小时桶数"""
+    retention = retention_days if retention_days is not None else settings.analytics_hourly_retention_days
+    cutoff = day_bucket(utcnow() - timedelta(days=retention))
+    hourly = db.query(
+        StatBucket.entity_type, StatBucket.entity_id, StatBucket.metric, StatBucket.bucket_start, StatBucket.count
+    ).filter(
+        StatBucket.granularity == GRANULARITY_HOUR,
+        StatBucket.bucket_start < cutoff
+    )
+    daily = Counter()
+    compacted = 0
+    for entity_type, entity_id, metric, bucket_start, count in hourly.yield_per(5000):
+        daily[(entity_type, entity_id, metric, day_bucket(bucket_start))] += count
+        compacted += 1
+    if not compacted:
+        return 0
+    # 写入天桶与删除小时桶在同一事务中
+    upsert_buckets(db, GRANULARITY_DAY, daily)
+    db.query(StatBucket).filter(
+        StatBucket.granularity == GRANULARITY_HOUR,
+        StatBucket.bucket_start < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return compacted
+
+def refresh_trending_scores(db: Session) -> int:
+    """按时间衰减的近期下载量与浏览量（按 TRENDING_VIEW_WEIGHT 折算）重新计算 Photo.trending_score，返回有热度的图片数"""
+    now = utcnow()
+    half_life = settings.trending_half_life_hours
+    since = now - timedelta(hours=settings.trending_window_hours)
+    weights = {'download': 1.0, 'view': settings.trending_view_weight}
+    rows = db.query(
+        StatBucket.entity_id, StatBucket.metric, StatBucket.granularity, StatBucket.bucket_start, StatBucket.count
+    ).filter(
+        StatBucket.entity_type == 'photo',
+        StatBucket.metric.in_([metric for metric, weight in weights.items() if weight]),
+        StatBucket.granularity.in_([GRANULARITY_HOUR, GRANULARITY_DAY]),
+        StatBucket.bucket_start >= day_bucket(since)
+    )
+    scores = defaultdict(float)
+    for photo_id, metric, granularity, bucket_start, count in rows:
+        # 以分桶中点计算时间衰减
+        midpoint = _as_utc(bucket_start) + (timedelta(hours=12) if granularity == GRANULARITY_DAY else timedelta(minutes=30))
+        age_hours = max((now - midpoint).total_seconds() / 3600, 0)
+        scores[photo_id] += weights[metric] * count * 0.5 ** (age_hours / half_life)
+
+    # 先清零旧分数再写入新分数（同一事务，读者看不到中间状态）
+    db.query(Photo).filter(Photo.trending_score > 0).update({Photo.trending_score: 0}, synchronize_session=False)
+    if scores:
+        photos = Photo.__table__
+        db.execute(
+            update(photos).where(photos.c.id == bindparam('photo_id')).values(trending_score=bindparam('score')),
+            [{"photo_id": photo_id, "score": score} for photo_id, score in scores.items()]
+        )
+    db.commit()
+    return len(scores)
@@ -0,0 +1,51 @@
+# backend/app/db/types.py
+import os
+import time
+import uuid
+from typing import Optional
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+class GUID(TypeDecorator):
+    """UUID列：Postgres 使用原生 uuid，其他数据库存为16字节二进制
+
+    写入时接受 uuid.UUID 或字符串，读出为 uuid.UUID。
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == 'postgresql' else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=bytes(value))
+
+    @property
+    def python_type(self):
+        return uuid.UUID
+
+def uuid7() -> uuid.UUID:
+    """生成 UUIDv7（RFC 9562）：高48位为毫秒时间戳，新记录的主键在B树中按插入顺序排列"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+def parse_uuid(value: str) -> Optional[uuid.UUID]:
+    """解析路径参数中的UUID，格式错误时返回None"""
+    try:
+        return uuid.UUID(value)
+    except (TypeError, ValueError):
+        return None
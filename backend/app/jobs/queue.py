@@ -0,0 +1,134 @@
+# backend/app/jobs/queue.py
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Collection as CollectionType, Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.tables import Job
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# 重试退避上限（秒）
+MAX_RETRY_DELAY = 3600
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def enqueue(
+    db: Session,
+    task: str,
+    payload: Optional[Dict[str, Any]] = None,
+    delay_seconds: float = 0,
+    max_attempts: Optional[int] = None,
+    commit: bool = True
+) -> Job:
+    """添加后台任务"""
+    job = Job(
+        task=task,
+        payload=json.dumps(payload or {}),
+        status=JOB_PENDING,
+        attempts=0,
+        max_attempts=max_attempts or settings.job_max_attempts,
+        run_after=utcnow() + timedelta(seconds=delay_seconds)
+    )
+    db.add(job)
+    if commit:
+        db.commit()
+    return job
+
+def ensure_scheduled(db: Session, task: str) -> bool:
+    """队列中没有待执行或执行中的同名任务时排入一个，返回是否新排入"""
+    exists = db.query(Job.id).filter(
+        Job.task == task,
+        Job.status.in_([JOB_PENDING, JOB_RUNNING])
+    ).first()
+    if exists:
+        return False
+    enqueue(db, task)
+    return True
+
+def claim_job(
+    db: Session,
+    worker_id: str,
+    exclude_tasks: CollectionType[str] = (),
+    only_tasks: Optional[CollectionType[str]] = None
+) -> Optional[Job]:
+    """领取一个到期任务，没有可执行任务时返回None"""
+    now = utcnow()
+    query = db.query(Job.id).filter(
+        Job.status == JOB_PENDING,
+        Job.run_after <= now
+    )
+    if exclude_tasks:
+        query = query.filter(Job.task.notin_(list(exclude_tasks)))
+    if only_tasks is not None:
+        query = query.filter(Job.task.in_(list(only_tasks)))
+    query = query.order_by(Job.run_after, Job.id)
+
+    if db.get_bind().dialect.name == 'postgresql':
+        # Postgres: 行锁 + SKIP LOCKED，多个worker互不阻塞
+        candidate_ids = [row.id for row in query.limit(1).with_for_update(skip_locked=True).all()]
+    else:
+        # SQLite: 没有行锁，取少量候选后用条件更新抢占
+        candidate_ids = [row.id for row in query.limit(5).all()]
+
+    for job_id in candidate_ids:
+        claimed = db.query(Job).filter(
+            Job.id == job_id,
+            Job.status == JOB_PENDING
+        ).update({
+            Job.status: JOB_RUNNING,
+            Job.attempts: Job.attempts + 1,
+            Job.locked_at: now,
+            Job.locked_by: worker_id
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+
+    db.rollback()
+    return None
+
+def complete_job(db: Session, job: Job, duration_ms: float) -> None:
+    """标记任务完成"""
+    job.status = JOB_DONE
+    job.duration_ms = duration_ms
+    job.locked_at = None
+    job.last_error = None
+    db.commit()
+
+def fail_job(db: Session, job: Job, error: str, duration_ms: float) -> bool:
+    """记录任务失败，返回是否还会重试"""
+    job.duration_ms = duration_ms
+    job.last_error = error[-4000:]
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = JOB_FAILED
+        db.commit()
+        return False
+
+    # 指数退避
+    delay = min(settings.job_retry_base_seconds * (2 ** (job.attempts - 1)), MAX_RETRY_DELAY)
+    job.status = JOB_PENDING
+    job.run_after = utcnow() + timedelta(seconds=delay)
+    db.commit()
+    return True
+
+def requeue_stale_jobs(db: Session, timeout_seconds: Optional[int] = None) -> int:
+    """将超时未完成（worker崩溃等）的任务重新放回队列"""
+    timeout = timeout_seconds or settings.job_lock_timeout_seconds
+    cutoff = utcnow() - timedelta(seconds=timeout)
+    count = db.query(Job).filter(
+        Job.status == JOB_RUNNING,
+        Job.locked_at < cutoff
+    ).update({
+        Job.status: JOB_PENDING,
+        Job.locked_at: None,
+        Job.locked_by: None,
+        Job.last_error: 'lock timeout'
+    }, synchronize_session=False)
+    db.commit()
+    return count
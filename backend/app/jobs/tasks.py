@@ -0,0 +1,144 @@
+# backend/app/jobs/tasks.py
+import hashlib
+import json
+import uuid
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from app.core import cache, imaging, storage
+from app.core.config import settings
+from app.crud import crud_stats
+from app.jobs.queue import enqueue
+from app.models.tables import Photo
+
+TaskHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# 任务名 -> 处理函数
+TASKS: Dict[str, TaskHandler] = {}
+
+# 单个worker进程内各任务的并发上限（未列出的任务只受总并发限制）
+TASK_CONCURRENCY = {
+    "generate_renditions": 2,
+}
+
+# 周期任务：任务名 -> 间隔秒数（worker 启动时确保队列中有一个实例；每次执行结束后由 worker 排入下一次，
+# 重试次数耗尽而失败时也一样，避免周期任务就此停止）
+PERIODIC_TASKS = {
+    "refresh_dashboard_stats": settings.dashboard_stats_refresh_seconds,
+    "refresh_trending_scores": settings.trending_refresh_seconds,
+    "compact_stat_buckets": 3600,
+}
+
+def task(name: str) -> Callable[[TaskHandler], TaskHandler]:
+    """注册后台任务处理函数"""
+    def decorator(func: TaskHandler) -> TaskHandler:
+        TASKS[name] = func
+        return func
+    return decorator
+
+def schedule_next(db: Session, name: str) -> None:
+    """周期任务排入下一次"""
+    enqueue(db, name, delay_seconds=PERIODIC_TASKS[name])
+
+def _get_photo(db: Session, payload: Dict[str, Any]) -> Photo:
+    photo = db.get(Photo, uuid.UUID(payload["photo_id"]))
+    if photo is None:
+        raise LookupError(f"Photo not found: {payload['photo_id']}")
+    return photo
+
+def enqueue_photo_pipeline(db: Session, photo: Photo) -> None:
+    """上传完成后排入后处理任务"""
+    payload = {"photo_id": str(photo.id)}
+    # 缩略图已在上传时生成，这里只补齐其余尺寸
+    enqueue(db, "generate_renditions", {**payload, "sizes": ["small", "large"]}, commit=False)
+    enqueue(db, "compute_hash", payload, commit=False)
+    enqueue(db, "extract_palette", payload, commit=False)
+    db.commit()
+
+@task("generate_renditions")
+def generate_renditions(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """生成各尺寸、各格式版本并上传到R2
+
+    未指定 formats 时沿用图片已有的格式；指定 formats 且覆盖全部尺寸时（例如批量补齐AVIF）
+    才更新图片的 image_formats，保证列出的格式在每个尺寸上都存在。
+    """
+    photo = _get_photo(db, payload)
+    sizes = payload.get("sizes") or list(imaging.RENDITION_WIDTHS)
+    formats = payload.get("formats") or photo.image_format_list
+    original = imaging.load_image(storage.get_object_bytes(photo.r2_object_key))
+
+    uploaded = {}
+    for size in sizes:
+        rendition = imaging.resize_to_width(original, imaging.RENDITION_WIDTHS[size])
+        for fmt in formats:
+            data = imaging.encode_image(rendition, fmt)
+            key = imaging.rendition_key(photo.r2_object_key, size, fmt)
+            storage.put_object_bytes(key, data, imaging.FORMAT_SPECS[fmt]["media_type"])
+            uploaded[f"{size}.{fmt}"] = len(data)
+
+    if payload.get("formats") and set(sizes) >= set(imaging.RENDITION_WIDTHS):
+        photo.image_formats = ",".join(formats)
+        db.commit()
+
+    # 新版本上传后清理CDN上的旧缓存
+    enqueue(db, "invalidate_cache", {"photo_id": str(photo.id), "sizes": sizes, "formats": formats})
+    return {"uploaded": uploaded}
+
+@task("compute_hash")
+def compute_hash(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """计算原图内容哈希与感知哈希"""
+    photo = _get_photo(db, payload)
+    data = storage.get_object_bytes(photo.r2_object_key)
+    photo.content_hash = hashlib.sha256(data).hexdigest()
+    photo.perceptual_hash = imaging.compute_dhash(imaging.load_image(data))
+    db.commit()
+    return {"content_hash": photo.content_hash, "perceptual_hash": photo.perceptual_hash}
+
+@task("extract_palette")
+def extract_palette(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """提取主色调（使用缩略图即可，减少下载量）"""
+    photo = _get_photo(db, payload)
+    try:
+        data = storage.get_object_bytes(imaging.rendition_key(photo.r2_object_key, "thumb"))
+    except storage.get_r2_client().exceptions.NoSuchKey:
+        data = storage.get_object_bytes(photo.r2_object_key)
+    colors = imaging.extract_palette(imaging.load_image(data))
+    photo.palette = json.dumps(colors)
+    db.commit()
+    return {"palette": colors}
+
+@task("invalidate_cache")
+def invalidate_cache(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """清理图片相关的CDN与进程内缓存"""
+    urls = []
+    if payload.get("photo_id"):
+        photo = _get_photo(db, payload)
+        sizes = payload.get("sizes") or list(imaging.RENDITION_WIDTHS)
+        formats = payload.get("formats") or photo.image_format_list
+        urls = [
+            f"{settings.r2_public_url}/{imaging.rendition_key(photo.r2_object_key, size, fmt)}"
+            for size in sizes
+            for fmt in formats
+        ]
+    purged = cache.purge_cdn_urls(urls)
+
+    if payload.get("scope"):
+        cache.invalidate(payload["scope"], payload.get("keys"))
+    return {"purged_urls": len(urls) if purged else 0}
+
+@task("refresh_dashboard_stats")
+def refresh_dashboard_stats(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """刷新仪表盘统计快照"""
+    snapshot = crud_stats.refresh_dashboard_stats(db)
+    return {"total_photos": snapshot.total_photos, "refresh_ms": round(snapshot.refresh_ms, 1)}
+
+@task("refresh_trending_scores")
+def refresh_trending_scores(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """重新计算图片热度分数"""
+    scored = crud_stats.refresh_trending_scores(db)
+    return {"scored_photos": scored}
+
+@task("compact_stat_buckets")
+def compact_stat_buckets(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """合并过期的小时统计桶"""
+    compacted = crud_stats.compact_stat_buckets(db, payload.get("retention_days"))
+    return {"compacted_buckets": compacted}
@@ -1,17 +1,19 @@
-import os
-from fastapi import FastAPI
+import hmac
+import time
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqladmin import Admin
+from fastapi.responses import PlainTextResponse
 from app.api.photos import router as photos_router
 from app.api.collections import router as collections_router
 from app.db.database import engine
-from app.admin_auth import AdminAuth
-from app.admin import UserAdmin, PhotoAdmin, TagAdmin, CollectionAdmin
-from app.dashboard import DashboardView
 from app.core.config import settings
+from app.core import collection_cache, metrics, query_diagnostics
+from app.core.background import lifespan
+from app.core.compression import CompressionMiddleware
 
 # --- App Initialization ---
-app = FastAPI(title="Solarpunk Hub API")
+app = FastAPI(title="Solarpunk Hub API", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -27,32 +29,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor"],  # 合集图片分页游标
 )
 
+# 响应压缩（预压缩的缓存响应原样透传）
+app.add_middleware(CompressionMiddleware)
+
+# --- Cache Invalidation ---
+collection_cache.install_session_hooks()
+
+# --- Request Metrics ---
+metrics.install_query_hooks(engine)
+if settings.query_diagnostics:
+    query_diagnostics.install_diagnostic_hooks(engine)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """记录每个路由的延迟与SQL次数/耗时，并通过 Server-Timing 头返回"""
+    stats = metrics.RequestStats()
+    token = metrics.current_request_stats.set(stats)
+    if settings.query_diagnostics:
+        statements, diag_token = query_diagnostics.start_request()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        metrics.current_request_stats.reset(token)
+    duration = time.perf_counter() - started
+    
+    # 使用路由模板（如 /api/v1/collections/{slug}）作为标签，避免基数爆炸
+    route_path = metrics.route_template(request.scope)
+    if settings.query_diagnostics:
+        query_diagnostics.finish_request(request.method, route_path, statements, diag_token)
+    metrics.record_request(request.method, route_path, response.status_code, duration, stats)
+    response.headers["Server-Timing"] = metrics.server_timing_header(duration, stats)
+    return response
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus 指标（需 Authorization: Bearer <METRICS_TOKEN>，未配置令牌时不提供）"""
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest((authorization or "").encode(), f"Bearer {settings.metrics_token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # --- API Routers ---
 app.include_router(photos_router, prefix="/api/v1")
 app.include_router(collections_router, prefix="/api/v1")
 
 # --- Admin Panel Setup ---
-# 1. 初始化认证后端
-# !! 重要: 'your_strong_secret_key' 应该从环境变量加载 !!
-SECRET_KEY = os.environ.get("ADMIN_SECRET_KEY", "your_strong_secret_key_for_session")
-authentication_backend = AdminAuth(secret_key=SECRET_KEY)
-
-# 2. 初始化 Admin 界面
-admin = Admin(
-    app,
-    engine,
-    title="Solarpunk Hub Admin",
-    authentication_backend=authentication_backend
-)
-
-# 3. 注册所有 Admin 视图
-admin.add_view(DashboardView)
-admin.add_view(UserAdmin)
-admin.add_view(PhotoAdmin)
-admin.add_view(TagAdmin)
-admin.add_view(CollectionAdmin)
+# 管理后台按需加载：只提供API的实例设置 ADMIN_ENABLED=false，不导入 sqladmin / passlib，也不需要管理员凭证
+if settings.admin_enabled:
+    from app.admin_panel import mount_admin
+    mount_admin(app)
 
 # --- Root Endpoint ---
 @app.get("/")
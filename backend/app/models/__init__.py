@@ -1,5 +1,5 @@
 # Import from existing files
-from .tables import Photo, User, Tag, Collection
+from .tables import Photo, User, Tag, Collection, Job, DashboardStats, StatBucket
 from .schemas import PhotoCreate, PhotoResponse
 
-__all__ = ['Photo', 'User', 'Tag', 'Collection', 'PhotoCreate', 'PhotoResponse']
\ No newline at end of file
+__all__ = ['Photo', 'User', 'Tag', 'Collection', 'Job', 'DashboardStats', 'StatBucket', 'PhotoCreate', 'PhotoResponse']
\ No newline at end of file
@@ -12,6 +12,7 @@ class PhotoBase(BaseModel):
 
 class PhotoCreate(PhotoBase):
     r2_object_key: str
+    image_formats: List[str] = ["webp"]
 
 class PhotoResponse(PhotoBase):
     thumbnail_url: str
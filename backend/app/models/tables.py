@@ -1,49 +1,63 @@
 # backend/app/models/tables.py
-from sqlalchemy import Column, String, Float, DateTime, Text, Integer, ForeignKey, Table
+from sqlalchemy import Boolean, Column, String, Float, DateTime, Text, Integer, ForeignKey, Table, Index, PrimaryKeyConstraint, false
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.core.config import settings
 from app.db.database import Base
-import uuid
+from app.db.types import GUID, uuid7
 
 # 关联表：合集与图片的多对多关系
 collection_photos = Table(
     'collection_photos',
     Base.metadata,
-    Column('collection_id', String(36), ForeignKey('collections.id'), primary_key=True),
-    Column('photo_id', String(36), ForeignKey('photos.id'), primary_key=True),
-    Column('order_index', Integer, default=0)  # 用于排序
+    Column('collection_id', GUID(), ForeignKey('collections.id'), primary_key=True),
+    Column('photo_id', GUID(), ForeignKey('photos.id'), primary_key=True),
+    Column('order_index', Integer, default=0),  # 用于排序，相邻成员间隔 ORDER_GAP（见 crud_collections）
+    # 合集内按顺序分页：覆盖索引，查询无需回表
+    Index('ix_collection_photos_order', 'collection_id', 'order_index', 'photo_id'),
 )
 
 class Photo(Base):
     __tablename__ = "photos"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    id = Column(GUID(), primary_key=True, default=uuid7)
     public_id = Column(String(255), unique=True, index=True, nullable=False)
     title = Column(String(255), nullable=False)
     tags = Column(Text, nullable=False, default="[]")
     r2_object_key = Column(String(255), nullable=False)
     aspect_ratio = Column(Float, nullable=False)
     download_count = Column(Integer, default=0, nullable=False)
-    is_featured = Column(String(5), default='false', nullable=False)  # 使用字符串以兼容SQLite
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    is_featured = Column('featured', Boolean, default=False, server_default=false(), nullable=False)  # 旧字符串列 is_featured 在迁移收缩阶段删除
+    content_hash = Column(String(64), nullable=True, index=True)  # 原图SHA-256，由后台任务计算
+    perceptual_hash = Column(String(16), nullable=True)  # dHash感知哈希，用于查重
+    palette = Column(Text, nullable=True)  # 主色调JSON数组，如 ["#22c55e", ...]
+    image_formats = Column(String(64), default='webp', server_default='webp', nullable=False)  # 尺寸版本已生成的格式，逗号分隔
+    trending_score = Column(Float, default=0, server_default='0', nullable=False, index=True)  # 近期下载与浏览热度（时间衰减），由后台任务计算
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # 关系
     collections = relationship("Collection", secondary=collection_photos, back_populates="photos")
     
+    __table_args__ = (
+        # 精选feed：部分索引，只包含精选图片
+        Index('ix_photos_featured_created_at', 'created_at', postgresql_where=is_featured.is_(True), sqlite_where=is_featured.is_(True)),
+        # 热门feed与仪表盘Top N：下载量排序，同分按时间
+        Index('ix_photos_popular', 'download_count', 'created_at'),
+    )
+    
     @property
     def thumbnail_url(self):
-        from app.core.config import settings
         return f"{settings.cdn_base_url}/images/thumb/{self.r2_object_key}"
     
     @property
-    def is_featured_bool(self):
-        """返回布尔值的is_featured属性"""
-        return self.is_featured.lower() == 'true'
+    def image_format_list(self):
+        """尺寸版本可用的格式列表"""
+        return [fmt for fmt in (self.image_formats or 'webp').split(',') if fmt]
 
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String(32), unique=True, index=True)
     password = Column(String(255))
     role = Column(String(32), default='admin')
@@ -51,20 +65,21 @@ class User(Base):
 class Tag(Base):
     __tablename__ = "tags"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), unique=True, index=True)
     description = Column(Text, nullable=True)
 
 class Collection(Base):
     __tablename__ = "collections"
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    id = Column(GUID(), primary_key=True, default=uuid7)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     slug = Column(String(255), unique=True, index=True, nullable=False)  # URL友好的标识符
-    cover_photo_id = Column(String(36), ForeignKey('photos.id'), nullable=True)
-    is_published = Column(String(5), default='false', nullable=False)  # 是否发布
+    cover_photo_id = Column(GUID(), ForeignKey('photos.id'), nullable=True)
+    is_published = Column('published', Boolean, default=False, server_default=false(), nullable=False)  # 是否发布
     view_count = Column(Integer, default=0, nullable=False)
+    cache_version = Column(Integer, default=0, server_default='0', nullable=False)  # 合集或成员图片变更时递增，各进程据此丢弃详情缓存
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -72,7 +87,63 @@ class Collection(Base):
     photos = relationship("Photo", secondary=collection_photos, back_populates="collections")
     cover_photo = relationship("Photo", foreign_keys=[cover_photo_id])
     
-    @property
-    def is_published_bool(self):
-        """返回布尔值的is_published属性"""
-        return self.is_published.lower() == 'true'
\ No newline at end of file
+    __table_args__ = (
+        # 公开合集列表：部分索引，只包含已发布合集
+        Index('ix_collections_published_created_at', 'created_at', postgresql_where=is_published.is_(True), sqlite_where=is_published.is_(True)),
+    )
+
+class Job(Base):
+    """后台任务队列（worker.py 消费）"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True)
+    task = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON参数
+    status = Column(String(16), nullable=False, default='pending')  # pending/running/done/failed
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+    duration_ms = Column(Float, nullable=True)  # 最近一次执行耗时
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+class DashboardStats(Base):
+    """仪表盘统计快照（单行，由后台任务定期刷新）"""
+    __tablename__ = "dashboard_stats"
+    
+    id = Column(Integer, primary_key=True)
+    total_photos = Column(Integer, default=0, nullable=False)
+    total_downloads = Column(Integer, default=0, nullable=False)
+    featured_photos = Column(Integer, default=0, nullable=False)
+    total_users = Column(Integer, default=0, nullable=False)
+    total_tags = Column(Integer, default=0, nullable=False)
+    published_collections = Column(Integer, default=0, server_default='0', nullable=False)
+    popular_photos = Column(Text, nullable=False, default="[]")  # 下载量前N的图片摘要JSON
+    recent_photos = Column(Text, nullable=False, default="[]")  # 最新上传的图片摘要JSON
+    daily_activity = Column(Text, nullable=True)  # 近30天每日下载/浏览量JSON
+    refresh_ms = Column(Float, nullable=True)  # 最近一次刷新耗时
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+class StatBucket(Base):
+    """下载/浏览量时间分桶（小时桶定期合并为天桶）"""
+    __tablename__ = "stat_buckets"
+    
+    entity_type = Column(String(16), nullable=False)  # photo / collection
+    entity_id = Column(String(36), nullable=False)
+    metric = Column(String(16), nullable=False)  # download / view
+    granularity = Column(String(8), nullable=False)  # hour / day
+    bucket_start = Column(DateTime(timezone=True), nullable=False)  # 分桶起始时间（UTC）
+    count = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        # 按 类型+指标+粒度+时间 范围扫描（热度计算、图表、合并）
+        PrimaryKeyConstraint('entity_type', 'metric', 'granularity', 'bucket_start', 'entity_id'),
+        Index('ix_stat_buckets_bucket_start', 'bucket_start'),
+    )
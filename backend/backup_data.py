@@ -6,25 +6,60 @@
 """
 
 import os
-import shutil
+import gzip
+import graphlib
+import hashlib
+import io
 import sqlite3
 import json
+import shutil
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import zipfile
 import argparse
+import contextlib
+
+try:
+    # zstd 压缩为可选依赖
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXPORT_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
 
-def get_database_path():
-    """获取数据库路径"""
-    # 从环境变量或默认路径获取数据库位置
+# 备份压缩包格式：tar 流式写入多线程压缩器；zip 为逐文件单线程 DEFLATE（兼容旧格式）
+ARCHIVE_FORMATS = ('tar.zst', 'tar.gz', 'zip')
+DEFAULT_ARCHIVE_LEVELS = {'tar.zst': 3, 'tar.gz': 6, 'zip': 6}
+# 并行 gzip 每个独立压缩块的大小
+GZIP_BLOCK_SIZE = 1024 * 1024
+# NDJSON 直接写入 tar 流时，每个成员的大小上限：tar 头部需要预先知道成员大小，
+# 每张表按此大小在内存中分段缓冲后写出（table.ndjson.000、.001 ...），内存占用与表大小无关
+NDJSON_PART_BYTES = 64 * 1024 * 1024
+
+# 增量备份：数据块存储与各代备份的清单（位于备份目录下）
+CHUNK_STORE_DIR = 'chunks'
+GENERATIONS_DIR = 'generations'
+# 垃圾回收不删除最近修改的数据块：可能属于正在进行、清单尚未写出的备份
+CHUNK_GC_GRACE_SECONDS = 3600
+
+def get_database_target():
+    """解析 DATABASE_URL，返回 (backend, location)：('sqlite', 文件路径) 或 ('postgresql', libpq 连接串)"""
     db_url = os.getenv('DATABASE_URL', 'sqlite:///./solarpunk.db')
-    if db_url.startswith('sqlite:///'):
-        return db_url.replace('sqlite:///', '')
-    else:
-        print("⚠️  当前配置使用的不是SQLite数据库")
-        print(f"   数据库URL: {db_url}")
-        print("   此脚本仅支持SQLite数据库备份")
-        return None
+    scheme, _, rest = db_url.partition('://')
+    dialect = scheme.split('+', 1)[0]
+    if dialect == 'sqlite' and db_url.startswith(scheme + ':///'):
+        return 'sqlite', db_url[len(scheme) + 4:]
+    if dialect in ('postgresql', 'postgres'):
+        # 去掉 SQLAlchemy 的驱动后缀（如 postgresql+psycopg2://），libpq 只认 postgresql://
+        return 'postgresql', f"postgresql://{rest}"
+    print("⚠️  不支持的数据库类型")
+    print(f"   数据库URL: {db_url}")
+    print("   此脚本支持 SQLite 与 Postgres")
+    return None, None
 
 def create_backup_directory():
     """创建备份目录"""
@@ -32,8 +67,54 @@ def create_backup_directory():
     backup_dir.mkdir(exist_ok=True)
     return backup_dir
 
-def backup_database(db_path, backup_dir):
-    """备份数据库文件"""
+class BackupRestarted(Exception):
+    """备份期间源库被其他连接修改的次数超过上限"""
+
+def _journal_mode(conn):
+    return conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+
+def _copy_with_backup_api(source, target, pages, step_sleep, max_restarts):
+    """用 SQLite 在线备份API分步复制，返回 (总页数, 重启次数)
+
+    每步只复制 pages 页，步与步之间释放读锁并休眠 step_sleep 秒，写入方不会被长时间阻塞；
+    其他连接在备份期间写入会使备份从头开始，超过 max_restarts 次后改为一步完成。
+    """
+    state = {"remaining": None, "restarts": 0, "total": 0, "last_report": 0.0}
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise BackupRestarted()
+        state["remaining"], state["total"] = remaining, total
+        now = time.monotonic()
+        if now - state["last_report"] >= 1 or remaining == 0:
+            state["last_report"] = now
+            done = total - remaining
+            print(f"   进度: {done}/{total} 页 ({done / total:.0%})" if total else "   进度: 0/0 页", flush=True)
+        if remaining and step_sleep > 0:
+            time.sleep(step_sleep)
+
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    except BackupRestarted:
+        print(f"   ⚠️  源库持续写入，已重启 {state['restarts']} 次，改为一次性复制")
+        source.backup(target, pages=-1)
+        state["total"] = source.execute("PRAGMA page_count").fetchone()[0]
+    return state["total"], state["restarts"]
+
+def verify_backup(backup_path, quick=False):
+    """对备份文件执行完整性检查，返回 (是否通过, 结果摘要)"""
+    conn = sqlite3.connect(backup_path)
+    try:
+        pragma = "quick_check" if quick else "integrity_check"
+        rows = [row[0] for row in conn.execute(f"PRAGMA {pragma}")]
+        return rows == ["ok"], "; ".join(rows[:5])
+    finally:
+        conn.close()
+
+def backup_database(db_path, backup_dir, method='backup', pages=256, step_sleep=0.01, max_restarts=3, quick_check=False):
+    """在线备份数据库文件（一致性快照，不阻塞API写入），校验通过后才生成最终文件"""
     if not Path(db_path).exists():
         print(f"❌ 数据库文件不存在: {db_path}")
         return None
@@ -41,79 +122,678 @@ def backup_database(db_path, backup_dir):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_filename = f"solarpunk_db_backup_{timestamp}.db"
     backup_path = backup_dir / backup_filename
+    partial_path = backup_path.with_suffix('.db.partial')
     
+    source = None
     try:
-        shutil.copy2(db_path, backup_path)
+        # busy timeout：写入方持有锁时等待而不是立即失败
+        source = sqlite3.connect(db_path, timeout=30)
+        journal_mode = _journal_mode(source)
+        page_size = source.execute("PRAGMA page_size").fetchone()[0]
+        print(f"   日志模式: {journal_mode}，页大小: {page_size} 字节，方法: {method}")
+        if partial_path.exists():
+            partial_path.unlink()
+        
+        started = time.perf_counter()
+        restarts = 0
+        if method == 'vacuum':
+            # VACUUM INTO 在单个读事务中写出紧凑副本（WAL模式下不阻塞写入，回滚日志模式下会阻塞到完成）
+            source.execute("VACUUM INTO ?", (str(partial_path),))
+            target = sqlite3.connect(partial_path)
+            total_pages = target.execute("PRAGMA page_count").fetchone()[0]
+        elif journal_mode == 'wal':
+            # WAL模式下读事务不阻塞写入：一步复制即得到一致快照，也不会因并发写入而重启
+            target = sqlite3.connect(partial_path)
+            source.backup(target, pages=-1)
+            total_pages = target.execute("PRAGMA page_count").fetchone()[0]
+        else:
+            # 回滚日志模式下读锁会阻塞写入：分步复制并在步间让出锁
+            target = sqlite3.connect(partial_path)
+            total_pages, restarts = _copy_with_backup_api(source, target, pages, step_sleep, max_restarts)
+        # 源库为WAL模式时副本头部也标记为WAL，切回 DELETE 使备份是自包含的单个文件
+        if _journal_mode(target) == 'wal':
+            target.execute("PRAGMA journal_mode=DELETE")
+        target.close()
+        elapsed = time.perf_counter() - started
+        
+        ok, detail = verify_backup(partial_path, quick=quick_check)
+        if not ok:
+            partial_path.unlink()
+            print(f"❌ 备份完整性检查失败: {detail}")
+            return None
+        partial_path.replace(backup_path)
+        
+        size = backup_path.stat().st_size
+        throughput = size / 1024 / 1024 / elapsed if elapsed > 0 else 0.0
         print(f"✅ 数据库备份成功: {backup_path}")
+        print(f"   {total_pages} 页, {size / 1024 / 1024:.2f} MB, 耗时 {elapsed:.2f}s ({throughput:.1f} MB/s), "
+              f"重启 {restarts} 次, {'quick_check' if quick_check else 'integrity_check'}: ok")
         return backup_path
     except Exception as e:
         print(f"❌ 数据库备份失败: {e}")
+        if partial_path.exists():
+            partial_path.unlink()
         return None
+    finally:
+        if source is not None:
+            source.close()
+
+def open_compressed(path, mode='wb', compression='none'):
+    """按压缩格式打开二进制文件流（写入时边写边压缩，读取时边读边解压）"""
+    if compression == 'gzip':
+        return gzip.open(path, mode, compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd 压缩需要安装 zstandard 包")
+        raw = open(path, mode)
+        if 'w' in mode:
+            return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, mode)
 
-def export_data_to_json(db_path, backup_dir):
-    """导出数据为JSON格式"""
+def _json_default(value):
+    """JSON无法直接表示的值：二进制（如UUID主键）编码为 {"$bytes": hex}"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$bytes": bytes(value).hex()}
+    return str(value)
+
+def _decode_value(value):
+    if isinstance(value, dict) and set(value) == {"$bytes"}:
+        return bytes.fromhex(value["$bytes"])
+    return value
+
+def _user_tables(conn):
+    cursor = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'alembic_%' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def _ndjson_chunks(conn, table, chunk_size):
+    """按块读取一张表，逐块产出 NDJSON 字节；返回列名与产出器"""
+    cursor = conn.execute(f'SELECT * FROM "{table}"')
+    columns = [description[0] for description in cursor.description]
+
+    def chunks():
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield len(chunk), "".join(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(',', ':'), default=_json_default) + "\n"
+                for row in chunk
+            ).encode('utf-8')
+    return columns, chunks()
+
+def _new_manifest(compression):
+    return {
+        'format': 'ndjson',
+        'export_time': datetime.now().isoformat(),
+        'compression': compression,
+        'tables': [],
+    }
+
+def export_data_to_ndjson(db_path, backup_dir, compression='gzip', chunk_size=1000):
+    """流式导出：每张表一个 NDJSON 文件（可压缩），按块读取游标，内存占用与数据量无关"""
     if not Path(db_path).exists():
         return None
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    json_filename = f"solarpunk_data_export_{timestamp}.json"
-    json_path = backup_dir / json_filename
+    export_dir = backup_dir / f"solarpunk_data_export_{timestamp}"
+    suffix = EXPORT_SUFFIXES[compression]
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
-        
-        export_data = {
-            'export_time': datetime.now().isoformat(),
-            'tables': {}
-        }
-        
-        # 获取所有表名
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'alembic_%'")
-        tables = [row[0] for row in cursor.fetchall()]
+        export_dir.mkdir()
+        conn = sqlite3.connect(db_path, timeout=30)
+        manifest = _new_manifest(compression)
+        started = time.perf_counter()
+        # 所有表在同一个读事务中导出，得到一致快照
+        conn.execute("BEGIN")
+        for table in _user_tables(conn):
+            columns, chunks = _ndjson_chunks(conn, table, chunk_size)
+            file_name = f"{table}.ndjson{suffix}"
+            rows = 0
+            with open_compressed(export_dir / file_name, 'wb', compression) as stream:
+                for count, data in chunks:
+                    stream.write(data)
+                    rows += count
+            manifest['tables'].append({'name': table, 'files': [file_name], 'columns': columns, 'rows': rows})
+            print(f"   导出表 {table}: {rows} 条记录")
+        conn.rollback()
+        conn.close()
         
-        for table in tables:
-            cursor = conn.execute(f"SELECT * FROM {table}")
-            rows = cursor.fetchall()
-            export_data['tables'][table] = [dict(row) for row in rows]
-            print(f"   导出表 {table}: {len(rows)} 条记录")
+        (export_dir / 'manifest.json').write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+        elapsed = time.perf_counter() - started
+        size = sum(path.stat().st_size for path in export_dir.iterdir())
+        print(f"✅ 数据导出成功: {export_dir} ({size / 1024 / 1024:.2f} MB, 耗时 {elapsed:.2f}s)")
+        return export_dir
         
+    except Exception as e:
+        print(f"❌ 数据导出失败: {e}")
+        return None
+
+def _add_tar_member(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+def export_ndjson_to_tar(db_path, tar, chunk_size=1000, part_bytes=NDJSON_PART_BYTES):
+    """把各表的 NDJSON 直接写入 tar 流（不落盘、不单独压缩，由压缩包整体压缩），返回写入的字节数
+
+    成员位于 solarpunk_data_export_<时间戳>/ 下，解包后的目录可直接用于 --restore。
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    prefix = f"solarpunk_data_export_{timestamp}"
+    conn = sqlite3.connect(db_path, timeout=30)
+    manifest = _new_manifest('none')
+    written = 0
+    started = time.perf_counter()
+    try:
+        # 所有表在同一个读事务中导出，得到一致快照
+        conn.execute("BEGIN")
+        for table in _user_tables(conn):
+            columns, chunks = _ndjson_chunks(conn, table, chunk_size)
+            files, buffer, rows = [], bytearray(), 0
+
+            def flush_part():
+                file_name = f"{table}.ndjson.{len(files):03d}"
+                _add_tar_member(tar, f"{prefix}/{file_name}", bytes(buffer))
+                files.append(file_name)
+                return len(buffer)
+
+            for count, data in chunks:
+                buffer += data
+                rows += count
+                if len(buffer) >= part_bytes:
+                    written += flush_part()
+                    buffer.clear()
+            # 空表也写出一个空成员，恢复时每张表至少有一个文件
+            if buffer or not files:
+                written += flush_part()
+            manifest['tables'].append({'name': table, 'files': files, 'columns': columns, 'rows': rows})
+            print(f"   导出表 {table}: {rows} 条记录")
+        conn.rollback()
+    finally:
         conn.close()
+    _add_tar_member(tar, f"{prefix}/manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    print(f"✅ 数据已直接写入压缩包: {prefix}/ ({written / 1024 / 1024:.2f} MB 未压缩, 耗时 {time.perf_counter() - started:.2f}s)")
+    return written
+
+def import_ndjson(export_dir, db_path, batch_size=1000, replace=False):
+    """从 NDJSON 导出目录流式恢复到 SQLite 数据库（表结构需先通过 alembic 创建）"""
+    export_dir = Path(export_dir)
+    manifest = json.loads((export_dir / 'manifest.json').read_text(encoding='utf-8'))
+    conn = sqlite3.connect(db_path, timeout=30)
+    started = time.perf_counter()
+    try:
+        existing = set(_user_tables(conn))
+        for table in manifest['tables']:
+            name, columns = table['name'], table['columns']
+            if name not in existing:
+                print(f"   ⚠️  目标库缺少表 {name}，跳过")
+                continue
+            if replace:
+                conn.execute(f'DELETE FROM "{name}"')
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join("?" for _ in columns)
+            statement = f'INSERT INTO "{name}" ({column_list}) VALUES ({placeholders})'
+            rows, batch = 0, []
+            # 旧版导出每张表只有一个 file；直接写入压缩包的导出按大小分为多个 files
+            for file_name in table.get('files') or [table['file']]:
+                with open_compressed(export_dir / file_name, 'rb', manifest['compression']) as raw:
+                    for line in io.TextIOWrapper(raw, encoding='utf-8'):
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        batch.append(tuple(_decode_value(record.get(column)) for column in columns))
+                        if len(batch) >= batch_size:
+                            conn.executemany(statement, batch)
+                            rows += len(batch)
+                            batch = []
+            if batch:
+                conn.executemany(statement, batch)
+                rows += len(batch)
+            print(f"   恢复表 {name}: {rows} 条记录")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"✅ 数据恢复完成，耗时 {time.perf_counter() - started:.2f}s")
+
+def _chunk_path(store, digest, compression):
+    return store / digest[:2] / f"{digest}{EXPORT_SUFFIXES[compression]}"
+
+def _find_chunk(store, digest):
+    """按任意压缩格式查找已存储的数据块，返回 (路径, 压缩格式)"""
+    for compression in EXPORT_SUFFIXES:
+        path = _chunk_path(store, digest, compression)
+        if path.exists():
+            return path, compression
+    return None, None
+
+def backup_incremental(db_path, backup_dir, chunk_pages=16, compression='gzip', **backup_options):
+    """增量备份：对一致性快照按页对齐分块，只存储内容哈希未出现过的数据块，并写出本代清单"""
+    snapshot = backup_database(db_path, backup_dir, **backup_options)
+    if snapshot is None:
+        return None
+    
+    generation = snapshot.stem.removeprefix('solarpunk_db_backup_')
+    store = backup_dir / CHUNK_STORE_DIR
+    generations = backup_dir / GENERATIONS_DIR
+    try:
+        generations.mkdir(exist_ok=True)
+        with sqlite3.connect(snapshot) as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        # SQLite 按页原地修改，页对齐的定长分块不会因插入而整体错位，效果等同内容定义分块且无需滚动哈希
+        chunk_size = page_size * chunk_pages
+        started = time.perf_counter()
+        digests = []
+        new_chunks = new_bytes = 0
+        whole = hashlib.sha256()
+        with open(snapshot, 'rb') as source:
+            while True:
+                block = source.read(chunk_size)
+                if not block:
+                    break
+                whole.update(block)
+                digest = hashlib.sha256(block).hexdigest()
+                digests.append(digest)
+                if _find_chunk(store, digest)[0] is not None:
+                    continue
+                path = _chunk_path(store, digest, compression)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                partial = path.with_name(path.name + '.partial')
+                with open_compressed(partial, 'wb', compression) as stream:
+                    stream.write(block)
+                partial.replace(path)
+                new_chunks += 1
+                new_bytes += path.stat().st_size
         
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2, default=str)
-        
-        print(f"✅ 数据导出成功: {json_path}")
-        return json_path
+        manifest = {
+            'format': 'chunked_sqlite',
+            'generation': generation,
+            'created': datetime.now().isoformat(),
+            'page_size': page_size,
+            'chunk_size': chunk_size,
+            'size': snapshot.stat().st_size,
+            'sha256': whole.hexdigest(),
+            'chunks': digests,
+            'new_chunks': new_chunks,
+            'new_bytes': new_bytes,
+        }
+        manifest_path = generations / f"{generation}.json"
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        elapsed = time.perf_counter() - started
+        print(f"✅ 增量备份成功: 第 {generation} 代, {len(digests)} 个数据块, 新增 {new_chunks} 个 "
+              f"({new_bytes / 1024 / 1024:.2f} MB), 耗时 {elapsed:.2f}s")
+        return manifest_path
+    except Exception as e:
+        print(f"❌ 增量备份失败: {e}")
+        return None
+    finally:
+        # 快照内容已进入数据块存储，不保留完整副本
+        snapshot.unlink(missing_ok=True)
+
+def list_generations(backup_dir):
+    """按时间顺序返回所有备份代的清单"""
+    generations = backup_dir / GENERATIONS_DIR
+    if not generations.exists():
+        return []
+    return [json.loads(path.read_text(encoding='utf-8')) for path in sorted(generations.glob('*.json'))]
+
+def restore_generation(backup_dir, generation, output_path):
+    """把某一代备份重新拼装为完整的 SQLite 文件，校验哈希与完整性后写到 output_path"""
+    manifests = list_generations(backup_dir)
+    if not manifests:
+        print("❌ 没有可用的增量备份")
+        return None
+    if generation == 'latest':
+        manifest = manifests[-1]
+    else:
+        manifest = next((item for item in manifests if item['generation'] == generation), None)
+        if manifest is None:
+            print(f"❌ 备份代不存在: {generation}")
+            return None
+    
+    store = backup_dir / CHUNK_STORE_DIR
+    output_path = Path(output_path or backup_dir / f"solarpunk_restored_{manifest['generation']}.db")
+    partial = output_path.with_name(output_path.name + '.partial')
+    whole = hashlib.sha256()
+    try:
+        with open(partial, 'wb') as target:
+            for digest in manifest['chunks']:
+                path, compression = _find_chunk(store, digest)
+                if path is None:
+                    raise FileNotFoundError(f"缺少数据块 {digest}")
+                with open_compressed(path, 'rb', compression) as stream:
+                    block = stream.read()
+                whole.update(block)
+                target.write(block)
+        if whole.hexdigest() != manifest['sha256']:
+            raise ValueError("拼装结果的 SHA-256 与清单不一致")
+        ok, detail = verify_backup(partial)
+        if not ok:
+            raise ValueError(f"完整性检查失败: {detail}")
+        partial.replace(output_path)
+    except Exception as e:
+        partial.unlink(missing_ok=True)
+        print(f"❌ 恢复失败: {e}")
+        return None
+    print(f"✅ 已恢复第 {manifest['generation']} 代备份: {output_path} ({manifest['size'] / 1024 / 1024:.2f} MB)")
+    return output_path
+
+def gc_chunks(backup_dir):
+    """删除不再被任何备份代引用的数据块，返回 (删除数量, 释放字节数)"""
+    store = backup_dir / CHUNK_STORE_DIR
+    if not store.exists():
+        return 0, 0
+    referenced = {digest for manifest in list_generations(backup_dir) for digest in manifest['chunks']}
+    cutoff = time.time() - CHUNK_GC_GRACE_SECONDS
+    deleted = freed = 0
+    for path in store.glob('*/*'):
+        digest = path.name.split('.', 1)[0]
+        stat = path.stat()
+        if digest in referenced or stat.st_mtime > cutoff:
+            continue
+        path.unlink()
+        deleted += 1
+        freed += stat.st_size
+    return deleted, freed
+
+def _pg_connect(dsn):
+    import psycopg2  # 仅 Postgres 备份需要
+    return psycopg2.connect(dsn)
+
+def _pg_tables(cur):
+    """当前 schema 的用户表，按外键依赖排序（被引用的表在前），返回 [(表名, 字节数)]"""
+    cur.execute("""
+        SELECT c.relname, pg_total_relation_size(c.oid)
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema() AND c.relname <> 'alembic_version'
+    """)
+    sizes = dict(cur.fetchall())
+    cur.execute("""
+        SELECT child.relname, parent.relname
+        FROM pg_constraint con
+        JOIN pg_class child ON child.oid = con.conrelid
+        JOIN pg_class parent ON parent.oid = con.confrelid
+        JOIN pg_namespace n ON n.oid = con.connamespace
+        WHERE con.contype = 'f' AND n.nspname = current_schema()
+    """)
+    sorter = graphlib.TopologicalSorter({name: set() for name in sizes})
+    for child, parent in cur.fetchall():
+        if child in sizes and parent in sizes and child != parent:
+            sorter.add(child, parent)
+    return [(name, sizes[name]) for name in sorter.static_order()]
+
+def _pg_copy_table(dsn, snapshot_id, table, export_dir, compression):
+    """在共享快照中把一张表 COPY 到压缩文件，返回该表的 manifest 条目"""
+    from psycopg2 import sql
+    conn = _pg_connect(dsn)
+    try:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with conn.cursor() as cur:
+            # 必须是事务中的第一条语句：所有worker看到与协调连接完全相同的数据
+            cur.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+            cur.execute(sql.SQL("SELECT * FROM {} LIMIT 0").format(sql.Identifier(table)))
+            columns = [description[0] for description in cur.description]
+            file_name = f"{table}.csv{EXPORT_SUFFIXES[compression]}"
+            started = time.perf_counter()
+            with open_compressed(export_dir / file_name, 'wb', compression) as stream:
+                cur.copy_expert(
+                    sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER true)").format(sql.Identifier(table)).as_string(conn),
+                    stream
+                )
+            rows = cur.rowcount
+        conn.rollback()
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    print(f"   导出表 {table}: {rows} 条记录 ({elapsed:.2f}s)", flush=True)
+    return {'name': table, 'file': file_name, 'columns': columns, 'rows': rows}
+
+def export_postgres(dsn, backup_dir, compression='gzip', workers=4):
+    """Postgres 并行导出：协调连接导出快照，多个连接共享该快照并行 COPY 各表"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    export_dir = backup_dir / f"solarpunk_pg_export_{timestamp}"
+    
+    try:
+        export_dir.mkdir()
+        started = time.perf_counter()
+        coordinator = _pg_connect(dsn)
+        try:
+            coordinator.set_session(isolation_level='REPEATABLE READ', readonly=True)
+            with coordinator.cursor() as cur:
+                tables = _pg_tables(cur)
+                cur.execute("SELECT pg_export_snapshot()")
+                snapshot_id = cur.fetchone()[0]
+            print(f"   快照 {snapshot_id}: {len(tables)} 张表, {workers} 个并行连接")
+            # 大表先开始，缩短整体耗时；协调连接的事务保持打开直到所有worker完成
+            schedule = sorted(tables, key=lambda table: table[1], reverse=True)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                entries = {entry['name']: entry for entry in pool.map(
+                    lambda table: _pg_copy_table(dsn, snapshot_id, table[0], export_dir, compression), schedule
+                )}
+        finally:
+            coordinator.rollback()
+            coordinator.close()
         
+        manifest = {
+            'format': 'pg_copy_csv',
+            'export_time': datetime.now().isoformat(),
+            'compression': compression,
+            'snapshot': snapshot_id,
+            # 按外键依赖顺序记录，恢复时依次 COPY
+            'tables': [entries[name] for name, _ in tables],
+        }
+        (export_dir / 'manifest.json').write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+        elapsed = time.perf_counter() - started
+        raw_size = sum(size for _, size in tables)
+        size = sum(path.stat().st_size for path in export_dir.iterdir())
+        print(f"✅ Postgres 导出成功: {export_dir}")
+        print(f"   {size / 1024 / 1024:.2f} MB（表+索引 {raw_size / 1024 / 1024:.2f} MB）, 耗时 {elapsed:.2f}s")
+        return export_dir
+    
     except Exception as e:
-        print(f"❌ 数据导出失败: {e}")
+        shutil.rmtree(export_dir, ignore_errors=True)
+        print(f"❌ Postgres 导出失败: {e}")
         return None
 
-def create_backup_archive(backup_files, backup_dir):
-    """创建备份压缩包"""
+def import_postgres(export_dir, dsn, replace=False):
+    """在一个事务中把 COPY 导出恢复到 Postgres（表结构需先通过 alembic 创建）"""
+    from psycopg2 import sql
+    export_dir = Path(export_dir)
+    manifest = json.loads((export_dir / 'manifest.json').read_text(encoding='utf-8'))
+    started = time.perf_counter()
+    conn = _pg_connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:
+            tables = manifest['tables']
+            if replace:
+                cur.execute(sql.SQL("TRUNCATE {} CASCADE").format(
+                    sql.SQL(", ").join(sql.Identifier(table['name']) for table in tables)
+                ))
+            for table in tables:
+                statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(
+                    sql.Identifier(table['name']), sql.SQL(", ").join(sql.Identifier(column) for column in table['columns'])
+                )
+                with open_compressed(export_dir / table['file'], 'rb', manifest['compression']) as stream:
+                    cur.copy_expert(statement.as_string(conn), stream)
+                # 自增主键的序列跟上已恢复的最大值
+                for column in table['columns']:
+                    cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (table['name'], column))
+                    sequence = cur.fetchone()[0]
+                    if sequence:
+                        cur.execute(sql.SQL("SELECT setval(%s, COALESCE(MAX({}), 0) + 1, false) FROM {}").format(
+                            sql.Identifier(column), sql.Identifier(table['name'])
+                        ), (sequence,))
+                print(f"   恢复表 {table['name']}: {table['rows']} 条记录")
+    finally:
+        conn.close()
+    print(f"✅ 数据恢复完成，耗时 {time.perf_counter() - started:.2f}s")
+
+class ParallelGzipWriter(io.RawIOBase):
+    """多线程 gzip 写入流：输入切成定长块并行压缩，每块是一个独立的 gzip 成员，按顺序拼接
+    （多成员 gzip 是合法格式，gzip -d / tar -xzf / Python gzip 均可直接解压）"""
+
+    def __init__(self, raw, level=6, threads=None, block_size=GZIP_BLOCK_SIZE):
+        self._raw = raw
+        self._level = level
+        self._block_size = block_size
+        self._threads = threads or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=self._threads)
+        self._pending = deque()
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        return len(data)
+
+    def _submit(self, block):
+        # zlib 压缩时释放GIL，线程即可并行；待写出的块数有上限，内存占用与输入大小无关
+        self._pending.append(self._pool.submit(gzip.compress, block, self._level, mtime=0))
+        while len(self._pending) > self._threads * 2:
+            self._raw.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._raw.write(self._pending.popleft().result())
+        finally:
+            self._pool.shutdown()
+            self._raw.close()
+            super().close()
+
+def open_archive_stream(path, archive_format, level, threads):
+    """打开多线程压缩的写入流"""
+    raw = open(path, 'wb')
+    if archive_format == 'tar.zst':
+        return zstandard.ZstdCompressor(level=level, threads=threads).stream_writer(raw, closefd=True)
+    return ParallelGzipWriter(raw, level=level, threads=threads)
+
+def default_archive_format():
+    return 'tar.zst' if zstandard is not None else 'tar.gz'
+
+def create_backup_archive(backup_files, backup_dir, archive_format=None, level=None, threads=None, name='solarpunk_backup', streams=()):
+    """创建备份压缩包：tar 流直接写入多线程压缩器，不生成未压缩的中间文件
+
+    streams 为直接向 tar 写入成员的导出函数（接收 TarFile，返回写入的字节数），只支持 tar 格式。
+    """
+    archive_format = archive_format or default_archive_format()
+    level = DEFAULT_ARCHIVE_LEVELS[archive_format] if level is None else level
+    threads = threads or os.cpu_count() or 1
+    if archive_format == 'tar.zst' and zstandard is None:
+        print("❌ tar.zst 需要安装 zstandard 包")
+        return None
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    archive_filename = f"solarpunk_backup_{timestamp}.zip"
-    archive_path = backup_dir / archive_filename
+    archive_path = backup_dir / f"{name}_{timestamp}.{archive_format}"
+    sources = [Path(file_path) for file_path in backup_files if file_path and Path(file_path).exists()]
+    if streams and archive_format == 'zip':
+        print("❌ zip 压缩包不支持直接写入导出数据")
+        return None
     
     try:
-        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in backup_files:
-                if file_path and Path(file_path).exists():
-                    zipf.write(file_path, Path(file_path).name)
+        started = time.perf_counter()
+        streamed_size = 0
+        if archive_format == 'zip':
+            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as zipf:
+                for file_path in sources:
+                    if file_path.is_dir():
+                        # 导出目录：已压缩的表文件直接存储，不再二次压缩
+                        for member in sorted(file_path.iterdir()):
+                            compress = zipfile.ZIP_STORED if member.suffix in ('.gz', '.zst') else zipfile.ZIP_DEFLATED
+                            zipf.write(member, f"{file_path.name}/{member.name}", compress_type=compress)
+                    else:
+                        zipf.write(file_path, file_path.name)
+        else:
+            stream = open_archive_stream(archive_path, archive_format, level, threads)
+            try:
+                with tarfile.open(fileobj=stream, mode='w|') as tar:
+                    for file_path in sources:
+                        tar.add(file_path, arcname=file_path.name)
+                    for export in streams:
+                        streamed_size += export(tar)
+            finally:
+                stream.close()
+        elapsed = time.perf_counter() - started
         
+        input_size = sum(_path_size(file_path) for file_path in sources) + streamed_size
+        size = archive_path.stat().st_size
+        throughput = input_size / 1024 / 1024 / elapsed if elapsed > 0 else 0.0
         print(f"✅ 备份压缩包创建成功: {archive_path}")
+        print(f"   {archive_format} 级别 {level}, {threads} 线程: {input_size / 1024 / 1024:.2f} MB → {size / 1024 / 1024:.2f} MB, "
+              f"耗时 {elapsed:.2f}s ({throughput:.1f} MB/s)")
         return archive_path
         
     except Exception as e:
+        archive_path.unlink(missing_ok=True)
         print(f"❌ 创建备份压缩包失败: {e}")
         return None
 
+def benchmark_archives(backup_files, backup_dir, threads=None):
+    """对当前备份文件比较各压缩格式/级别/线程数的耗时与体积，结果不保留"""
+    threads = threads or os.cpu_count() or 1
+    sources = [Path(file_path) for file_path in backup_files if file_path and Path(file_path).exists()]
+    input_size = sum(_path_size(file_path) for file_path in sources)
+    configs = [('zip', 6, 1), ('tar.gz', 1, 1), ('tar.gz', 6, 1), ('tar.gz', 1, threads), ('tar.gz', 6, threads)]
+    if zstandard is not None:
+        configs += [('tar.zst', 3, 1), ('tar.zst', 3, threads), ('tar.zst', 10, threads), ('tar.zst', 19, threads)]
+    
+    print(f"\n⏱️  压缩包基准: 输入 {input_size / 1024 / 1024:.2f} MB")
+    print(f"   {'格式':<8} {'级别':>4} {'线程':>4} {'耗时(s)':>8} {'MB/s':>8} {'大小(MB)':>9} {'压缩比':>6}")
+    for archive_format, level, config_threads in dict.fromkeys(configs):
+        bench_dir = backup_dir / '.archive_benchmark'
+        bench_dir.mkdir(exist_ok=True)
+        try:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                archive = create_backup_archive(sources, bench_dir, archive_format, level, config_threads)
+            elapsed = time.perf_counter() - started
+            if archive is None:
+                continue
+            size = archive.stat().st_size
+            print(f"   {archive_format:<8} {level:>4} {config_threads:>4} {elapsed:>8.2f} {input_size / 1024 / 1024 / elapsed:>8.1f} "
+                  f"{size / 1024 / 1024:>9.2f} {input_size / size:>6.2f}")
+        finally:
+            shutil.rmtree(bench_dir, ignore_errors=True)
+
+def _path_size(path):
+    path = Path(path)
+    if path.is_dir():
+        return sum(member.stat().st_size for member in path.rglob('*') if member.is_file())
+    return path.stat().st_size
+
+def print_backup_files(backup_files):
+    """备份文件信息"""
+    print("\n💾 备份文件:")
+    for file_path in backup_files:
+        if file_path and Path(file_path).exists():
+            file_path = Path(file_path)
+            print(f"   • {file_path.name}: {_path_size(file_path) / 1024 / 1024:.2f} MB")
+
 def generate_backup_report(db_path, backup_files):
     """生成备份报告"""
     print("\n📊 备份报告")
     print("=" * 50)
     
+    if db_path is None:
+        # Postgres：各表记录数已在导出时输出
+        print_backup_files(backup_files)
+        return
+    
     if not Path(db_path).exists():
         print("❌ 数据库文件不存在")
         return
@@ -141,27 +821,28 @@ def generate_backup_report(db_path, backup_files):
         
         conn.close()
         
-        # 备份文件信息
-        print("\n💾 备份文件:")
-        for file_path in backup_files:
-            if file_path and Path(file_path).exists():
-                size = Path(file_path).stat().st_size
-                print(f"   • {Path(file_path).name}: {size / 1024 / 1024:.2f} MB")
+        print_backup_files(backup_files)
         
     except Exception as e:
         print(f"❌ 生成报告失败: {e}")
 
 def cleanup_old_backups(backup_dir, keep_days=7):
-    """清理旧备份文件"""
+    """清理旧备份文件、导出目录与过期的备份代，并回收不再引用的数据块"""
     print(f"\n🧹 清理{keep_days}天前的备份文件...")
     
     cutoff_time = datetime.now().timestamp() - (keep_days * 24 * 60 * 60)
     deleted_count = 0
     
-    for file_path in backup_dir.glob('*'):
-        if file_path.is_file() and file_path.stat().st_mtime < cutoff_time:
+    candidates = [path for path in backup_dir.glob('*') if path.name not in (CHUNK_STORE_DIR, GENERATIONS_DIR)]
+    # 最新一代清单始终保留，保证至少有一个可恢复的时间点
+    candidates += sorted((backup_dir / GENERATIONS_DIR).glob('*.json'))[:-1]
+    for file_path in candidates:
+        if file_path.stat().st_mtime < cutoff_time:
             try:
-                file_path.unlink()
+                if file_path.is_dir():
+                    shutil.rmtree(file_path)
+                else:
+                    file_path.unlink()
                 print(f"   删除: {file_path.name}")
                 deleted_count += 1
             except Exception as e:
@@ -171,6 +852,10 @@ def cleanup_old_backups(backup_dir, keep_days=7):
         print("   没有需要清理的文件")
     else:
         print(f"   共删除 {deleted_count} 个文件")
+    
+    chunks, freed = gc_chunks(backup_dir)
+    if chunks:
+        print(f"   回收 {chunks} 个未引用的数据块, 释放 {freed / 1024 / 1024:.2f} MB")
 
 def show_backup_recommendations():
     """显示备份建议"""
@@ -202,17 +887,60 @@ def main():
     parser = argparse.ArgumentParser(description='Solarpunk Gallery 数据备份工具')
     parser.add_argument('--cleanup-days', type=int, default=7, help='清理多少天前的备份文件(默认7天)')
     parser.add_argument('--no-cleanup', action='store_true', help='跳过清理旧备份')
-    parser.add_argument('--json-only', action='store_true', help='仅导出JSON格式')
+    parser.add_argument('--json-only', action='store_true', help='仅导出NDJSON数据')
     parser.add_argument('--db-only', action='store_true', help='仅备份数据库文件')
+    parser.add_argument('--method', choices=['backup', 'vacuum'], default='backup', help='backup: 在线备份API分步复制; vacuum: VACUUM INTO 紧凑副本')
+    parser.add_argument('--pages', type=int, default=256, help='在线备份每步复制的页数(默认256，WAL模式下一步完成)')
+    parser.add_argument('--step-sleep', type=float, default=0.01, help='在线备份每步之间的休眠秒数，让出写锁(默认0.01)')
+    parser.add_argument('--max-restarts', type=int, default=3, help='源库持续写入导致备份重启的上限，超过后一次性复制(默认3)')
+    parser.add_argument('--quick-check', action='store_true', help='使用 quick_check 代替完整的 integrity_check')
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'], default='gzip', help='导出文件的压缩格式(默认gzip，zstd需安装zstandard；打包为tar时导出不单独压缩)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='导出/恢复时每批读写的行数(默认1000)')
+    parser.add_argument('--restore', '--restore-json', dest='restore', metavar='EXPORT_DIR', help='从导出目录（SQLite为NDJSON，Postgres为COPY）恢复数据到当前数据库后退出')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='Postgres 并行导出的连接数(默认4)')
+    parser.add_argument('--replace', action='store_true', help='恢复前清空目标表')
+    parser.add_argument('--incremental', action='store_true', help='增量备份：数据库快照分块去重存入数据块存储，不生成完整副本、NDJSON与压缩包')
+    parser.add_argument('--chunk-pages', type=int, default=16, help='增量备份每个数据块包含的数据库页数(默认16)')
+    parser.add_argument('--list-generations', action='store_true', help='列出所有增量备份代后退出')
+    parser.add_argument('--restore-generation', metavar='GENERATION', help="把某一代增量备份（时间戳或 latest）拼装为数据库文件后退出")
+    parser.add_argument('--output', help='--restore-generation 的输出路径(默认写入备份目录)')
+    parser.add_argument('--no-archive', action='store_true', help='不生成备份压缩包')
+    parser.add_argument('--archive-format', choices=ARCHIVE_FORMATS, help='备份压缩包格式(默认: 安装了zstandard时为tar.zst，否则tar.gz)')
+    parser.add_argument('--archive-level', type=int, help='压缩级别(默认: tar.zst为3，tar.gz/zip为6)')
+    parser.add_argument('--archive-threads', type=int, default=os.cpu_count() or 1, help='压缩线程数(默认CPU核数)')
+    parser.add_argument('--keep-files', action='store_true', help='压缩包创建成功后仍保留其中已包含的数据库副本与导出目录(默认删除)')
+    # 旧参数：删除已打包的输入现在是默认行为，保留以兼容已有的定时任务
+    parser.add_argument('--archive-only', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--benchmark-archive', action='store_true', help='比较各压缩格式/级别/线程数的耗时与体积')
     
     args = parser.parse_args()
     
     print("💾 Solarpunk Gallery 数据备份工具")
     print("=" * 50)
     
-    # 获取数据库路径
-    db_path = get_database_path()
-    if not db_path:
+    # 获取数据库位置
+    backend, db_location = get_database_target()
+    if not backend:
+        return
+    
+    if args.list_generations:
+        print("\n🗂️  增量备份代:")
+        for manifest in list_generations(create_backup_directory()):
+            print(f"   • {manifest['generation']}: {manifest['size'] / 1024 / 1024:.2f} MB, "
+                  f"{len(manifest['chunks'])} 个数据块, 新增 {manifest['new_chunks']} 个 ({manifest['new_bytes'] / 1024 / 1024:.2f} MB)")
+        return
+    
+    if args.restore_generation:
+        print(f"\n📥 拼装增量备份 {args.restore_generation}...")
+        restore_generation(create_backup_directory(), args.restore_generation, args.output)
+        return
+    
+    if args.restore:
+        print(f"\n📥 从 {args.restore} 恢复数据...")
+        if backend == 'postgresql':
+            import_postgres(args.restore, db_location, replace=args.replace)
+        else:
+            import_ndjson(args.restore, db_location, batch_size=args.chunk_size, replace=args.replace)
         return
     
     # 创建备份目录
@@ -220,24 +948,69 @@ def main():
     print(f"📁 备份目录: {backup_dir.absolute()}")
     
     backup_files = []
+    db_path = db_location if backend == 'sqlite' else None
+    
+    archive_format = args.archive_format or default_archive_format()
+    archiving = not args.incremental and not args.no_archive
+    # tar 压缩包：SQLite 的 NDJSON 直接写入 tar 流，不生成导出目录；需要打包的导出文件不再单独压缩，避免二次压缩
+    # （zip 逐文件压缩，仍先导出到目录，已压缩的表文件以存储方式放入；基准测试需要现成的输入文件）
+    stream_into_tar = archiving and archive_format != 'zip' and not args.benchmark_archive
+    export_compression = 'none' if stream_into_tar else args.compression
+    streams = []
     
     # 执行备份
-    if not args.json_only:
+    if backend == 'postgresql':
+        print(f"\n🐘 并行导出 Postgres 数据（COPY，{args.workers} 个连接）...")
+        pg_export = export_postgres(db_location, backup_dir, compression=export_compression, workers=args.workers)
+        if pg_export:
+            backup_files.append(pg_export)
+    
+    if backend == 'sqlite' and args.incremental:
+        print("\n🧩 增量备份数据库...")
+        manifest_path = backup_incremental(
+            db_path, backup_dir, chunk_pages=args.chunk_pages, compression=args.compression, method=args.method,
+            pages=args.pages, step_sleep=args.step_sleep, max_restarts=args.max_restarts, quick_check=args.quick_check
+        )
+        if manifest_path:
+            backup_files.append(manifest_path)
+    
+    if backend == 'sqlite' and not args.incremental and not args.json_only:
         print("\n🔄 备份数据库文件...")
-        db_backup = backup_database(db_path, backup_dir)
+        db_backup = backup_database(
+            db_path, backup_dir, method=args.method, pages=args.pages, step_sleep=args.step_sleep,
+            max_restarts=args.max_restarts, quick_check=args.quick_check
+        )
         if db_backup:
             backup_files.append(db_backup)
     
-    if not args.db_only:
-        print("\n📤 导出数据为JSON...")
-        json_backup = export_data_to_json(db_path, backup_dir)
-        if json_backup:
-            backup_files.append(json_backup)
+    if backend == 'sqlite' and not args.incremental and not args.db_only:
+        if stream_into_tar:
+            # 在创建压缩包时导出
+            streams.append(lambda tar: export_ndjson_to_tar(db_path, tar, chunk_size=args.chunk_size))
+        else:
+            print("\n📤 导出数据为NDJSON...")
+            json_backup = export_data_to_ndjson(db_path, backup_dir, compression=args.compression, chunk_size=args.chunk_size)
+            if json_backup:
+                backup_files.append(json_backup)
     
     # 创建压缩包
-    if backup_files:
-        print("\n📦 创建备份压缩包...")
-        archive = create_backup_archive(backup_files, backup_dir)
+    if backup_files and args.benchmark_archive:
+        benchmark_archives(backup_files, backup_dir, threads=args.archive_threads)
+    
+    if (backup_files or streams) and archiving:
+        print("\n📦 创建备份压缩包" + ("（NDJSON 直接写入）..." if streams else "..."))
+        archive = create_backup_archive(
+            backup_files, backup_dir, archive_format=archive_format, level=args.archive_level, threads=args.archive_threads,
+            streams=streams
+        )
+        if archive and not args.keep_files:
+            # 压缩包已包含全部内容，默认不再保留第二份（数据库副本需要先落盘做完整性检查）
+            for file_path in backup_files:
+                if Path(file_path).is_dir():
+                    shutil.rmtree(file_path)
+                else:
+                    Path(file_path).unlink()
+            backup_files = []
         if archive:
             backup_files.append(archive)
     
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+公共API压测与基准工具
+按场景并发请求接口，统计 p50/p95/p99 延迟与吞吐量，结果写入JSON便于回归对比
+
+准备数据（在仓库根目录执行）:
+    python create_sample_data.py --synthetic 100k --seed 42 --database-url sqlite:///backend/bench.db
+运行:
+    python bench_api.py --spawn --database-url sqlite:///bench.db --concurrency 32 --output bench.json
+    python bench_api.py --base-url http://localhost:8000 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+SEARCH_WORDS = ["solar", "green", "wind", "forest", "energy", "city", "garden", "ocean"]
+SEARCH_TAGS = ["renewable", "future", "sustainable", "technology", "solar energy", "green city"]
+
+# 场景名 -> 生成请求 (方法, 路径) 的函数
+SCENARIOS = {
+    "photos_page": lambda rng, ctx: ("GET", f"/api/v1/photos?page={rng.randint(1, ctx['pages'])}&limit=20"),
+    "photos_deep_page": lambda rng, ctx: ("GET", f"/api/v1/photos?page={max(1, ctx['pages'] - rng.randint(0, 10))}&limit=20"),
+    "photos_search": lambda rng, ctx: ("GET", f"/api/v1/photos?q={rng.choice(SEARCH_WORDS)}&limit=20"),
+    "photos_tags": lambda rng, ctx: ("GET", f"/api/v1/photos?tags={rng.choice(SEARCH_TAGS)}&limit=20"),
+    "photo_detail": lambda rng, ctx: ("GET", f"/api/v1/photos/{rng.choice(ctx['public_ids'])}"),
+    "collections_list": lambda rng, ctx: ("GET", "/api/v1/collections?page=1&limit=12"),
+    "collection_view": lambda rng, ctx: ("GET", f"/api/v1/collections/{rng.choice(ctx['slugs'])}"),
+    "record_download": lambda rng, ctx: ("POST", f"/api/v1/photos/{rng.choice(ctx['public_ids'])}/download"),
+}
+
+def percentile(sorted_values, pct):
+    """最近秩法计算百分位"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def discover(client):
+    """获取压测所需的上下文：页数、图片ID、合集slug"""
+    first = (await client.get("/api/v1/photos", params={"page": 1, "limit": 20})).json()
+    pages = max(1, first["pages"])
+    public_ids = [item["public_id"] for item in first["items"]]
+    for page in random.Random(0).sample(range(1, pages + 1), k=min(pages, 10)):
+        data = (await client.get("/api/v1/photos", params={"page": page, "limit": 20})).json()
+        public_ids.extend(item["public_id"] for item in data["items"])
+    collections = (await client.get("/api/v1/collections", params={"page": 1, "limit": 50})).json()
+    return {
+        "total_photos": first["total"],
+        "pages": pages,
+        "public_ids": public_ids or ["missing"],
+        "slugs": [item["slug"] for item in collections["items"]] or ["missing"],
+    }
+
+async def run_scenario(client, name, ctx, requests, concurrency, warmup, seed):
+    """并发执行一个场景，返回统计结果"""
+    rng = random.Random(f"{seed}:{name}")
+    plan = [SCENARIOS[name](rng, ctx) for _ in range(warmup + requests)]
+    latencies = []
+    errors = 0
+    cursor = 0
+
+    async def worker(record):
+        nonlocal cursor, errors
+        while True:
+            if record and cursor >= len(plan):
+                return
+            if not record and cursor >= warmup:
+                return
+            method, path = plan[cursor]
+            cursor += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed = time.perf_counter() - started
+            if record:
+                latencies.append(elapsed)
+                errors += failed
+
+    # 预热（不计入统计）
+    await asyncio.gather(*(worker(False) for _ in range(concurrency)))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(True) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def spawn_server(database_url, port, workers):
+    """以指定数据库启动 uvicorn，并等待就绪"""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=Path(__file__).parent, env=env
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become ready within 60s")
+
+def compare(results, baseline, tolerance):
+    """与基线对比 p95 和吞吐量，返回回归的场景列表"""
+    regressions = []
+    print(f"\n📈 与基线对比（容差 {tolerance:.0%}）")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            print(f"   🆕 {name}")
+            continue
+        p95_change = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        rps_change = current["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0.0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"   {'❌' if regressed else '✅'} {name:<18} p95 {p95_change:+.1%}  吞吐 {rps_change:+.1%}")
+    return regressions
+
+async def run(args):
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    ) as client:
+        ctx = await discover(client)
+        print(f"📚 目录规模: {ctx['total_photos']} 张图片, {len(ctx['slugs'])} 个合集")
+        results = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "base_url": args.base_url,
+                "database_url": args.database_url,
+                "git_revision": git_revision(),
+                "total_photos": ctx["total_photos"],
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "seed": args.seed,
+            },
+            "scenarios": {},
+        }
+        print(f"   {'场景':<18}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'错误':>6}")
+        for name in args.scenarios:
+            stats = await run_scenario(client, name, ctx, args.requests, args.concurrency, args.warmup, args.seed)
+            results["scenarios"][name] = stats
+            print(f"   {name:<18}{stats['throughput_rps']:>10.1f}{stats['p50_ms']:>10.1f}"
+                  f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['errors']:>6}")
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Solarpunk Gallery API 基准测试')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='被测服务地址')
+    parser.add_argument('--spawn', action='store_true', help='自动启动本地 uvicorn（配合 --database-url）')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='--spawn 时使用的数据库（SQLite 或 Postgres）')
+    parser.add_argument('--port', type=int, default=8765, help='--spawn 时的端口')
+    parser.add_argument('--server-workers', type=int, default=1, help='--spawn 时的 uvicorn worker 数')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='逗号分隔的场景列表')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发请求数')
+    parser.add_argument('--requests', type=int, default=500, help='每个场景的请求数')
+    parser.add_argument('--warmup', type=int, default=50, help='每个场景的预热请求数')
+    parser.add_argument('--timeout', type=float, default=30.0, help='单个请求超时(秒)')
+    parser.add_argument('--seed', type=int, default=42, help='请求序列的随机种子')
+    parser.add_argument('--output', help='结果JSON文件')
+    parser.add_argument('--compare', help='对比的基线JSON文件')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='对比容差（默认10%%）')
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}")
+
+    print("🏁 Solarpunk Gallery API 基准测试")
+    print("=" * 50)
+    server = None
+    if args.spawn:
+        if not args.database_url:
+            parser.error("--spawn 需要 --database-url")
+        server = spawn_server(args.database_url, args.port, args.server_workers)
+        args.base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2))
+        print(f"\n✅ 结果已写入: {args.output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print(f"\n❌ 性能回归: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL查询次数预算检查
+在临时SQLite库上请求各公共接口，统计每个请求执行的SQL语句数，
+与 query_baseline.json 中记录的基线比较，查询数增加时以非零状态退出（用于CI）
+用法: python check_query_budget.py [--update]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BASE_DIR / 'query_baseline.json'
+
+# 需要检查的接口：名称 -> (方法, 路径模板)
+ROUTES = {
+    "photos.list": ("GET", "/api/v1/photos?page=1&limit=20"),
+    "photos.search": ("GET", "/api/v1/photos?q=Solar&limit=20"),
+    "photos.tags": ("GET", "/api/v1/photos?tags=solar,green&limit=20"),
+    "photos.featured": ("GET", "/api/v1/photos/featured"),
+    "photos.popular": ("GET", "/api/v1/photos/popular"),
+    "photos.detail": ("GET", "/api/v1/photos/{public_id}"),
+    "photos.download_url": ("GET", "/api/v1/photos/{public_id}/download/small"),
+    "photos.record_download": ("POST", "/api/v1/photos/{public_id}/download"),
+    "collections.list": ("GET", "/api/v1/collections?page=1&limit=12"),
+    "collections.detail": ("GET", "/api/v1/collections/{slug}"),
+    "collections.photos": ("GET", "/api/v1/collections/{collection_id}/photos"),
+}
+
+def setup_environment(db_path):
+    """使用测试环境变量和临时数据库（必须在导入app之前调用）"""
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR.parent / '.env.test')
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+
+def seed_data(session):
+    """写入固定的示例数据：40张图片、6个已发布合集（每个12张）"""
+    from app.crud.crud_collections import append_photos
+    from app.models.tables import Collection, Photo
+
+    photos = []
+    for i in range(40):
+        photo = Photo(
+            public_id=f"budget-photo-{i:02d}",
+            title=f"Solar Garden {i}",
+            tags=json.dumps(["solar", "green city"] if i % 2 else ["wind", "green"]),
+            r2_object_key=f"images/original/budget-{i:02d}.webp",
+            aspect_ratio=1.5,
+            download_count=i,
+            is_featured=i % 4 == 0
+        )
+        session.add(photo)
+        photos.append(photo)
+    session.flush()
+
+    collections = []
+    for c in range(6):
+        collection = Collection(
+            title=f"Collection {c}",
+            slug=f"collection-{c}",
+            description="budget check",
+            cover_photo_id=photos[c].id,
+            is_published=True
+        )
+        session.add(collection)
+        collections.append(collection)
+    session.flush()
+
+    for c, collection in enumerate(collections):
+        append_photos(session, collection.id, [photo.id for photo in photos[c * 5:c * 5 + 12]])
+    session.commit()
+    return {
+        "public_id": photos[0].public_id,
+        "slug": collections[0].slug,
+        "collection_id": collections[0].id,
+    }
+
+def measure(client, engine, params):
+    """逐个请求接口，返回 {名称: (查询数, 重复语句列表)}"""
+    from sqlalchemy import event
+    from app.core.query_diagnostics import normalize_statement, repeated_statements
+
+    statements = Counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[normalize_statement(statement)] += 1
+
+    results = {}
+    for name, (method, path) in ROUTES.items():
+        statements.clear()
+        response = client.request(method, path.format(**params))
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: {method} {path} -> {response.status_code}")
+        results[name] = (sum(statements.values()), repeated_statements(statements))
+
+    event.remove(engine, "after_cursor_execute", count_statement)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='SQL查询次数预算检查')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='基线文件路径')
+    parser.add_argument('--update', action='store_true', help='用本次结果覆盖基线')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_environment(Path(tmp_dir) / 'budget.db')
+
+        from fastapi.testclient import TestClient
+        from app.db.database import Base, SessionLocal, engine
+        from app.main import app
+
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            params = seed_data(session)
+        with TestClient(app) as client:
+            results = measure(client, engine, params)
+        engine.dispose()
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+
+    print("🔎 SQL查询次数预算")
+    print("=" * 50)
+    regressions = []
+    for name, (count, repeated) in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            status = "🆕"
+        elif count > expected:
+            status = "❌"
+            regressions.append(name)
+        elif count < expected:
+            status = "⬇️ "
+        else:
+            status = "✅"
+        expected_text = "-" if expected is None else expected
+        print(f"{status} {name:<26} {count:>3} 条 (基线 {expected_text})")
+        for statement, times in repeated:
+            print(f"     ⚠️  重复 {times} 次: {statement[:120]}")
+
+    if args.update:
+        baseline_path.write_text(json.dumps({name: count for name, (count, _) in results.items()}, indent=2) + "\n")
+        print(f"\n✅ 基线已更新: {baseline_path}")
+        return
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} 个接口查询次数超过基线: {', '.join(regressions)}")
+        print("   如果增加是预期的，请运行 python check_query_budget.py --update 更新基线")
+        sys.exit(1)
+    print("\n✨ 所有接口均在预算内")
+
+if __name__ == "__main__":
+    main()
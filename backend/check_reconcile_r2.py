@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+R2 对账工具检查
+在进程内启动 moto S3 替身并建立临时SQLite图片表，写入预设的缺失对象与孤儿对象，
+验证 list_bucket / merge_join 的结果，以及 --delete-orphans 只删除早于 --min-age-hours 的孤儿（用于CI）
+依赖: pip install "moto[server]"
+用法: python check_reconcile_r2.py
+"""
+
+import logging
+import os
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).parent
+BUCKET = 'reconcile-check'
+PREFIX = 'images/'
+
+def setup_environment(db_path):
+    """使用测试环境变量和临时数据库（必须在导入app之前调用）"""
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR.parent / '.env.test')
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+
+def seed_photos(session):
+    """三张图片：完整、缺少全部尺寸版本、多格式但缺少 AVIF 版本，返回 (应存在的键, 应缺失的键)"""
+    from app.core import imaging
+    from app.models.tables import Photo
+
+    photos = [
+        Photo(public_id=public_id, title=public_id, r2_object_key=f"images/original/{name}.webp", aspect_ratio=1.5, image_formats=formats)
+        for public_id, name, formats in (
+            ('complete', 'complete', 'webp'),
+            ('renditions-missing', 'partial', 'webp'),
+            ('avif-missing', 'multi', 'avif,webp'),
+        )
+    ]
+    session.add_all(photos)
+    session.commit()
+
+    present, missing = [], []
+    for photo in photos:
+        present.append(photo.r2_object_key)
+        for size in imaging.RENDITION_WIDTHS:
+            for fmt in photo.image_formats.split(','):
+                key = imaging.rendition_key(photo.r2_object_key, size, fmt)
+                if photo.public_id == 'renditions-missing' or (photo.public_id == 'avif-missing' and fmt == 'avif'):
+                    missing.append(key)
+                else:
+                    present.append(key)
+    return present, missing
+
+def seed_bucket(client, present):
+    """上传应存在的对象与孤儿对象：旧孤儿修改时间回拨48小时，新孤儿保持当前时间"""
+    import boto3
+    from moto.core import DEFAULT_ACCOUNT_ID
+    from moto.s3.models import s3_backends
+
+    old_orphans = ['images/original/deleted-photo.webp', 'images/thumb/deleted-photo.webp', 'images/stray.txt']
+    recent_orphans = ['images/original/uploading.webp']
+    # moto 不接受 R2 的 region 'auto' 建桶，建桶单独用 us-east-1 客户端，其余请求仍走对账工具的客户端
+    boto3.client('s3', endpoint_url=client.meta.endpoint_url, region_name='us-east-1',
+                 aws_access_key_id='check', aws_secret_access_key='check').create_bucket(Bucket=BUCKET)
+    for key in present + old_orphans + recent_orphans + ['backups/outside-prefix.txt']:
+        client.put_object(Bucket=BUCKET, Key=key, Body=b'x' * 16)
+
+    bucket = s3_backends[DEFAULT_ACCOUNT_ID]['aws'].buckets[BUCKET]
+    for key in old_orphans:
+        bucket.keys[key].last_modified -= timedelta(hours=48)
+    return old_orphans, recent_orphans
+
+def bucket_keys(client):
+    paginator = client.get_paginator('list_objects_v2')
+    return {item['Key'] for page in paginator.paginate(Bucket=BUCKET) for item in page.get('Contents', [])}
+
+def run_main(*arguments):
+    """以命令行参数运行 reconcile_r2.main，返回退出码"""
+    import reconcile_r2
+
+    with mock.patch.object(sys, 'argv', ['reconcile_r2.py', *arguments]):
+        try:
+            reconcile_r2.main()
+        except SystemExit as exit:
+            return exit.code
+    return 0
+
+def check(failures, condition, message):
+    print(f"{'✅' if condition else '❌'} {message}")
+    if not condition:
+        failures.append(message)
+
+def main():
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        print('❌ 需要安装 moto[server]: pip install "moto[server]"')
+        sys.exit(1)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_environment(Path(tmp_dir) / 'reconcile.db')
+
+        import reconcile_r2
+        from app.db.database import Base, SessionLocal, engine
+
+        server = ThreadedMotoServer(ip_address='127.0.0.1', port=0, verbose=False)
+        server.start()
+        try:
+            host, port = server.get_host_and_port()
+            endpoint_url = f"http://{host}:{port}"
+            client = reconcile_r2.make_client(endpoint_url)
+
+            Base.metadata.create_all(engine)
+            with SessionLocal() as session:
+                present, missing = seed_photos(session)
+            old_orphans, recent_orphans = seed_bucket(client, present)
+            orphans = old_orphans + recent_orphans
+
+            print("🪣 R2 对账工具检查")
+            print("=" * 50)
+
+            # 1. 列举：按一级目录分片，前缀外的对象不出现，合并后按键有序
+            listed, shard_count, object_count, _ = reconcile_r2.list_bucket(client, BUCKET, PREFIX, 4, tmp_dir)
+            listed = list(listed)
+            keys = [record[0] for record in listed]
+            check(failures, keys == sorted(present + orphans), f"list_bucket 返回前缀下全部 {len(keys)} 个对象且按键有序")
+            check(failures, object_count == len(keys), "list_bucket 统计的对象数与返回一致")
+            directories = {key[len(PREFIX):].split('/', 1)[0] for key in keys if '/' in key[len(PREFIX):]}
+            check(failures, shard_count == len(directories) + 1, f"list_bucket 按 {len(directories)} 个一级目录与前缀下散落对象分为 {shard_count} 个范围")
+
+            # 2. 归并连接：外部排序每段只放2条，强制多段归并
+            with SessionLocal() as db:
+                expected = reconcile_r2.external_sort(reconcile_r2.expected_keys(db, PREFIX), tmp_dir, run_size=2)
+                results = {'ok': [], 'missing': [], 'orphan': []}
+                for status, record in reconcile_r2.merge_join(expected, iter(listed)):
+                    results[status].append(record[0])
+            check(failures, sorted(results['ok']) == sorted(present), f"merge_join 匹配 {len(results['ok'])} 个对象")
+            check(failures, sorted(results['missing']) == sorted(missing), f"merge_join 报告缺失 {len(results['missing'])} 个对象")
+            check(failures, sorted(results['orphan']) == sorted(orphans), f"merge_join 报告孤儿 {len(results['orphan'])} 个对象")
+
+            # 3. 只报告不删除
+            with tempfile.NamedTemporaryFile(dir=tmp_dir, suffix='.ndjson') as report:
+                code = run_main('--bucket', BUCKET, '--endpoint-url', endpoint_url, '--report', report.name)
+            check(failures, code == 1, "存在缺失对象时以非零状态退出")
+            check(failures, set(orphans) <= bucket_keys(client), "未指定 --delete-orphans 时不删除孤儿")
+
+            # 4. 删除孤儿：只删除早于24小时的
+            code = run_main('--bucket', BUCKET, '--endpoint-url', endpoint_url, '--delete-orphans', '--min-age-hours', '24')
+            remaining = bucket_keys(client)
+            check(failures, not set(old_orphans) & remaining, "--delete-orphans 删除早于 --min-age-hours 的孤儿")
+            check(failures, set(recent_orphans) <= remaining, "--delete-orphans 保留不足 --min-age-hours 的孤儿")
+            check(failures, set(present) | {'backups/outside-prefix.txt'} <= remaining, "--delete-orphans 不删除应存在的对象与前缀外的对象")
+        finally:
+            server.stop()
+            engine.dispose()
+
+    if failures:
+        print(f"\n❌ {len(failures)} 项检查失败")
+        sys.exit(1)
+    print("\n✨ 对账工具检查通过")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时预算检查
+在子进程中以 -X importtime 导入 app.main（完整模式与 ADMIN_ENABLED=false 的API模式各一次），
+统计导入总耗时与最慢的模块；超过预算或API模式加载了管理后台/存储依赖时以非零状态退出（用于CI）
+用法: python check_startup.py [--budget-ms 1200] [--api-budget-ms 900] [--repeat 3] [--top 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+# API模式不应导入的模块：管理后台与按需加载的存储客户端
+API_FORBIDDEN_MODULES = ("sqladmin", "passlib", "wtforms", "boto3")
+# 任何模式下都应延迟到首次使用时才导入
+LAZY_MODULES = ("boto3",)
+# API模式下不需要的环境变量：从子进程环境中移除，验证没有它们也能启动
+API_UNUSED_VARIABLES = (
+    "ADMIN_PASSWORD", "ADMIN_SECRET_KEY",
+    "R2_ENDPOINT_URL", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY", "R2_BUCKET_NAME",
+)
+
+def load_environment():
+    """使用测试环境变量（与 check_query_budget 相同）"""
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR.parent / '.env.test')
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 {模块: (自身us, 累计us)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure(env, repeat):
+    """多次导入取最快的一次（排除冷缓存与调度噪声）"""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import app.main'],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        modules = parse_importtime(result.stderr)
+        if best is None or modules['app.main'][1] < best['app.main'][1]:
+            best = modules
+    return best
+
+def report(label, modules, budget_ms, forbidden, top):
+    """打印一次测量结果，返回问题列表"""
+    total_ms = modules['app.main'][1] / 1000
+    problems = []
+    status = "✅" if total_ms <= budget_ms else "❌"
+    if total_ms > budget_ms:
+        problems.append(f"{label} 导入耗时 {total_ms:.0f}ms 超出预算 {budget_ms:.0f}ms")
+    print(f"\n{status} {label}: app.main 导入 {total_ms:.0f}ms (预算 {budget_ms:.0f}ms), 共 {len(modules)} 个模块")
+
+    # 顶层包的累计耗时（含其首次导入的依赖），便于定位慢的依赖
+    packages = {name: cumulative_us for name, (_, cumulative_us) in modules.items() if '.' not in name}
+    print(f"   {'包':<24}{'累计ms':>8}")
+    for package, cumulative_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"   {package:<24}{cumulative_us / 1000:>8.1f}")
+
+    loaded = sorted(module for module in forbidden if module in modules)
+    for module in loaded:
+        print(f"   ❌ 不应加载: {module} ({modules[module][1] / 1000:.0f}ms)")
+        problems.append(f"{label} 加载了 {module}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时预算检查')
+    parser.add_argument('--budget-ms', type=float, default=1200, help='完整模式（含管理后台）app.main 导入耗时预算')
+    parser.add_argument('--api-budget-ms', type=float, default=900, help='API模式（ADMIN_ENABLED=false）导入耗时预算')
+    parser.add_argument('--repeat', type=int, default=3, help='每种模式的测量次数，取最快一次(默认3)')
+    parser.add_argument('--top', type=int, default=10, help='显示最慢的顶层包数量')
+    args = parser.parse_args()
+
+    load_environment()
+    full_env = {**os.environ, 'ADMIN_ENABLED': 'true'}
+    api_env = {name: value for name, value in os.environ.items() if name not in API_UNUSED_VARIABLES}
+    api_env['ADMIN_ENABLED'] = 'false'
+
+    print("⏱️  启动耗时预算")
+    print("=" * 50)
+    problems = []
+    for label, env, budget_ms, forbidden in (
+        ("完整模式", full_env, args.budget_ms, LAZY_MODULES),
+        ("API模式", api_env, args.api_budget_ms, API_FORBIDDEN_MODULES),
+    ):
+        try:
+            modules = measure(env, args.repeat)
+        except RuntimeError as error:
+            print(f"\n❌ {label}: 导入失败: {error}")
+            problems.append(f"{label} 无法启动")
+            continue
+        problems += report(label, modules, budget_ms, forbidden, args.top)
+
+    if problems:
+        print("\n❌ 启动预算检查未通过:")
+        for problem in problems:
+            print(f"   • {problem}")
+        sys.exit(1)
+    print("\n✨ 启动耗时在预算内")
+
+if __name__ == "__main__":
+    main()
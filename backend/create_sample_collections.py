@@ -3,9 +3,10 @@
 创建示例Collection数据的脚本
 """
 
-from sqlalchemy import create_engine, select, insert
+from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
-from app.models.tables import Collection, Photo, collection_photos
+from app.models.tables import Collection, Photo
+from app.crud.crud_collections import append_photos
 from app.core.config import settings
 
 def create_sample_collections():
@@ -70,14 +71,8 @@ def create_sample_collections():
             end_idx = min(start_idx + 4, len(photos))
             collection_photo_ids = [photos[j].id for j in range(start_idx, end_idx)]
             
-            # 添加到关联表
-            for photo_id in collection_photo_ids:
-                session.execute(
-                    insert(collection_photos).values(
-                        collection_id=collection.id,
-                        photo_id=photo_id
-                    )
-                )
+            # 添加到关联表（order_index 按 ORDER_GAP 留出间隔）
+            append_photos(session, collection.id, collection_photo_ids)
         
         session.commit()
         print(f"成功创建 {len(created_collections)} 个示例合集")
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大规模合成数据生成器
+批量写入 photos / tags / collections / collection_photos，用于在本地复现生产规模的性能问题
+- 标签按 Zipf 分布抽取（少数热门标签、大量长尾标签）
+- 每批数据使用 (seed, 批次号) 派生的随机数，结果与并行度无关、可复现
+- SQLite 使用 executemany，Postgres 使用 COPY FROM STDIN
+- 可选并行生成示例图片文件（目录结构与R2一致）
+用法: python generate_scale_data.py --photos 1m --database-url postgresql://... [--workers 4] [--images 1000]
+"""
+
+import argparse
+import bisect
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import LargeBinary, MetaData, create_engine
+
+TITLE_WORDS = [
+    "Solar", "Green", "Vertical", "Garden", "Wind", "Ocean", "Forest", "Smart", "Eco", "Future",
+    "Permaculture", "Rooftop", "Canopy", "Grid", "Harbor", "Meadow", "Tower", "Commons", "River", "Market",
+]
+BASE_TAGS = [
+    "solar energy", "renewable", "green city", "sustainable", "architecture", "future", "technology",
+    "clean energy", "vertical farming", "agriculture", "green building", "wind energy", "landscape",
+    "transportation", "community", "ocean", "forest", "conservation", "nature", "biodiversity",
+    "smart grid", "permaculture", "organic farming", "food security", "electric vehicles",
+]
+# 合集成员 order_index 间隔，与 app.crud.crud_collections.ORDER_GAP 一致
+ORDER_GAP = 1024
+ASPECT_RATIOS = [1.0, 4 / 3, 3 / 2, 16 / 9, 2 / 3, 3 / 4]
+
+def parse_count(value):
+    """解析数量参数，支持 10k / 100k / 1m 写法"""
+    value = str(value).strip().lower()
+    multiplier = 1
+    if value.endswith('k'):
+        multiplier, value = 1000, value[:-1]
+    elif value.endswith('m'):
+        multiplier, value = 1000000, value[:-1]
+    return int(float(value) * multiplier)
+
+def tag_vocabulary(size):
+    """生成固定的标签词表，排名越靠前越热门"""
+    tags = list(BASE_TAGS[:size])
+    i = 0
+    while len(tags) < size:
+        tags.append(f"{BASE_TAGS[i % len(BASE_TAGS)]} {i // len(BASE_TAGS) + 1}")
+        i += 1
+    return tags
+
+class ZipfSampler:
+    """按 1/rank^s 权重抽样（累积权重 + 二分查找）"""
+
+    def __init__(self, size, s):
+        total = 0.0
+        self.cumulative = []
+        for rank in range(1, size + 1):
+            total += 1.0 / rank ** s
+            self.cumulative.append(total)
+        self.total = total
+
+    def sample(self, rng):
+        return bisect.bisect_left(self.cumulative, rng.random() * self.total)
+
+def photo_id(seed, index):
+    """由 (seed, 序号) 确定性地得到图片ID，合集成员无需回查数据库"""
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+def encode_key(value, binary):
+    """主键列为二进制（SQLite 上的 GUID）时写入16字节，否则写入UUID字符串"""
+    return uuid.UUID(value).bytes if binary else value
+
+def build_photo_batch(job):
+    """生成一批图片记录（在子进程中执行），返回元组列表"""
+    seed, batch_index, start, count, tags, zipf_s, columns, binary_ids, base_time = job
+    rng = random.Random(f"{seed}:photos:{batch_index}")
+    sampler = ZipfSampler(len(tags), zipf_s)
+    rows = []
+    for i in range(start, start + count):
+        pid = photo_id(seed, i)
+        photo_tags = {tags[sampler.sample(rng)] for _ in range(rng.randint(1, 6))}
+        featured = rng.random() < 0.02
+        values = {
+            'id': encode_key(pid, binary_ids),
+            'public_id': f"scale-{seed}-{i:08d}",
+            'title': f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} #{i}",
+            'tags': json.dumps(sorted(photo_tags), ensure_ascii=False),
+            'r2_object_key': f"images/original/{pid}.webp",
+            'aspect_ratio': rng.choice(ASPECT_RATIOS),
+            # 下载量呈长尾分布
+            'download_count': int((rng.paretovariate(1.2) - 1) * 20),
+            'featured': featured,
+            'is_featured': 'true' if featured else 'false',
+            'created_at': (base_time - timedelta(seconds=rng.randint(0, 3 * 365 * 24 * 3600))).isoformat(sep=' '),
+        }
+        rows.append(tuple(values.get(column) for column in columns))
+    return rows
+
+def synthesize_image(job):
+    """生成一张示例图片及缩略图（在子进程中执行）"""
+    from PIL import Image, ImageDraw
+
+    seed, index, image_dir = job
+    rng = random.Random(f"{seed}:image:{index}")
+    pid = photo_id(seed, index)
+    width = 1600
+    height = int(width / rng.choice(ASPECT_RATIOS))
+    base = tuple(rng.randint(20, 200) for _ in range(3))
+    img = Image.new('RGB', (width, height), base)
+    draw = ImageDraw.Draw(img)
+    for y in range(0, height, 4):
+        shade = tuple(int(c * (1 - 0.3 * y / height)) for c in base)
+        draw.rectangle([0, y, width, y + 4], fill=shade)
+    for _ in range(30):
+        x, y, size = rng.randint(0, width), rng.randint(0, height), rng.randint(20, 200)
+        draw.ellipse([x, y, x + size, y + size], fill=tuple(min(255, c + rng.randint(-60, 60)) for c in base))
+
+    original_path = Path(image_dir) / 'images' / 'original' / f"{pid}.webp"
+    thumb_path = Path(image_dir) / 'images' / 'thumb' / f"{pid}.webp"
+    img.save(original_path, 'WEBP', quality=85)
+    img.thumbnail((400, 400))
+    img.save(thumb_path, 'WEBP', quality=80)
+    return original_path.stat().st_size + thumb_path.stat().st_size
+
+class BulkWriter:
+    """按方言选择最快的批量写入方式"""
+
+    def __init__(self, engine):
+        self.dialect = engine.dialect.name
+        self.connection = engine.raw_connection()
+        if self.dialect == 'sqlite':
+            cursor = self.connection.cursor()
+            # 仅对本次导入连接生效，加快写入
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.close()
+
+    def write(self, table, columns, rows):
+        if not rows:
+            return
+        cursor = self.connection.cursor()
+        if self.dialect == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            placeholders = ', '.join('?' for _ in columns)
+            cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+        cursor.close()
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+def report(label, count, started):
+    elapsed = time.perf_counter() - started
+    print(f"✅ {label}: {count} 行，用时 {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} 行/秒)")
+
+def generate(
+    database_url,
+    photos,
+    seed=42,
+    tags=2000,
+    collections=200,
+    collection_size=60,
+    zipf_s=1.1,
+    batch_size=20000,
+    workers=None,
+    images=0,
+    image_dir=None,
+):
+    """生成全部合成数据"""
+    engine = create_engine(database_url)
+    metadata = MetaData()
+    # 直接反射已迁移的表结构，不依赖应用配置
+    metadata.reflect(engine, only=['photos', 'tags', 'collections', 'collection_photos'])
+    photos_table = metadata.tables['photos']
+    collections_table = metadata.tables['collections']
+    vocabulary = tag_vocabulary(tags)
+    base_time = datetime(2026, 1, 1)
+    writer = BulkWriter(engine)
+
+    try:
+        # 标签
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            existing = {row[0] for row in conn.exec_driver_sql("SELECT name FROM tags")}
+        tag_rows = [(name, "synthetic") for name in vocabulary if name not in existing]
+        writer.write('tags', ['name', 'description'], tag_rows)
+        writer.commit()
+        report("tags", len(tag_rows), started)
+
+        # 图片：子进程生成、主进程按顺序写入
+        started = time.perf_counter()
+        photo_columns = [column.name for column in photos_table.columns if column.name in (
+            'id', 'public_id', 'title', 'tags', 'r2_object_key', 'aspect_ratio',
+            'download_count', 'featured', 'is_featured', 'created_at'
+        )]
+        # 兼容迁移各阶段：只有旧字符串列 is_featured、扩展阶段两列并存、收缩后只有布尔列 featured
+        binary_ids = isinstance(photos_table.c.id.type, LargeBinary)
+        jobs = [
+            (seed, index, start, min(batch_size, photos - start), vocabulary, zipf_s, photo_columns, binary_ids, base_time)
+            for index, start in enumerate(range(0, photos, batch_size))
+        ]
+        written = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for rows in executor.map(build_photo_batch, jobs):
+                writer.write('photos', photo_columns, rows)
+                writer.commit()
+                written += len(rows)
+                print(f"   photos {written}/{photos}", end='\r')
+        print()
+        report("photos", written, started)
+
+        # 合集与成员
+        started = time.perf_counter()
+        rng = random.Random(f"{seed}:collections")
+        published_columns = [column for column in ('published', 'is_published') if column in collections_table.c]
+        published = tuple(
+            True if column == 'published' else 'true' for column in published_columns
+        )
+        collection_rows, member_rows = [], []
+        for c in range(collections):
+            collection_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            size = max(1, min(photos, int(rng.expovariate(1 / collection_size))))
+            members = [encode_key(photo_id(seed, index), binary_ids) for index in rng.sample(range(photos), k=size)]
+            collection_rows.append((
+                encode_key(collection_id, binary_ids), f"Scale Collection {c}", "Synthetic collection for scale testing",
+                f"scale-{seed}-{c}", members[0], *published, rng.randint(0, 50000),
+                (base_time - timedelta(days=rng.randint(0, 900))).isoformat(sep=' '),
+            ))
+            member_rows.extend((encode_key(collection_id, binary_ids), pid, (order + 1) * ORDER_GAP) for order, pid in enumerate(members))
+        writer.write('collections', [
+            'id', 'title', 'description', 'slug', 'cover_photo_id', *published_columns, 'view_count', 'created_at'
+        ], collection_rows)
+        for start in range(0, len(member_rows), batch_size):
+            writer.write('collection_photos', ['collection_id', 'photo_id', 'order_index'], member_rows[start:start + batch_size])
+        writer.commit()
+        report("collections", len(collection_rows), started)
+        report("collection_photos", len(member_rows), started)
+    finally:
+        writer.close()
+        engine.dispose()
+
+    if images:
+        started = time.perf_counter()
+        for subdir in ('original', 'thumb'):
+            (Path(image_dir) / 'images' / subdir).mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            total_bytes = sum(executor.map(
+                synthesize_image,
+                [(seed, index, image_dir) for index in range(min(images, photos))],
+                chunksize=16
+            ))
+        report(f"images ({total_bytes / 1024 / 1024:.1f} MB)", min(images, photos), started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Solarpunk Gallery 大规模合成数据生成器')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL', 'sqlite:///./photos.db'), help='目标数据库URL（需已执行迁移）')
+    parser.add_argument('--photos', type=parse_count, default=parse_count('100k'), help='图片数量，如 100k / 1m')
+    parser.add_argument('--tags', type=parse_count, default=2000, help='标签词表大小')
+    parser.add_argument('--zipf', type=float, default=1.1, help='标签Zipf分布指数')
+    parser.add_argument('--collections', type=parse_count, default=200, help='合集数量')
+    parser.add_argument('--collection-size', type=int, default=60, help='合集平均图片数（指数分布）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--batch-size', type=int, default=20000, help='每批写入行数')
+    parser.add_argument('--workers', type=int, default=None, help='生成数据/图片的进程数')
+    parser.add_argument('--images', type=parse_count, default=0, help='同时生成多少张示例图片文件')
+    parser.add_argument('--image-dir', default='synthetic_images', help='示例图片输出目录')
+    args = parser.parse_args()
+
+    print("🏗️  Solarpunk Gallery 合成数据生成")
+    print("=" * 50)
+    print(f"数据库: {args.database_url}  图片: {args.photos}  合集: {args.collections}  seed: {args.seed}")
+    generate(
+        args.database_url, args.photos, seed=args.seed, tags=args.tags, collections=args.collections,
+        collection_size=args.collection_size, zipf_s=args.zipf, batch_size=args.batch_size,
+        workers=args.workers, images=args.images, image_dir=args.image_dir,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片格式体积对比报告
+对样本图片按各尺寸、各格式编码，比较每张图片的平均字节数，用于评估出口带宽
+用法: python image_format_report.py [图片目录] [--profile balanced] [--json report.json]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.core import imaging
+from app.core.config import settings
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.avif'}
+
+def collect_images(directory, limit):
+    """收集样本图片（跳过已有的缩略图）"""
+    paths = sorted(
+        path for path in Path(directory).rglob('*')
+        if path.suffix.lower() in IMAGE_SUFFIXES and '_thumb' not in path.stem
+    )
+    return paths[:limit] if limit else paths
+
+def encode_sample(path, formats, profile):
+    """对单张图片编码所有尺寸与格式，返回 {(尺寸, 格式): (字节数, 耗时ms)}"""
+    settings.image_quality_profile = profile
+    original = imaging.load_image(path.read_bytes())
+    result = {}
+    for size, width in imaging.RENDITION_WIDTHS.items():
+        rendition = imaging.resize_to_width(original, width)
+        for fmt in formats:
+            started = time.perf_counter()
+            data = imaging.encode_image(rendition, fmt)
+            result[(size, fmt)] = (len(data), (time.perf_counter() - started) * 1000)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='图片格式体积对比报告')
+    parser.add_argument('directory', nargs='?', default='../frontend/public/images', help='样本图片目录')
+    parser.add_argument('--limit', type=int, default=0, help='最多使用多少张样本(0为全部)')
+    parser.add_argument('--profile', default=settings.image_quality_profile, choices=list(imaging.QUALITY_PROFILES), help='质量档位')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数')
+    parser.add_argument('--json', dest='json_path', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    paths = collect_images(args.directory, args.limit)
+    if not paths:
+        print(f"❌ 未找到样本图片: {args.directory}")
+        return
+
+    formats = imaging.SUPPORTED_FORMATS
+    print("🖼️  图片格式体积对比")
+    print("=" * 50)
+    print(f"样本数: {len(paths)}  质量档位: {args.profile}  格式: {', '.join(formats)}")
+
+    totals = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for sample in executor.map(encode_sample, paths, [formats] * len(paths), [args.profile] * len(paths)):
+            for key, (size_bytes, elapsed_ms) in sample.items():
+                total_bytes, total_ms = totals.get(key, (0, 0.0))
+                totals[key] = (total_bytes + size_bytes, total_ms + elapsed_ms)
+
+    report = {"samples": len(paths), "profile": args.profile, "sizes": {}}
+    for size in imaging.RENDITION_WIDTHS:
+        baseline = totals[(size, imaging.CANONICAL_FORMAT)][0] / len(paths)
+        print(f"\n📐 {size} ({imaging.RENDITION_WIDTHS[size]}px)")
+        print(f"   {'格式':<6}{'平均KB':>10}{'相对WebP':>10}{'编码ms':>10}")
+        report["sizes"][size] = {}
+        for fmt in formats:
+            total_bytes, total_ms = totals[(size, fmt)]
+            avg_bytes = total_bytes / len(paths)
+            ratio = avg_bytes / baseline if baseline else 0
+            print(f"   {fmt:<6}{avg_bytes / 1024:>10.1f}{ratio:>9.0%}{total_ms / len(paths):>10.1f}")
+            report["sizes"][size][fmt] = {
+                "avg_bytes": round(avg_bytes),
+                "ratio_vs_webp": round(ratio, 4),
+                "avg_encode_ms": round(total_ms / len(paths), 2),
+            }
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 报告已写入: {args.json_path}")
+
+if __name__ == "__main__":
+    main()
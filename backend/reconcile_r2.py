@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+R2 对象对账工具
+并发分页列举存储桶，流式读取图片表生成应存在的对象键（原图与各尺寸/格式版本），
+两侧按键排序后归并连接，报告缺失对象与孤儿对象；内存占用与图片数量无关（外部排序）
+用法: python reconcile_r2.py [--prefix images/] [--workers 8] [--report report.ndjson]
+                            [--delete-orphans --min-age-hours 24] [--endpoint-url http://localhost:5000]
+"""
+
+import argparse
+import heapq
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+from app.core import imaging, storage
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.tables import Photo
+
+# 外部排序时每个有序段的记录数（决定内存上限）
+RUN_SIZE = 200_000
+# DeleteObjects 单次请求的键数上限
+DELETE_BATCH = 1000
+# 报告中打印的样例数
+SAMPLE_COUNT = 10
+
+def make_client(endpoint_url=None):
+    """默认复用应用的R2客户端；指定 endpoint_url 时连接本地 S3 替身（MinIO / moto_server）"""
+    if endpoint_url is None:
+        return storage.get_r2_client()
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        aws_access_key_id=settings.r2_access_key_id,
+        aws_secret_access_key=settings.r2_secret_access_key,
+        region_name='auto'
+    )
+
+def _write_run(records, directory):
+    run = tempfile.NamedTemporaryFile('w', dir=directory, suffix='.run', delete=False, encoding='utf-8')
+    with run:
+        for record in sorted(records, key=lambda record: record[0]):
+            run.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return run.name
+
+def _read_run(path):
+    with open(path, encoding='utf-8') as run:
+        for line in run:
+            yield json.loads(line)
+
+def external_sort(records, directory, run_size=RUN_SIZE):
+    """把 [键, ...] 记录流切成有序段写入临时文件，返回按键归并后的迭代器"""
+    runs = []
+    buffer = []
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= run_size:
+            runs.append(_write_run(buffer, directory))
+            buffer = []
+    if buffer or not runs:
+        runs.append(_write_run(buffer, directory))
+    return heapq.merge(*(_read_run(run) for run in runs), key=lambda record: record[0])
+
+def list_shards(client, bucket, prefix):
+    """按前缀下的一级目录（images/original/、images/thumb/ ...）拆分列举范围，各范围互不重叠"""
+    shards = []
+    has_loose_objects = False
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+        shards += [(common['Prefix'], None) for common in page.get('CommonPrefixes', [])]
+        has_loose_objects = has_loose_objects or bool(page.get('Contents'))
+    if has_loose_objects:
+        # 直接位于前缀下的对象：带分隔符列举，不会重复进入子目录
+        shards.append((prefix, '/'))
+    return shards
+
+def list_shard(client, bucket, shard_prefix, delimiter, directory):
+    """分页列举一个范围写入段文件，返回 (段文件, 是否有序, 对象数, 字节数)"""
+    options = {'Bucket': bucket, 'Prefix': shard_prefix, 'PaginationConfig': {'PageSize': 1000}}
+    if delimiter:
+        options['Delimiter'] = delimiter
+    paginator = client.get_paginator('list_objects_v2')
+    count = total_bytes = 0
+    in_order = True
+    previous = ''
+    run = tempfile.NamedTemporaryFile('w', dir=directory, suffix='.list', delete=False, encoding='utf-8')
+    with run:
+        for page in paginator.paginate(**options):
+            for item in page.get('Contents', []):
+                key = item['Key']
+                # S3/R2 按键的二进制顺序返回，与 Python 字符串比较一致；替身实现不保证时退回外部排序
+                in_order = in_order and key >= previous
+                previous = key
+                run.write(json.dumps([key, item['Size'], item['LastModified'].timestamp()], ensure_ascii=False) + '\n')
+                count += 1
+                total_bytes += item['Size']
+    return run.name, in_order, count, total_bytes
+
+def list_bucket(client, bucket, prefix, workers, directory):
+    """并发列举存储桶，返回按键有序的 [键, 字节数, 修改时间] 迭代器与统计"""
+    shards = list_shards(client, bucket, prefix)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda shard: list_shard(client, bucket, shard[0], shard[1], directory), shards))
+    streams = [
+        _read_run(path) if in_order else external_sort(_read_run(path), directory)
+        for path, in_order, _, _ in results
+    ]
+    objects = sum(result[2] for result in results)
+    total_bytes = sum(result[3] for result in results)
+    return heapq.merge(*streams, key=lambda record: record[0]), len(shards), objects, total_bytes
+
+def expected_keys(db, prefix):
+    """流式读取图片表，生成应存在的对象键 [键, public_id, 版本]"""
+    rows = db.query(Photo.public_id, Photo.r2_object_key, Photo.image_formats).order_by(Photo.id).yield_per(5000)
+    for public_id, r2_object_key, image_formats in rows:
+        formats = [fmt for fmt in (image_formats or imaging.CANONICAL_FORMAT).split(',') if fmt]
+        keys = [(r2_object_key, 'original')] + [
+            (imaging.rendition_key(r2_object_key, size, fmt), f"{size}.{fmt}")
+            for size in imaging.RENDITION_WIDTHS for fmt in formats
+        ]
+        for key, variant in keys:
+            if key.startswith(prefix):
+                yield [key, public_id, variant]
+
+def merge_join(expected, listed):
+    """两个按键有序的流做归并连接，产出 ('ok' | 'missing' | 'orphan', 记录)"""
+    expected_record = next(expected, None)
+    listed_record = next(listed, None)
+    while expected_record is not None or listed_record is not None:
+        if listed_record is None or (expected_record is not None and expected_record[0] < listed_record[0]):
+            yield 'missing', expected_record
+            expected_record = next(expected, None)
+        elif expected_record is None or listed_record[0] < expected_record[0]:
+            yield 'orphan', listed_record
+            listed_record = next(listed, None)
+        else:
+            yield 'ok', expected_record
+            key = expected_record[0]
+            # 多张图片指向同一对象时只匹配一次
+            while expected_record is not None and expected_record[0] == key:
+                expected_record = next(expected, None)
+            listed_record = next(listed, None)
+
+def delete_objects(client, bucket, keys):
+    """批量删除对象，返回失败的 [(键, 错误)]"""
+    response = client.delete_objects(
+        Bucket=bucket, Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+    )
+    return [(error['Key'], error.get('Message', error.get('Code'))) for error in response.get('Errors', [])]
+
+def main():
+    parser = argparse.ArgumentParser(description='R2 对象对账工具')
+    parser.add_argument('--prefix', default='images/', help='只对账该前缀下的对象(默认images/)')
+    parser.add_argument('--bucket', default=settings.r2_bucket_name, help='存储桶(默认R2_BUCKET_NAME)')
+    parser.add_argument('--endpoint-url', help='S3 兼容端点，用于本地替身（如 moto_server、MinIO）')
+    parser.add_argument('--workers', type=int, default=8, help='并发列举的线程数(默认8)')
+    parser.add_argument('--run-size', type=int, default=RUN_SIZE, help=f'外部排序每段的记录数(默认{RUN_SIZE})')
+    parser.add_argument('--report', help='将缺失与孤儿对象逐行写入NDJSON文件')
+    parser.add_argument('--delete-orphans', action='store_true', help='删除孤儿对象（默认只报告）')
+    parser.add_argument('--min-age-hours', type=float, default=24, help='只删除早于该时长的孤儿对象，避免误删上传中的图片(默认24)')
+    args = parser.parse_args()
+    if not args.bucket:
+        parser.error('未指定存储桶: 设置 R2_BUCKET_NAME 或传入 --bucket')
+
+    client = make_client(args.endpoint_url)
+    print("🪣 R2 对象对账")
+    print("=" * 50)
+    print(f"存储桶: {args.bucket}  前缀: {args.prefix}  并发: {args.workers}")
+
+    cutoff = time.time() - args.min_age_hours * 3600
+    counts = Counter()
+    missing_variants = Counter()
+    orphan_bytes = 0
+    samples = {'missing': [], 'orphan': []}
+    errors = []
+    pending_deletes = []
+    deleted = 0
+
+    with tempfile.TemporaryDirectory(prefix='reconcile_r2_') as directory:
+        started = time.perf_counter()
+        listed, shard_count, object_count, bucket_bytes = list_bucket(client, args.bucket, args.prefix, args.workers, directory)
+        print(f"\n📋 列举完成: {shard_count} 个范围, {object_count} 个对象, "
+              f"{bucket_bytes / 1024 / 1024:.2f} MB, 耗时 {time.perf_counter() - started:.2f}s")
+
+        started = time.perf_counter()
+        db = SessionLocal()
+        report = open(args.report, 'w', encoding='utf-8') if args.report else None
+        try:
+            expected = external_sort(expected_keys(db, args.prefix), directory, args.run_size)
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                deletions = []
+                for status, record in merge_join(expected, listed):
+                    counts[status] += 1
+                    if status == 'ok':
+                        continue
+                    if status == 'missing':
+                        key, public_id, variant = record
+                        missing_variants[variant.split('.', 1)[0]] += 1
+                        entry = {'type': 'missing', 'key': key, 'public_id': public_id, 'variant': variant}
+                    else:
+                        key, size, modified = record
+                        orphan_bytes += size
+                        entry = {'type': 'orphan', 'key': key, 'size': size, 'last_modified': modified}
+                        if modified > cutoff:
+                            counts['orphan_recent'] += 1
+                        elif args.delete_orphans:
+                            pending_deletes.append(key)
+                            if len(pending_deletes) >= DELETE_BATCH:
+                                deletions.append((len(pending_deletes), pool.submit(delete_objects, client, args.bucket, pending_deletes)))
+                                pending_deletes = []
+                    if len(samples[entry['type']]) < SAMPLE_COUNT:
+                        samples[entry['type']].append(key)
+                    if report:
+                        report.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                if pending_deletes:
+                    deletions.append((len(pending_deletes), pool.submit(delete_objects, client, args.bucket, pending_deletes)))
+                for batch_size, future in deletions:
+                    batch_errors = future.result()
+                    errors += batch_errors
+                    deleted += batch_size - len(batch_errors)
+        finally:
+            db.close()
+            if report:
+                report.close()
+        print(f"🔗 归并完成: 应存在 {counts['ok'] + counts['missing']} 个对象, 耗时 {time.perf_counter() - started:.2f}s")
+
+    print("\n📊 对账结果")
+    print(f"   匹配: {counts['ok']}")
+    print(f"   缺失: {counts['missing']}" + (
+        f" ({', '.join(f'{variant} {count}' for variant, count in missing_variants.most_common())})" if missing_variants else ""
+    ))
+    print(f"   孤儿: {counts['orphan']} ({orphan_bytes / 1024 / 1024:.2f} MB)，其中 {counts['orphan_recent']} 个不足 {args.min_age_hours:g} 小时")
+    for status, label in (('missing', '缺失'), ('orphan', '孤儿')):
+        for key in samples[status]:
+            print(f"   • {label}: {key}")
+    if args.report:
+        print(f"   详细报告: {args.report}")
+    if args.delete_orphans:
+        print(f"\n🗑️  已删除 {deleted} 个孤儿对象" + (f"，{len(errors)} 个失败" if errors else ""))
+        for key, message in errors[:SAMPLE_COUNT]:
+            print(f"   • {key}: {message}")
+
+    # 存在缺失对象时以非零状态退出，便于定时任务告警
+    if counts['missing'] or errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
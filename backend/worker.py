@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务worker
+从 jobs 表领取任务并执行（生成尺寸版本、哈希、主色调、缓存清理、统计快照刷新等）
+用法: python worker.py [--concurrency 4] [--once]
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.jobs.queue import claim_job, complete_job, ensure_scheduled, fail_job, requeue_stale_jobs
+from app.jobs.tasks import PERIODIC_TASKS, TASKS, TASK_CONCURRENCY, schedule_next
+
+logger = logging.getLogger("worker")
+
+class Worker:
+    def __init__(self, concurrency, poll_interval=1.0, only_tasks=None, once=False):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.only_tasks = only_tasks
+        self.once = once
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+        self._running = Counter()
+        self._lock = threading.Lock()
+
+    def _claim(self, db, slot):
+        # 领取与计数需要原子，避免两个线程同时越过任务并发上限
+        with self._lock:
+            saturated = [name for name, limit in TASK_CONCURRENCY.items() if self._running[name] >= limit]
+            job = claim_job(db, f"{self.worker_id}/{slot}", exclude_tasks=saturated, only_tasks=self.only_tasks)
+            if job is not None:
+                self._running[job.task] += 1
+        return job
+
+    def run_job(self, db, job):
+        """执行单个任务并记录耗时"""
+        handler = TASKS.get(job.task)
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"Unknown task: {job.task}")
+            result = handler(db, json.loads(job.payload or "{}"))
+        except Exception:
+            db.rollback()
+            duration_ms = (time.perf_counter() - started) * 1000
+            will_retry = fail_job(db, job, traceback.format_exc(), duration_ms)
+            logger.warning(
+                "job %s %s failed (attempt %s/%s, %.1fms)%s",
+                job.id, job.task, job.attempts, job.max_attempts, duration_ms,
+                ", will retry" if will_retry else ""
+            )
+        else:
+            will_retry = False
+            duration_ms = (time.perf_counter() - started) * 1000
+            complete_job(db, job, duration_ms)
+            logger.info("job %s %s done in %.1fms %s", job.id, job.task, duration_ms, result or "")
+        finally:
+            with self._lock:
+                self._running[job.task] -= 1
+        # 周期任务成功或重试耗尽后都排入下一次（仍在重试时，重试本身就是下一次执行）
+        if job.task in PERIODIC_TASKS and not will_retry:
+            schedule_next(db, job.task)
+
+    def loop(self, slot):
+        """单个并发槽位的主循环"""
+        db = SessionLocal()
+        try:
+            while not self.stop_event.is_set():
+                job = self._claim(db, slot)
+                if job is None:
+                    if self.once:
+                        return
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+                self.run_job(db, job)
+        finally:
+            db.close()
+
+    def run(self):
+        db = SessionLocal()
+        try:
+            requeued = requeue_stale_jobs(db)
+            if requeued:
+                logger.info("requeued %s stale jobs", requeued)
+            for name in PERIODIC_TASKS:
+                if (self.only_tasks is None or name in self.only_tasks) and ensure_scheduled(db, name):
+                    logger.info("scheduled periodic task %s", name)
+        finally:
+            db.close()
+
+        logger.info("worker %s started with concurrency %s", self.worker_id, self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as executor:
+            futures = [executor.submit(self.loop, slot) for slot in range(self.concurrency)]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                logger.info("stopping, waiting for running jobs...")
+                self.stop_event.set()
+
+def main():
+    parser = argparse.ArgumentParser(description='Solarpunk Gallery 后台任务worker')
+    parser.add_argument('--concurrency', type=int, default=settings.worker_concurrency, help='并发任务数')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='空闲时轮询间隔(秒)')
+    parser.add_argument('--tasks', help='只处理指定任务，多个用逗号分隔')
+    parser.add_argument('--once', action='store_true', help='处理完当前到期任务后退出')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    only_tasks = [name.strip() for name in args.tasks.split(',')] if args.tasks else None
+    Worker(args.concurrency, args.poll_interval, only_tasks, args.once).run()
+
+if __name__ == "__main__":
+    main()
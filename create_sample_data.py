@@ -4,6 +4,7 @@
 import os
 import sys
 import sqlite3
+import argparse
 from datetime import datetime
 import uuid
 from PIL import Image, ImageDraw, ImageFont
@@ -153,7 +154,8 @@ def insert_photo_to_db(photo_data, urls, public_id):
     cursor = conn.cursor()
     
     # 插入数据 - 匹配实际的表结构
-    photo_id = str(uuid.uuid4())
+    # 主键为16字节UUID（GUID列在SQLite上的存储格式）
+    photo_id = uuid.uuid4().bytes
     cursor.execute("""
         INSERT INTO photos (
             id, public_id, title, tags, r2_object_key, aspect_ratio, created_at
@@ -173,7 +175,27 @@ def insert_photo_to_db(photo_data, urls, public_id):
     
     print(f"✅ 已添加图片: {photo_data['title']} (ID: {public_id})")
 
+def generate_synthetic_catalog(database_url, count, seed=42, collections=50):
+    """按固定随机种子批量写入合成数据（委托给 backend/generate_scale_data.py）"""
+    from generate_scale_data import generate
+    generate(database_url, count, seed=seed, collections=collections)
+
 def main():
+    # 合成数据生成器依赖 SQLAlchemy，只在运行脚本时导入，不影响导入示例数据定义
+    from generate_scale_data import parse_count
+
+    parser = argparse.ArgumentParser(description='创建示例图片数据')
+    parser.add_argument('--synthetic', type=parse_count, help='只写入合成数据库记录（不生成图片），如 10k / 100k / 1m')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子（相同种子生成相同数据）')
+    parser.add_argument('--collections', type=int, default=50, help='合成合集数量')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join('backend', 'photos.db')), help='目标数据库URL')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        print(f"🌱 开始生成合成数据: {args.synthetic} 张图片 (seed={args.seed})")
+        generate_synthetic_catalog(args.database_url, args.synthetic, args.seed, args.collections)
+        return
+
     print("🌱 开始创建示例图片数据...")
     
     # 检查数据库是否存在
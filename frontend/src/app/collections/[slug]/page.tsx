@@ -1,11 +1,11 @@
 'use client';
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { useParams, useRouter } from 'next/navigation';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import PhotoModal from '@/components/PhotoModal';
-import { fetchCollectionBySlug, CollectionDetail, Photo } from '@/lib/api';
+import { fetchCollectionBySlug, fetchCollectionPhotos, CollectionDetail, Photo } from '@/lib/api';
 
 export default function CollectionDetailPage() {
   const params = useParams();
@@ -17,6 +17,9 @@ export default function CollectionDetailPage() {
   const [error, setError] = useState<string | null>(null);
   const [selectedPhoto, setSelectedPhoto] = useState<Photo | null>(null);
   const [selectedIndex, setSelectedIndex] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const loadMoreRef = useRef<HTMLDivElement | null>(null);
 
   useEffect(() => {
     if (!slug) return;
@@ -25,6 +28,7 @@ export default function CollectionDetailPage() {
       try {
         const response = await fetchCollectionBySlug(slug);
         setCollection(response);
+        setNextCursor(response.next_cursor ?? null);
       } catch (error) {
         console.error('Error loading collection:', error);
         setError('Failed to load collection');
@@ -36,6 +40,38 @@ export default function CollectionDetailPage() {
     loadCollection();
   }, [slug]);
 
+  // 滚动到底部或点击按钮时才加载下一页
+  const loadMorePhotos = useCallback(async () => {
+    if (!collection || !nextCursor || loadingMore) return;
+
+    setLoadingMore(true);
+    try {
+      const page = await fetchCollectionPhotos(collection.id, nextCursor);
+      setCollection(prev => prev && { ...prev, photos: [...prev.photos, ...page.items] });
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error loading more photos:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [collection, nextCursor, loadingMore]);
+
+  useEffect(() => {
+    if (!nextCursor || !loadMoreRef.current) return;
+
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries[0].isIntersecting) {
+          loadMorePhotos();
+        }
+      },
+      { rootMargin: '400px' }
+    );
+    observer.observe(loadMoreRef.current);
+
+    return () => observer.disconnect();
+  }, [loadMorePhotos, nextCursor]);
+
   const handleSearch = (query: string) => {
     router.push(`/search?q=${encodeURIComponent(query)}`);
   };
@@ -166,7 +202,7 @@ export default function CollectionDetailPage() {
               {/* Stats */}
               <div className="flex gap-8 mb-8">
                 <div className="text-center">
-                  <div className="text-3xl font-cyber font-bold text-primary-glow">{collection.photos.length}</div>
+                  <div className="text-3xl font-cyber font-bold text-primary-glow">{collection.photos.length}{nextCursor ? '+' : ''}</div>
                   <div className="text-xs font-mono text-primary-300 tracking-wider">IMAGES</div>
                 </div>
                 <div className="text-center">
@@ -250,6 +286,18 @@ export default function CollectionDetailPage() {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div ref={loadMoreRef} className="flex justify-center mt-12">
+              <button
+                onClick={loadMorePhotos}
+                disabled={loadingMore}
+                className="btn-primary disabled:opacity-50"
+              >
+                {loadingMore ? '加载中...' : '加载更多'}
+              </button>
+            </div>
+          )}
         </div>
       </section>
       
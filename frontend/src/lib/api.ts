@@ -97,10 +97,16 @@ export interface CollectionDetail {
   is_published: boolean;
   view_count: number;
   photos: Photo[];
+  next_cursor?: string | null;
   created_at: string;
   updated_at: string;
 }
 
+export interface CollectionPhotoPage {
+  items: Photo[];
+  next_cursor: string | null;
+}
+
 export interface CollectionListResponse {
   items: Collection[];
   total: number;
@@ -139,5 +145,27 @@ export async function fetchCollectionBySlug(slug: string): Promise<CollectionDet
     throw new Error('Failed to fetch collection');
   }
   
+  // 详情只包含第一页图片，后续页面由 fetchCollectionPhotos 按需加载
   return response.json();
-}
\ No newline at end of file
+}
+
+export async function fetchCollectionPhotos(
+  collectionId: string,
+  cursor: string,
+  limit: number = 50
+): Promise<CollectionPhotoPage> {
+  const params = new URLSearchParams({ limit: limit.toString(), cursor });
+  const response = await fetch(`${API_BASE_URL}/collections/${collectionId}/photos?${params}`, {
+    cache: 'no-store'
+  });
+  
+  if (!response.ok) {
+    throw new Error('Failed to fetch collection photos');
+  }
+  
+  // 响应体为图片数组，下一页游标在 X-Next-Cursor 响应头中
+  return {
+    items: await response.json(),
+    next_cursor: response.headers.get('X-Next-Cursor')
+  };
+}
@@ -22,6 +22,8 @@ from app.core.config import settings
 from app.models.tables import Photo
 from app.crud.crud_photos import create_photo
 from app.models.schemas import PhotoCreate
+from app.jobs.tasks import enqueue_photo_pipeline
+from app.core import imaging
 
 def setup_database():
     """设置数据库连接"""
@@ -39,8 +41,8 @@ def setup_r2_client():
         region_name='auto'
     )
 
-def process_image(image_path: str) -> tuple[bytes, bytes, float]:
-    """处理图片：生成缩略图和原图，返回(原图字节, 缩略图字节, 宽高比)"""
+def process_image(image_path: str) -> tuple[bytes, dict[str, bytes], float]:
+    """处理图片：返回(原图WebP字节, {格式: 缩略图字节}, 宽高比)"""
     with Image.open(image_path) as img:
         # 转换为RGB模式（如果需要）
         if img.mode in ('RGBA', 'LA', 'P'):
@@ -50,26 +52,22 @@ def process_image(image_path: str) -> tuple[bytes, bytes, float]:
         aspect_ratio = img.width / img.height
         
         # 生成缩略图（宽度400px）
-        thumbnail = img.copy()
-        thumbnail.thumbnail((400, int(400 / aspect_ratio)), Image.Resampling.LANCZOS)
+        thumbnail = imaging.resize_to_width(img, imaging.RENDITION_WIDTHS["thumb"])
         
-        # 保存原图为WebP格式
-        from io import BytesIO
-        original_buffer = BytesIO()
-        img.save(original_buffer, format='WEBP', quality=90, optimize=True)
-        original_bytes = original_buffer.getvalue()
+        # 原图统一保存为WebP，质量取当前质量档位
+        original_bytes = imaging.encode_image(img, imaging.CANONICAL_FORMAT, kind="original")
         
-        # 保存缩略图为WebP格式
-        thumb_buffer = BytesIO()
-        thumbnail.save(thumb_buffer, format='WEBP', quality=85, optimize=True)
-        thumb_bytes = thumb_buffer.getvalue()
+        # 缩略图按配置输出多种格式（AVIF / WebP / JPEG）
+        thumbs = {
+            fmt: imaging.encode_image(thumbnail, fmt)
+            for fmt in imaging.enabled_formats()
+        }
         
-        return original_bytes, thumb_bytes, aspect_ratio
+        return original_bytes, thumbs, aspect_ratio
 
-def upload_to_r2(r2_client, original_bytes: bytes, thumb_bytes: bytes, file_id: str) -> str:
+def upload_to_r2(r2_client, original_bytes: bytes, thumbs: dict[str, bytes], file_id: str) -> str:
     """上传图片到R2，返回原图的object_key"""
     original_key = f"images/original/{file_id}.webp"
-    thumb_key = f"images/thumb/{file_id}.webp"
     
     # 上传原图
     r2_client.put_object(
@@ -79,13 +77,14 @@ def upload_to_r2(r2_client, original_bytes: bytes, thumb_bytes: bytes, file_id:
         ContentType='image/webp'
     )
     
-    # 上传缩略图
-    r2_client.put_object(
-        Bucket=settings.r2_bucket_name,
-        Key=thumb_key,
-        Body=thumb_bytes,
-        ContentType='image/webp'
-    )
+    # 上传各格式缩略图
+    for fmt, thumb_bytes in thumbs.items():
+        r2_client.put_object(
+            Bucket=settings.r2_bucket_name,
+            Key=imaging.rendition_key(original_key, "thumb", fmt),
+            Body=thumb_bytes,
+            ContentType=imaging.FORMAT_SPECS[fmt]["media_type"]
+        )
     
     return original_key
 
@@ -126,8 +125,10 @@ def main():
         print(f"正在处理图片: {image_path}")
         
         # 处理图片
-        original_bytes, thumb_bytes, aspect_ratio = process_image(image_path)
+        original_bytes, thumbs, aspect_ratio = process_image(image_path)
         print(f"图片处理完成，宽高比: {aspect_ratio:.2f}")
+        for fmt, data in thumbs.items():
+            print(f"  缩略图 {fmt}: {len(data) / 1024:.1f} KB")
         
         # 获取用户输入
         public_id, title, tags = get_user_input()
@@ -140,7 +141,7 @@ def main():
         
         # 上传到R2
         print("正在上传到 Cloudflare R2...")
-        r2_object_key = upload_to_r2(r2_client, original_bytes, thumb_bytes, file_id)
+        r2_object_key = upload_to_r2(r2_client, original_bytes, thumbs, file_id)
         print("上传完成")
         
         # 保存到数据库
@@ -152,11 +153,16 @@ def main():
                 title=title,
                 tags=tags,
                 r2_object_key=r2_object_key,
-                aspect_ratio=aspect_ratio
+                aspect_ratio=aspect_ratio,
+                image_formats=list(thumbs)
             )
-            create_photo(db, photo_data)
+            photo = create_photo(db, photo_data)
             db.commit()
             print("数据库保存完成")
+            
+            # 其余尺寸、哈希、主色调等交给后台worker处理
+            enqueue_photo_pipeline(db, photo)
+            print("已加入后台处理队列 (运行 backend/worker.py 处理)")
         finally:
             db.close()
         